@@ -0,0 +1,328 @@
+"""
+Input sources that read tar and zip archives without extracting them.
+
+Tar archives, compressed or not, are read in one streaming pass that lists
+the members and keeps the content of those the scan can select in a spooled
+buffer (in memory up to a limit, then in one temporary file). No directory
+tree is ever created on disk, and ignored, excluded or generated members are
+not buffered. Zip archives are listed from their central directory and
+members are read on demand.
+"""
+
+import logging
+import tarfile
+import tempfile
+import threading
+import zipfile
+from collections.abc import Callable, Hashable, Iterable, Iterator
+from pathlib import Path, PurePosixPath
+
+from codebase_prompt_gen.sources import InputSource, SourceEntry, entries_from_file_list
+
+TAR_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+ZIP_SUFFIXES = (".zip",)
+
+# Member data kept in memory before the spool moves to a temporary file
+SPOOL_MAX_SIZE = 64 * 1024 * 1024
+
+# Top-level files kept in memory, even when the include patterns rule them out
+ROOT_FILES = frozenset({PurePosixPath(".gitignore"), PurePosixPath(".gitattributes")})
+
+# (path, content_getter, size, identity) as accepted by entries_from_file_list
+FileRecord = tuple[PurePosixPath, Callable[[], str] | None, int | None, Hashable | None]
+
+
+def is_archive(path: Path) -> bool:
+    """Return True if the path names a supported archive format."""
+    name = path.name.lower()
+    return name.endswith(TAR_SUFFIXES + ZIP_SUFFIXES)
+
+
+def archive_name(path: Path) -> str:
+    """Return the archive's file name without its archive suffix."""
+    name = path.name
+    for suffix in TAR_SUFFIXES + ZIP_SUFFIXES:
+        if name.lower().endswith(suffix):
+            return name[: -len(suffix)]
+    return name
+
+
+def member_path(name: str, strip_components: int = 0) -> PurePosixPath | None:
+    """
+    Turn an archive member name into a relative path.
+
+    Args:
+        name: The member name as stored in the archive
+        strip_components: Number of leading path components to remove
+
+    Returns:
+        The relative path, or None if nothing is left after stripping
+    """
+    parts = [part for part in PurePosixPath(name.lstrip("/")).parts if part not in {".", ".."}]
+    parts = parts[strip_components:]
+    return PurePosixPath(*parts) if parts else None
+
+
+class TarStreamSource(InputSource):
+    """Input source reading a (possibly compressed) tar archive in one streaming pass."""
+
+    def __init__(
+        self,
+        archive_path: Path,
+        strip_components: int = 0,
+        keep: Callable[[PurePosixPath], bool] | None = None,
+        selector: Callable[[InputSource], Callable[[PurePosixPath], bool]] | None = None,
+    ) -> None:
+        """
+        List the archive's members, buffering the data of those that can be selected.
+
+        Each member is decided on as it streams past. The top-level
+        .gitignore and .gitattributes usually come first; members that
+        precede them are judged without them, so some data may be buffered
+        that the scan then leaves out. Should the scan select a member that
+        was not buffered (e.g. one .gitattributes marks as not generated),
+        a second pass reads the missing members on the first read.
+
+        Args:
+            archive_path: Path to the tar archive
+            strip_components: Number of leading path components to remove from members
+            keep: Optional predicate deciding whether a file's content can be
+                  needed; members it rejects are listed without a content getter
+            selector: Optional function building, from the source's top-level
+                      .gitignore and .gitattributes as read so far, a predicate
+                      telling whether the scan may select a file. Without it,
+                      every member kept is buffered.
+
+        Raises:
+            ValueError: If the archive cannot be read
+        """
+        self.name = archive_name(archive_path)
+        self.archive_path = archive_path
+        self.strip_components = strip_components
+        self._lock = threading.Lock()
+        self._files: list[FileRecord] = []
+        # Data of the top-level .gitignore and .gitattributes
+        self._root_files: dict[PurePosixPath, bytes] = {}
+        # Files whose content will be read (None: every file with a content getter)
+        self._expected: set[PurePosixPath] | None = None
+        # Where each buffered member's data lives in the spool
+        self._stored: dict[PurePosixPath, tuple[int, int]] = {}
+        # Whether the members the first pass skipped but the scan selected were read
+        self._completed = False
+        # Held until close(), as content is read long after the constructor returns
+        # ruff: ignore[open-file-with-context-handler]
+        self._spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        try:
+            self._list_members(keep, selector)
+        except (OSError, tarfile.TarError) as e:
+            self._spool.close()
+            msg = f"Could not read tar archive {archive_path}: {e}"
+            raise ValueError(msg) from e
+
+    def _list_members(
+        self,
+        keep: Callable[[PurePosixPath], bool] | None,
+        selector: Callable[[InputSource], Callable[[PurePosixPath], bool]] | None,
+    ) -> None:
+        # Sizes of the regular files, by path, to resolve hardlinks
+        sizes: dict[PurePosixPath, int] = {}
+        # Hardlinks can only be resolved once their target has been seen
+        links: list[tuple[PurePosixPath, PurePosixPath | None]] = []
+        selects = selector(self) if selector is not None else None
+
+        with tarfile.open(self.archive_path, mode="r|*") as tar:
+            for member in tar:
+                path = member_path(member.name, self.strip_components)
+                if path is None:
+                    continue
+                if member.islnk():
+                    links.append((path, member_path(member.linkname, self.strip_components)))
+                    continue
+                if not member.isfile():
+                    logging.debug("Skipping non-file archive member %s", member.name)
+                    continue
+
+                sizes[path] = member.size
+                if path in ROOT_FILES:
+                    extracted = tar.extractfile(member)
+                    if extracted is not None:
+                        with extracted:
+                            self._root_files[path] = extracted.read()
+                        if selector is not None:
+                            # Members from here on are judged with this file
+                            selects = selector(self)
+                elif keep is not None and not keep(path):
+                    self._files.append((path, None, member.size, path))
+                    continue
+                elif selects is None or selects(path):
+                    self._store(tar, member, path)
+                self._files.append((path, self._content_getter(path, path), member.size, path))
+
+        for path, target in links:
+            size = sizes.get(target) if target is not None else None
+            if target is None or size is None:
+                logging.debug("Skipping hardlink %s to unavailable member %s", path, target)
+                continue
+            self._files.append((path, self._content_getter(path, target), size, target))
+
+    def _store(self, tar: tarfile.TarFile, member: tarfile.TarInfo, path: PurePosixPath) -> None:
+        """Copy a member's data to the end of the spool."""
+        extracted = tar.extractfile(member)
+        if extracted is None:
+            return
+        offset = self._spool.seek(0, 2)
+        with extracted:
+            while chunk := extracted.read(1024 * 1024):
+                self._spool.write(chunk)
+        self._stored[path] = (offset, member.size)
+
+    def _buffer_missing(self) -> None:
+        """Second pass, only if needed: buffer the members to read that the first pass skipped."""
+        # Hardlinks read the data of their target
+        missing = {
+            identity
+            for path, read, _, identity in self._files
+            if read is not None
+            and (self._expected is None or path in self._expected)
+            and identity not in self._root_files
+            and identity not in self._stored
+        }
+        if not missing:
+            return
+        logging.debug("Reading %d archive members again", len(missing))
+        with tarfile.open(self.archive_path, mode="r|*") as tar:
+            for member in tar:
+                path = member_path(member.name, self.strip_components)
+                if path in missing and member.isfile():
+                    self._store(tar, member, path)
+
+    def _read_data(self, data_path: PurePosixPath) -> bytes:
+        if data_path in self._root_files:
+            return self._root_files[data_path]
+        with self._lock:
+            if data_path not in self._stored and not self._completed:
+                self._completed = True
+                self._buffer_missing()
+            offset, size = self._stored[data_path]
+            self._spool.seek(offset)
+            return self._spool.read(size)
+
+    def _content_getter(self, path: PurePosixPath, data_path: PurePosixPath) -> Callable[[], str]:
+        def get_content() -> str:
+            try:
+                return self._read_data(data_path).decode("utf-8", errors="replace")
+            except Exception:
+                logging.exception("Error reading archive member %s", path)
+                return ""
+
+        return get_content
+
+    def entries(self) -> Iterator[SourceEntry]:
+        return entries_from_file_list(self._files)
+
+    def expect_reads(self, paths: Iterable[Path]) -> None:
+        self._expected = {PurePosixPath(path.as_posix()) for path in paths}
+
+    def gitignore_file(self) -> tuple[Path, Path] | None:
+        return self._materialize_gitignore(self._root_files.get(PurePosixPath(".gitignore")))
+
+    def gitattributes(self) -> bytes | None:
+        return self._root_files.get(PurePosixPath(".gitattributes"))
+
+    def close(self) -> None:
+        self._spool.close()
+        super().close()
+
+
+class ZipSource(InputSource):
+    """Input source reading members of a zip archive on demand."""
+
+    def __init__(self, archive_path: Path, strip_components: int = 0) -> None:
+        """
+        Open the archive and list its members.
+
+        Args:
+            archive_path: Path to the zip archive
+            strip_components: Number of leading path components to remove from members
+
+        Raises:
+            ValueError: If the archive cannot be read
+        """
+        self.name = archive_name(archive_path)
+        try:
+            self._zip = zipfile.ZipFile(archive_path)
+        except (OSError, zipfile.BadZipFile) as e:
+            msg = f"Could not read zip archive {archive_path}: {e}"
+            raise ValueError(msg) from e
+        self._lock = threading.Lock()
+        self._members: dict[PurePosixPath, zipfile.ZipInfo] = {}
+        for info in self._zip.infolist():
+            path = member_path(info.filename, strip_components)
+            if path is not None and not info.is_dir():
+                self._members[path] = info
+
+    def _read_member(self, info: zipfile.ZipInfo) -> bytes:
+        with self._lock:
+            return self._zip.read(info)
+
+    def _content_getter(self, path: PurePosixPath, info: zipfile.ZipInfo) -> Callable[[], str]:
+        def get_content() -> str:
+            try:
+                return self._read_member(info).decode("utf-8", errors="replace")
+            except Exception:
+                logging.exception("Error reading archive member %s", path)
+                return ""
+
+        return get_content
+
+    def entries(self) -> Iterator[SourceEntry]:
+        return entries_from_file_list(
+            (path, self._content_getter(path, info), info.file_size, None)
+            for path, info in self._members.items()
+        )
+
+    def gitignore_file(self) -> tuple[Path, Path] | None:
+        info = self._members.get(PurePosixPath(".gitignore"))
+        return self._materialize_gitignore(self._read_member(info) if info else None)
+
+    def gitattributes(self) -> bytes | None:
+        info = self._members.get(PurePosixPath(".gitattributes"))
+        return self._read_member(info) if info else None
+
+    def close(self) -> None:
+        self._zip.close()
+        super().close()
+
+
+def open_archive_source(
+    archive_path: Path,
+    strip_components: int = 0,
+    keep: Callable[[PurePosixPath], bool] | None = None,
+    selector: Callable[[InputSource], Callable[[PurePosixPath], bool]] | None = None,
+) -> InputSource:
+    """
+    Open the input source matching an archive's file name.
+
+    Args:
+        archive_path: Path to a tar or zip archive
+        strip_components: Number of leading path components to remove from members
+        keep: Optional predicate used by tar sources to list members that
+              cannot end up in the prompt without a content getter
+        selector: Optional function used by tar sources to decide which members
+                  to buffer (see TarStreamSource)
+
+    Returns:
+        An input source for the archive
+
+    Raises:
+        ValueError: If the archive format is not supported or it cannot be read
+    """
+    name = archive_path.name.lower()
+    if name.endswith(ZIP_SUFFIXES):
+        return ZipSource(archive_path, strip_components=strip_components)
+    if name.endswith(TAR_SUFFIXES):
+        return TarStreamSource(
+            archive_path, strip_components=strip_components, keep=keep, selector=selector
+        )
+    msg = f"Unsupported archive format: {archive_path.name}"
+    raise ValueError(msg)
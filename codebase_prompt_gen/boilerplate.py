@@ -0,0 +1,178 @@
+"""
+Detection of boilerplate repeated across files.
+
+Many repositories start thousands of files with the same license header or
+generated-code banner, or end them with the same footer. A sampling pre-pass
+reads a bounded number of the selected files and hashes their leading and
+trailing lines cumulatively, so every prefix (and suffix) of up to
+MAX_BLOCK_LINES lines gets one hash without comparing texts. Prefixes shared
+by at least MIN_REPEATS sampled files become blocks, which are emitted once
+near the top of the prompt; in every file that starts or ends with a block the
+copy is replaced by a one-line reference.
+
+The pre-pass hashes at most MAX_BLOCK_LINES lines from each end of a sampled
+file, and replacing a block compares only its own length, so the stage runs
+in linear time over the bytes read.
+"""
+
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+# Blocks shorter than this are left in place
+MIN_BLOCK_LINES = 5
+# Longest block detected, in lines from either end of a file
+MAX_BLOCK_LINES = 60
+# Sampled files that must share a block
+MIN_REPEATS = 3
+# Files read by the pre-pass; spread evenly over the selection
+SAMPLE_FILES = 256
+# Files larger than this (when the size is known up front) are not sampled
+MAX_SAMPLE_BYTES = 1 << 20
+
+LEADING = "leading"
+TRAILING = "trailing"
+
+
+@dataclass
+class BoilerplateBlock:
+    """A block of lines found at the start or end of several files."""
+
+    number: int
+    # LEADING or TRAILING
+    position: str
+    text: str
+    line_count: int
+    # Sampled files the block was found in
+    paths: set[Path] = field(default_factory=set)
+
+    def reference(self) -> str:
+        """Return the line that replaces the block in a file."""
+        return f"[repeated block {self.number}: {self.line_count} lines]\n"
+
+
+def head_lines(content: str, count: int) -> list[str]:
+    """Return up to count leading lines of content, with their line endings."""
+    lines = []
+    start = 0
+    while len(lines) < count and start < len(content):
+        end = content.find("\n", start)
+        end = len(content) if end == -1 else end + 1
+        lines.append(content[start:end])
+        start = end
+    return lines
+
+
+def tail_lines(content: str, count: int) -> list[str]:
+    """Return up to count trailing lines of content, last line first."""
+    lines = []
+    end = len(content)
+    while len(lines) < count and end > 0:
+        # A newline ending the previous line starts this one
+        start = content.rfind("\n", 0, end - 1) + 1
+        lines.append(content[start:end])
+        end = start
+    return lines
+
+
+def cumulative_hashes(lines: list[str]) -> list[int]:
+    """Return the hash of every prefix of lines: entry k covers lines[: k + 1]."""
+    hashes = []
+    rolling = 0
+    for line in lines:
+        rolling = hash((rolling, line))
+        hashes.append(rolling)
+    return hashes
+
+
+class BoilerplateDetector:
+    """Collects line hashes of sampled files and derives the repeated blocks."""
+
+    def __init__(
+        self,
+        min_lines: int = MIN_BLOCK_LINES,
+        max_lines: int = MAX_BLOCK_LINES,
+        min_repeats: int = MIN_REPEATS,
+    ) -> None:
+        self.min_lines = min_lines
+        self.max_lines = max_lines
+        self.min_repeats = min_repeats
+        # Number of sampled files sharing each (position, lines, hash)
+        self._counts: Counter[tuple[str, int, int]] = Counter()
+        # (path, position, lines, hashes, total lines) of every sampled file end
+        self._samples: list[tuple[Path, str, list[str], list[int], int]] = []
+
+    def add(self, file_path: Path, content: str) -> None:
+        """Record the leading and trailing lines of a sampled file."""
+        line_count = content.count("\n") + (not content.endswith("\n"))
+        for position, lines in (
+            (LEADING, head_lines(content, self.max_lines)),
+            (TRAILING, tail_lines(content, self.max_lines)),
+        ):
+            if len(lines) < self.min_lines:
+                continue
+            hashes = cumulative_hashes(lines)
+            self._samples.append((file_path, position, lines, hashes, line_count))
+            self._counts.update(
+                (position, length, hashes[length - 1])
+                for length in range(self.min_lines, len(lines) + 1)
+            )
+
+    def blocks(self) -> list[BoilerplateBlock]:
+        """
+        Return the repeated blocks, numbered in order of first appearance.
+
+        Each sampled file contributes the longest of its leading blocks that
+        enough sampled files share, and the longest trailing block that does
+        not overlap it.
+        """
+        found: dict[tuple[str, int, int], BoilerplateBlock] = {}
+        # Lines of each sampled file covered by its leading block
+        leading_lengths: dict[Path, int] = {}
+        for file_path, position, lines, hashes, line_count in self._samples:
+            longest = len(lines)
+            if position == TRAILING:
+                longest = min(longest, line_count - leading_lengths.get(file_path, 0))
+            for length in range(longest, self.min_lines - 1, -1):
+                key = (position, length, hashes[length - 1])
+                if self._counts[key] < self.min_repeats:
+                    continue
+                block = found.get(key)
+                if block is None:
+                    block_lines = lines[:length] if position == LEADING else lines[length - 1 :: -1]
+                    block = BoilerplateBlock(len(found) + 1, position, "".join(block_lines), length)
+                    found[key] = block
+                block.paths.add(file_path)
+                if position == LEADING:
+                    leading_lengths[file_path] = length
+                break
+        return list(found.values())
+
+
+def strip_boilerplate(content: str, blocks: Iterable[BoilerplateBlock]) -> str:
+    """
+    Replace a leading and a trailing block of content by their references.
+
+    Args:
+        content: The file content
+        blocks: The blocks known to the output, longest first
+
+    Returns:
+        The content with at most one leading and one trailing block replaced
+    """
+    head = ""
+    tail = ""
+    for block in blocks:
+        text = block.text
+        if block.position == LEADING and not head and content.startswith(text):
+            # The block must end at a line boundary of the content
+            if text.endswith("\n") or len(text) == len(content):
+                head = block.reference()
+                content = content[len(text) :]
+        elif block.position == TRAILING and not tail and content.endswith(text):
+            cut = len(content) - len(text)
+            if cut == 0 or content[cut - 1] == "\n":
+                tail = block.reference()
+                content = content[:cut]
+    return head + content + tail
@@ -1,12 +1,34 @@
 """Command-line interface for Codebase AI Prompt Generator."""
 
 import argparse
+import contextlib
+import dataclasses
 import logging
 import sys
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from codebase_prompt_gen.core import generate_prompt
+from codebase_prompt_gen.compress import (
+    COMPRESSION_SUFFIXES,
+    available_compressions,
+    check_compression,
+    compression_for,
+)
+from codebase_prompt_gen.core import generate_prompt, generate_prompts, open_source, scan_source
+from codebase_prompt_gen.renderers import RENDERERS
+from codebase_prompt_gen.sinks import (
+    FLUSH_FULL,
+    FLUSH_POLICIES,
+    OutputClosedError,
+    OutputSink,
+    silence_stdout,
+    stdout_sink,
+)
+from codebase_prompt_gen.tree import TREE_LAYOUTS, TreeStyle, tree_rendering_sizes
+
+if TYPE_CHECKING:
+    from codebase_prompt_gen.outline import OutlinePolicy
+    from codebase_prompt_gen.scan import PromptTarget
 
 # Version information
 __version__ = "0.1.0"
@@ -14,16 +36,118 @@ version_info = tuple(int(part) for part in __version__.split("."))
 
 __all__ = ["__version__", "version_info"]
 
+# Rule written by --cursor, in .cursor/rules
+CURSOR_RULE = "entire-codebase.mdc"
+
+# Settings a --target can override, in the order they are documented
+TARGET_KEYS = ("include", "format", "tree", "outline", "outline-above", "outline-budget")
+
+
+@dataclasses.dataclass
+class OutputTarget:
+    """An output of the CLI with its own selection and rendering settings."""
+
+    # File to write (None: standard output)
+    path: Path | None
+    include_patterns: list[str]
+    output_format: str
+    tree_style: TreeStyle
+    outline_policy: "OutlinePolicy | None"
+    compression: str | None = None
+    boilerplate: bool = False
+
+    def prompt_target(self, output_stream: Any) -> "PromptTarget":
+        """Return the library target writing this output to a stream."""
+        from codebase_prompt_gen.scan import PromptTarget
+
+        return PromptTarget(
+            output_stream,
+            include_patterns=self.include_patterns,
+            output_format=self.output_format,
+            tree_style=self.tree_style,
+            outline_policy=self.outline_policy or None,
+            boilerplate=self.boilerplate,
+        )
+
+
+def parse_target(values: list[str], default: OutputTarget) -> OutputTarget:
+    """
+    Parse the arguments of one --target option.
+
+    Args:
+        values: The output path followed by KEY=VALUE settings
+        default: The settings of the main output, used for every key not given
+
+    Returns:
+        The output target
+
+    Raises:
+        ValueError: If a setting is malformed, unknown or invalid
+    """
+    path, *settings = values
+    target = dataclasses.replace(default, path=Path(path), compression=compression_for(Path(path)))
+    for setting in settings:
+        key, separator, value = setting.partition("=")
+        if not separator:
+            msg = f"Expected KEY=VALUE after the path, got {setting!r}"
+            raise ValueError(msg)
+        if key == "include":
+            target.include_patterns = value.split(",")
+        elif key == "format":
+            if value not in RENDERERS:
+                msg = f"Unknown format {value!r} (choose from {', '.join(sorted(RENDERERS))})"
+                raise ValueError(msg)
+            target.output_format = value
+        elif key == "tree":
+            target.tree_style = dataclasses.replace(target.tree_style, layout=value)
+        elif key == "outline":
+            target.outline_policy = _outline_policy(
+                target.outline_policy, patterns=value.split(",")
+            )
+        elif key == "outline-above":
+            target.outline_policy = _outline_policy(target.outline_policy, min_size=int(value))
+        elif key == "outline-budget":
+            target.outline_policy = _outline_policy(target.outline_policy, budget=int(value))
+        else:
+            msg = f"Unknown setting {key!r} (choose from {', '.join(TARGET_KEYS)})"
+            raise ValueError(msg)
+    return target
+
+
+def _outline_policy(base: "OutlinePolicy | None", **changes: Any) -> "OutlinePolicy":
+    """Return base, or the default policy if None, with some settings changed."""
+    from codebase_prompt_gen.outline import OutlinePolicy
+
+    return dataclasses.replace(base or OutlinePolicy(), **changes)
+
 
 def main() -> int | None:
     """Execute the main CLI functionality."""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    parser = build_parser()
+    args = parser.parse_args()
+
+    if args.version:
+        print(f"Codebase AI Prompt Generator v{__version__}")
+        return 0
+
+    if args.tree_sizes:
+        return print_tree_sizes(args)
+
+    outputs = validate_args(parser, args)
+    return run(args, outputs)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Return the parser of the command line."""
     parser = argparse.ArgumentParser(description="Generate AI prompts from Git repositories")
     parser.add_argument(
         "repo_path",
         type=str,
         nargs="?",
         default=".",
-        help="Path to the Git repository (default: current directory)",
+        help="Path to the Git repository or a .tar(.gz/.bz2/.xz)/.zip archive "
+        "(default: current directory)",
     )
     parser.add_argument(
         "--exclude",
@@ -38,80 +162,352 @@ def main() -> int | None:
         help="Patterns of files to include (e.g., *.py)",
     )
     parser.add_argument("--output", type=str, help="Output file to write the prompt to")
+    parser.add_argument(
+        "--target",
+        action="append",
+        nargs="+",
+        metavar=("PATH", "KEY=VALUE"),
+        help="Also write a prompt to PATH from the same scan; repeatable. Settings default to "
+        "the main output's: include=PATTERN,..., format=FORMAT, tree=LAYOUT, "
+        "outline=PATTERN,..., outline-above=BYTES, outline-budget=BYTES",
+    )
     parser.add_argument(
         "--cursor",
         action="store_true",
         help="Output to .cursor/rules/entire-codebase.mdc for Cursor IDE integration",
     )
+    parser.add_argument(
+        "--cursor-split",
+        action="store_true",
+        help="Write one .cursor/rules/codebase-*.mdc rule per top-level directory, "
+        "rewriting only rules whose content changed",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        metavar="N",
+        help="Number of parallel workers for --cursor-split (default: automatic)",
+    )
     parser.add_argument(
         "--no-gitignore",
         action="store_true",
         help="Ignore .gitignore files (both local and global)",
     )
+    parser.add_argument(
+        "--include-generated",
+        action="store_true",
+        help="Include the content of lockfiles and generated, vendored and minified files, "
+        "which are otherwise listed in the tree as skipped",
+    )
+    parser.add_argument(
+        "--rev",
+        type=str,
+        help="Read a git tree-ish (branch, tag or commit) instead of the working tree",
+    )
+    parser.add_argument(
+        "--strip-components",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Remove N leading path components from archive members (like tar)",
+    )
+    parser.add_argument(
+        "--follow-symlinks",
+        action="store_true",
+        help="Descend into symlinked directories; files reached via several links are read once",
+    )
+    parser.add_argument(
+        "--scan-workers",
+        type=int,
+        metavar="N",
+        help="List directories on N threads; speeds up network and overlay filesystems "
+        "(default: serial)",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        metavar="N",
+        help="Render file sections in N processes; the output is identical to a serial run "
+        "(requires --output or --cursor)",
+    )
+    parser.add_argument(
+        "--flush",
+        choices=FLUSH_POLICIES,
+        help="When buffered output is written out: when the buffer is full, after every file "
+        "section, or at least every 0.2 seconds (default: full for --output files; for "
+        "standard output, section on a terminal, else interval)",
+    )
+    parser.add_argument(
+        "--compress",
+        choices=available_compressions(),
+        help="Compress the --output file (default: chosen by its extension: "
+        + ", ".join(f"{suffix} for {method}" for suffix, method in COMPRESSION_SUFFIXES.items())
+        + ")",
+    )
+    parser.add_argument(
+        "--compress-level",
+        type=int,
+        metavar="LEVEL",
+        help="Compression level (gzip 0-9, xz 0-9, zstd 1-22)",
+    )
+    parser.add_argument(
+        "--compress-threads",
+        type=int,
+        metavar="N",
+        help="Threads used by the zstd compressor",
+    )
+    parser.add_argument(
+        "--format",
+        dest="output_format",
+        choices=sorted(RENDERERS),
+        default="markdown",
+        help="Output format for the prompt (default: markdown)",
+    )
+    parser.add_argument(
+        "--tree",
+        dest="tree_layout",
+        choices=TREE_LAYOUTS,
+        default="flat",
+        help="File tree layout: one full path per line, or an indented hierarchy that "
+        "prints each directory once (default: flat)",
+    )
+    parser.add_argument(
+        "--tree-collapse",
+        action="store_true",
+        help="Join chains of single-child directories into one line (indented tree)",
+    )
+    parser.add_argument(
+        "--tree-summarize-above",
+        type=int,
+        metavar="N",
+        help="Show directories with more than N entries as 'N files, M bytes' (indented tree)",
+    )
+    parser.add_argument(
+        "--tree-sizes",
+        action="store_true",
+        help="Print the size of every file tree rendering for the repository and exit",
+    )
+    parser.add_argument(
+        "--index",
+        action="store_true",
+        help="Write a sidecar index (<output>.idx.json) with the byte range of each file section",
+    )
+    parser.add_argument(
+        "--update",
+        action="store_true",
+        help="Use the sidecar index to rewrite only changed file sections (implies --index)",
+    )
+    parser.add_argument(
+        "--outline",
+        type=str,
+        nargs="+",
+        metavar="PATTERN",
+        help="Emit files matching these patterns as outlines (signatures and docstrings)",
+    )
+    parser.add_argument(
+        "--outline-above",
+        type=int,
+        metavar="BYTES",
+        help="Emit files of at least this many bytes as outlines",
+    )
+    parser.add_argument(
+        "--outline-budget",
+        type=int,
+        metavar="BYTES",
+        help="Emit files as outlines once the full content written would exceed this many bytes",
+    )
+    parser.add_argument(
+        "--boilerplate",
+        action="store_true",
+        help="Emit blocks of lines repeated at the start or end of many files (license "
+        "headers, generated-code banners) once, replacing each copy by a reference",
+    )
     parser.add_argument("--version", action="store_true", help="Show version information and exit")
+    return parser
 
-    args = parser.parse_args()
 
-    if args.version:
-        print(f"Codebase AI Prompt Generator v{__version__}")
-        return 0
+def _fail_on_conflict(parser: argparse.ArgumentParser, checks: list[tuple[Any, str]]) -> None:
+    """Exit with the message of the first check whose condition holds."""
+    for failed, message in checks:
+        if failed:
+            parser.error(message)
+
+
+def validate_args(parser: argparse.ArgumentParser, args: argparse.Namespace) -> list[OutputTarget]:
+    """
+    Check the command line for options that cannot be combined, and plan the outputs.
+
+    Usage errors exit through parser.error, before anything is written.
 
-    # Handle cursor output path
-    output_file = None
+    Args:
+        parser: The parser, for reporting usage errors
+        args: The parsed command line
 
-    if args.output:
-        output_file = Path(args.output)
+    Returns:
+        The outputs to write, the main one first (with no path for standard
+        output); empty for --cursor-split, which writes its own rules
+    """
+    try:
+        tree_style = TreeStyle(
+            args.tree_layout,
+            collapse_chains=args.tree_collapse,
+            summarize_above=args.tree_summarize_above,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    outline_policy = None
+    if args.outline or args.outline_above is not None or args.outline_budget is not None:
+        outline_policy = _outline_policy(
+            None,
+            min_size=args.outline_above,
+            patterns=args.outline or [],
+            budget=args.outline_budget,
+        )
+    is_archive = Path(args.repo_path).is_file()
+    needs_working_tree = bool(args.rev) or is_archive
+
+    if args.cursor_split:
+        _fail_on_conflict(
+            parser,
+            [
+                (tree_style != TreeStyle(), "--cursor-split always uses the flat tree layout"),
+                (
+                    outline_policy or args.boilerplate,
+                    "--cursor-split cannot be combined with outline options or --boilerplate",
+                ),
+                (
+                    needs_working_tree,
+                    "--cursor-split needs a working tree, not --rev or an archive",
+                ),
+                (
+                    args.index or args.update,
+                    "--cursor-split cannot be combined with --index or --update",
+                ),
+                (
+                    args.output or args.target or args.cursor or args.processes,
+                    "--cursor-split cannot be combined with --output, --target, --cursor or "
+                    "--processes",
+                ),
+                (
+                    args.output_format != "markdown"
+                    or args.compress
+                    or args.compress_level is not None
+                    or args.compress_threads is not None,
+                    "--cursor-split always writes uncompressed Markdown rules",
+                ),
+            ],
+        )
+        return []
+
+    main_output = OutputTarget(
+        None,
+        args.include or [],
+        args.output_format,
+        tree_style,
+        outline_policy,
+        boilerplate=args.boilerplate,
+    )
+    try:
+        targets = [parse_target(values, main_output) for values in args.target or []]
+    except ValueError as e:
+        parser.error(f"--target: {e}")
 
+    _fail_on_conflict(
+        parser,
+        [
+            (args.compress and not args.output, "--compress requires --output"),
+            (args.cursor and is_archive, "--cursor needs a repository directory, not an archive"),
+        ],
+    )
     if args.cursor:
         if args.output:
-            logging.warning("Warning: --cursor flag overrides --output flag\n")
+            # Both files are written from one scan
+            targets.insert(
+                0,
+                dataclasses.replace(
+                    main_output,
+                    path=Path(args.output),
+                    compression=compression_for(Path(args.output), args.compress),
+                ),
+            )
+        main_output.path = Path(args.repo_path).resolve() / ".cursor" / "rules" / CURSOR_RULE
+    elif args.output:
+        main_output.path = Path(args.output)
+        main_output.compression = compression_for(main_output.path, args.compress)
+
+    writes_file = main_output.path is not None
+    _fail_on_conflict(
+        parser,
+        [
+            (
+                targets and (args.index or args.update or args.processes),
+                "Several outputs cannot be combined with --index, --update or --processes",
+            ),
+            (
+                (args.index or args.update) and not writes_file,
+                "--index and --update require --output or --cursor",
+            ),
+            (
+                args.update and needs_working_tree,
+                "--update needs a working tree, not --rev or an archive",
+            ),
+            (
+                args.update and (outline_policy or args.boilerplate),
+                "--update cannot be combined with outline options or --boilerplate",
+            ),
+            (
+                args.processes and args.boilerplate,
+                "--processes cannot be combined with --boilerplate",
+            ),
+            (args.processes and not writes_file, "--processes requires --output or --cursor"),
+            (
+                args.processes and needs_working_tree,
+                "--processes needs a working tree, not --rev or an archive",
+            ),
+            (
+                args.processes and (args.index or args.update or args.outline_budget is not None),
+                "--processes cannot be combined with --index, --update or --outline-budget",
+            ),
+            (
+                main_output.compression and (args.index or args.update or args.processes),
+                "Compressed output cannot be combined with --index, --update or --processes",
+            ),
+        ],
+    )
+    outputs = [main_output, *targets]
+    try:
+        check_compression_options(args, [output.compression for output in outputs])
+    except ValueError as e:
+        parser.error(str(e))
+    return outputs
 
-        # Get the absolute path to the repository
-        repo_path = Path(args.repo_path).resolve()
 
-        # Create the .cursor/rules directory if it doesn't exist
-        cursor_dir = repo_path / ".cursor" / "rules"
-        cursor_dir.mkdir(parents=True, exist_ok=True)
+def run(args: argparse.Namespace, outputs: list[OutputTarget]) -> int:
+    """
+    Run the mode the command line selects.
 
-        # Set the output file path
-        output_file = cursor_dir / "entire-codebase.mdc"
+    Args:
+        args: The validated command line
+        outputs: The outputs planned by validate_args
 
+    Returns:
+        The exit status
+    """
+    if args.cursor_split:
+        return write_split_cursor_rules(args)
     try:
-        if output_file:
-            # Create parent directories if they don't exist
-            output_file.parent.mkdir(parents=True, exist_ok=True)
-
-            # Open the file for writing
-            file_handle = output_file.open("w", encoding="utf-8")
-
-            # Create a writer function that writes to the file
-            def file_writer(text: str) -> Any:
-                file_handle.write(text)
-                return None
-
-            output_stream = file_writer
-            logging.info("Writing prompt to file: %s", output_file)
-
-            try:
-                generate_prompt(
-                    Path(args.repo_path),
-                    args.exclude or [],
-                    args.include or [],
-                    output_stream=output_stream,
-                    respect_gitignore=not args.no_gitignore,
-                )
-            finally:
-                # Ensure the file is closed
-                file_handle.close()
+        if len(outputs) > 1:
+            write_outputs(args, outputs)
+        elif args.update:
+            update_output(args, outputs[0])
+        elif args.processes:
+            write_output_parallel(args, outputs[0])
         else:
-            # Use default stdout output
-            generate_prompt(
-                Path(args.repo_path),
-                args.exclude or [],
-                args.include or [],
-                output_stream=None,
-                respect_gitignore=not args.no_gitignore,
-            )
+            write_output(args, outputs[0])
+    except OutputClosedError:
+        # The reader exited early (e.g. `| head`), which is not an error
+        silence_stdout()
+        return 0
     except (OSError, ValueError, FileNotFoundError):
         logging.exception("Error generating prompt!")
         return 1
@@ -122,5 +518,227 @@ def main() -> int | None:
     return 0
 
 
+def write_split_cursor_rules(args: argparse.Namespace) -> int:
+    """Write one Cursor rule per top-level directory and return the exit status."""
+    # Modes other than a plain prompt are imported only when selected
+    from codebase_prompt_gen.cursor import write_cursor_rules
+
+    try:
+        statuses = write_cursor_rules(
+            Path(args.repo_path),
+            args.exclude or [],
+            args.include or [],
+            respect_gitignore=not args.no_gitignore,
+            skip_generated=not args.include_generated,
+            follow_symlinks=args.follow_symlinks,
+            max_workers=args.jobs,
+            scan_workers=args.scan_workers,
+        )
+    except (OSError, ValueError):
+        logging.exception("Error writing Cursor rules!")
+        return 1
+    for filename, status in statuses.items():
+        logging.info("Cursor rule %s: %s", filename, status)
+    return 0
+
+
+def update_output(args: argparse.Namespace, output: OutputTarget) -> None:
+    """Bring an indexed output file up to date with --update."""
+    from codebase_prompt_gen.index import update_prompt_file
+
+    output.path.parent.mkdir(parents=True, exist_ok=True)
+    mode = update_prompt_file(
+        Path(args.repo_path),
+        output.path,
+        args.exclude or [],
+        output.include_patterns,
+        respect_gitignore=not args.no_gitignore,
+        skip_generated=not args.include_generated,
+        output_format=output.output_format,
+        follow_symlinks=args.follow_symlinks,
+        scan_workers=args.scan_workers,
+        tree_style=output.tree_style,
+    )
+    logging.info("Prompt file %s updated (%s)", output.path, mode)
+
+
+def write_output_parallel(args: argparse.Namespace, output: OutputTarget) -> None:
+    """Write an output file, rendering its sections in --processes processes."""
+    from codebase_prompt_gen.parallel import write_prompt_file_parallel
+
+    output.path.parent.mkdir(parents=True, exist_ok=True)
+    logging.info("Writing prompt to file: %s", output.path)
+    write_prompt_file_parallel(
+        Path(args.repo_path),
+        output.path,
+        args.exclude or [],
+        output.include_patterns,
+        processes=args.processes,
+        respect_gitignore=not args.no_gitignore,
+        skip_generated=not args.include_generated,
+        output_format=output.output_format,
+        follow_symlinks=args.follow_symlinks,
+        outline_policy=output.outline_policy or None,
+        scan_workers=args.scan_workers,
+        tree_style=output.tree_style,
+    )
+
+
+def write_output(args: argparse.Namespace, output: OutputTarget) -> None:
+    """Write a single prompt to its file, with an optional index, or to standard output."""
+    index_file = None
+    if output.path is None:
+        sink = stdout_sink(args.flush)
+    else:
+        # Create parent directories if they don't exist
+        output.path.parent.mkdir(parents=True, exist_ok=True)
+        # Writes are buffered and encoded in large blocks
+        sink = open_output_sink(args, output.path, output.compression)
+        logging.info("Writing prompt to file: %s", output.path)
+        if args.index:
+            from codebase_prompt_gen.index import index_path_for
+
+            index_file = index_path_for(output.path)
+
+    with sink:
+        generate_prompt(
+            Path(args.repo_path),
+            args.exclude or [],
+            output.include_patterns,
+            output_stream=sink.write,
+            respect_gitignore=not args.no_gitignore,
+            skip_generated=not args.include_generated,
+            output_format=output.output_format,
+            follow_symlinks=args.follow_symlinks,
+            index_file=index_file,
+            rev=args.rev,
+            strip_components=args.strip_components,
+            outline_policy=output.outline_policy or None,
+            scan_workers=args.scan_workers,
+            tree_style=output.tree_style,
+            boilerplate=output.boilerplate,
+        )
+
+
+def check_compression_options(args: argparse.Namespace, compressions: list[str | None]) -> None:
+    """
+    Check the compression options against the outputs they apply to.
+
+    Args:
+        args: The parsed command line
+        compressions: Compression method of every output, None for plain ones
+
+    Raises:
+        ValueError: If an option is given without compressed output, or a
+                    method cannot be used with the options
+    """
+    methods = sorted({method for method in compressions if method})
+    if (args.compress_level is not None or args.compress_threads is not None) and not methods:
+        msg = "--compress-level and --compress-threads require a compressed output"
+        raise ValueError(msg)
+    for method in methods:
+        check_compression(method, args.compress_threads)
+
+
+def open_output_sink(
+    args: argparse.Namespace, output_file: Path, compression: str | None
+) -> OutputSink:
+    """
+    Open an output file behind a buffered sink.
+
+    Args:
+        args: The parsed command line, for the compression and flush options
+        output_file: The file to write
+        compression: Compression method, or None to write UTF-8 text
+
+    Returns:
+        A sink that closes the file when it is closed
+    """
+    flush_policy = args.flush or FLUSH_FULL
+    if compression:
+        from codebase_prompt_gen.compress import CompressedWriter
+
+        # Compression runs on its own thread, overlapping the scan
+        writer = CompressedWriter(
+            output_file,
+            compression,
+            level=args.compress_level,
+            threads=args.compress_threads,
+        )
+        return OutputSink(writer, flush_policy, binary=False, close_stream=True)
+    # Binary output keeps newlines untranslated, as the index's byte offsets require
+    return OutputSink(output_file.open("wb"), flush_policy, close_stream=True)
+
+
+def write_outputs(args: argparse.Namespace, outputs: list[OutputTarget]) -> None:
+    """
+    Write several prompts from a single scan of the repository.
+
+    Args:
+        args: The parsed command line
+        outputs: The outputs to write; one with no path goes to standard output
+
+    Raises:
+        OSError: If an output cannot be written
+        ValueError: If an output's settings are invalid
+    """
+    with contextlib.ExitStack() as stack:
+        prompt_targets = []
+        for output in outputs:
+            if output.path is None:
+                sink = stack.enter_context(stdout_sink(args.flush))
+            else:
+                output.path.parent.mkdir(parents=True, exist_ok=True)
+                sink = stack.enter_context(open_output_sink(args, output.path, output.compression))
+                logging.info("Writing prompt to file: %s", output.path)
+            prompt_targets.append(output.prompt_target(sink.write))
+
+        generate_prompts(
+            Path(args.repo_path),
+            args.exclude or [],
+            prompt_targets,
+            respect_gitignore=not args.no_gitignore,
+            skip_generated=not args.include_generated,
+            follow_symlinks=args.follow_symlinks,
+            rev=args.rev,
+            strip_components=args.strip_components,
+            scan_workers=args.scan_workers,
+        )
+
+
+def print_tree_sizes(args: argparse.Namespace) -> int:
+    """Scan the repository once and print the size of every tree rendering."""
+    try:
+        repo_path = Path(args.repo_path).resolve(strict=True)
+        with open_source(
+            repo_path,
+            args.exclude or [],
+            args.include or [],
+            follow_symlinks=args.follow_symlinks,
+            rev=args.rev,
+            strip_components=args.strip_components,
+            scan_workers=args.scan_workers,
+            respect_gitignore=not args.no_gitignore,
+            skip_generated=not args.include_generated,
+        ) as source:
+            tree_entries, _ = scan_source(
+                source,
+                args.exclude or [],
+                args.include or [],
+                respect_gitignore=not args.no_gitignore,
+                skip_generated=not args.include_generated,
+            ).select()
+    except (OSError, ValueError):
+        logging.exception("Error scanning repository!")
+        return 1
+
+    sizes = tree_rendering_sizes(tree_entries, args.tree_summarize_above)
+    width = max(len(name) for name in sizes)
+    print(f"{'Tree rendering':<{width}}  {'Lines':>8}  {'Bytes':>10}")
+    for name, (lines, size) in sizes.items():
+        print(f"{name:<{width}}  {lines:>8}  {size:>10}")
+    return 0
+
+
 if __name__ == "__main__":
     sys.exit(main())
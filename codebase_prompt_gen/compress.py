@@ -0,0 +1,196 @@
+"""
+Compressed output files written as a stream.
+
+A CompressedWriter accepts text like any other output stream and hands it to
+a background thread that encodes and compresses it into the file. The
+compressors release the GIL while they work, so compression overlaps with
+walking and reading the repository instead of adding to it.
+"""
+
+import importlib.util
+import threading
+from pathlib import Path
+from types import TracebackType
+from typing import IO, Any
+
+# Compression methods by file name suffix
+COMPRESSION_SUFFIXES = {".gz": "gzip", ".xz": "xz", ".zst": "zstd"}
+
+# Text chunks waiting to be compressed before write() blocks
+QUEUE_SIZE = 64
+
+
+def zstd_available() -> bool:
+    """Return True if the running Python has compression.zstd (3.14+)."""
+    # Looked up without importing it, since this runs for every --help
+    try:
+        return importlib.util.find_spec("compression.zstd") is not None
+    except ImportError:
+        return False
+
+
+def available_compressions() -> list[str]:
+    """Return the compression methods supported by the running Python."""
+    return ["gzip", "xz", *(["zstd"] if zstd_available() else [])]
+
+
+def compression_for(output_file: Path, method: str | None = None) -> str | None:
+    """
+    Pick the compression method for an output file.
+
+    Args:
+        output_file: The output file; its suffix selects a method
+        method: An explicitly requested method, which takes precedence
+
+    Returns:
+        The method name, or None to write uncompressed text
+    """
+    if method is not None:
+        return method
+    return COMPRESSION_SUFFIXES.get(output_file.suffix.lower())
+
+
+def _open_compressed(
+    raw: IO[bytes], method: str, level: int | None, threads: int | None
+) -> IO[bytes]:
+    """Wrap a binary file in a compressing file object."""
+    # Compression modules are imported only for the method in use
+    if method == "gzip":
+        import gzip
+
+        # A fixed mtime keeps snapshots of the same tree byte-identical
+        return gzip.GzipFile(
+            fileobj=raw, mode="wb", compresslevel=9 if level is None else level, mtime=0
+        )
+    if method == "xz":
+        import lzma
+
+        return lzma.LZMAFile(raw, "wb", preset=level)
+    if method == "zstd":
+        from compression import zstd
+
+        options: dict[Any, int] = {}
+        if level is not None:
+            options[zstd.CompressionParameter.compression_level] = level
+        if threads is not None:
+            options[zstd.CompressionParameter.nb_workers] = threads
+        return zstd.ZstdFile(raw, "wb", options=options or None)
+    msg = f"Unknown compression method: {method!r}"
+    raise ValueError(msg)
+
+
+def check_compression(method: str, threads: int | None = None) -> None:
+    """
+    Check that a compression method and its options can be used.
+
+    Raises:
+        ValueError: If the method is unknown or unavailable, or does not
+                    support the requested threads
+    """
+    if method == "zstd" and not zstd_available():
+        msg = "zstd compression needs Python 3.14 or later (compression.zstd)"
+        raise ValueError(msg)
+    if method not in COMPRESSION_SUFFIXES.values():
+        choices = ", ".join(available_compressions())
+        msg = f"Unknown compression method: {method!r} (choose from {choices})"
+        raise ValueError(msg)
+    if threads is not None and method != "zstd":
+        msg = f"{method} does not support compression threads; only zstd does"
+        raise ValueError(msg)
+
+
+class CompressedWriter:
+    """
+    Output stream that compresses text into a file on a background thread.
+
+    Use it as the output_stream of generate_prompt:
+
+        with CompressedWriter(Path("prompt.md.zst"), "zstd") as writer:
+            generate_prompt(repo, [], [], output_stream=writer.write)
+    """
+
+    def __init__(
+        self,
+        output_file: Path,
+        method: str,
+        level: int | None = None,
+        threads: int | None = None,
+    ) -> None:
+        """
+        Open the output file and start the compression thread.
+
+        Args:
+            output_file: The file to write
+            method: "gzip", "xz" or "zstd"
+            level: Compression level (gzip 0-9, xz preset 0-9, zstd level);
+                   None uses the method's default
+            threads: Worker threads inside the compressor (zstd only)
+
+        Raises:
+            ValueError: If the method or its options are not supported
+        """
+        check_compression(method, threads)
+        self._raw = output_file.open("wb")
+        try:
+            self._compressed = _open_compressed(self._raw, method, level, threads)
+        except Exception:
+            self._raw.close()
+            raise
+        import queue
+
+        self._queue: queue.Queue[str | None] = queue.Queue(maxsize=QUEUE_SIZE)
+        self._error: BaseException | None = None
+        self._thread = threading.Thread(
+            target=self._run, name="codebase-prompt-compress", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self) -> None:
+        while (text := self._queue.get()) is not None:
+            if self._error is not None:
+                continue  # Drain the queue so writers never block on a dead stage
+            try:
+                self._compressed.write(text.encode("utf-8"))
+            except BaseException as e:  # Re-raised in the writing thread
+                self._error = e
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            raise self._error
+
+    def write(self, text: str) -> None:
+        """
+        Queue text for compression.
+
+        Raises:
+            OSError: If compressing or writing an earlier chunk failed
+        """
+        self._raise_error()
+        self._queue.put(text)
+
+    def close(self) -> None:
+        """
+        Compress the remaining text, finish the stream and close the file.
+
+        Raises:
+            OSError: If compressing or writing failed
+        """
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        try:
+            self._compressed.close()
+        finally:
+            self._raw.close()
+        self._raise_error()
+
+    def __enter__(self) -> "CompressedWriter":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
@@ -1,17 +1,45 @@
+import contextlib
 import fnmatch  # Import fnmatch
 import logging
-import subprocess
-import sys
-from collections.abc import Callable
-from pathlib import Path
-from typing import Any
-
-from gitignore_parser import parse_gitignore
+import os
+import stat as stat_module
+from collections.abc import Callable, Hashable, Iterable, Iterator
+from pathlib import Path, PurePosixPath
+from typing import TYPE_CHECKING, Any
+
+from codebase_prompt_gen.gitconfig import global_excludes_file
+from codebase_prompt_gen.planning import IncludePlan
+from codebase_prompt_gen.progress import (
+    PHASE_DONE,
+    PHASE_WALK,
+    PHASE_WRITE,
+    CancellationToken,
+    ProgressObserver,
+    PromptCancelledError,
+)
+from codebase_prompt_gen.renderers import PromptRenderer, get_renderer
+from codebase_prompt_gen.sinks import OutputClosedError, stdout_sink
+from codebase_prompt_gen.sources import InputSource, SourceEntry
+from codebase_prompt_gen.tree import TreeStyle, render_tree
+
+# Stages a run may not need are imported where they are used, to keep start-up fast
+if TYPE_CHECKING:
+    from codebase_prompt_gen.boilerplate import BoilerplateBlock
+    from codebase_prompt_gen.classify import FileClassifier
+    from codebase_prompt_gen.outline import OutlinePolicy
+    from codebase_prompt_gen.scan import PromptTarget, ScanResult
 
 # Set of patterns that should always be excluded
 ALWAYS_EXCLUDE = {".git", ".git/", ".git/**"}
 
 
+def parse_gitignore(gitignore_path: Path, base_dir: Path | None = None) -> Callable[[str], bool]:
+    """Parse a gitignore file, importing gitignore_parser only when one exists."""
+    from gitignore_parser import parse_gitignore as parse
+
+    return parse(gitignore_path, base_dir)
+
+
 def get_gitignore_matcher(gitignore_path: Path, root_path: Path) -> Callable[[Path], bool]:
     """
     Get a matcher function for a gitignore file.
@@ -60,6 +88,11 @@ def generate_file_tree(
     exclude_patterns: list[str],
     include_patterns: list[str],
     respect_gitignore: bool = True,
+    *,
+    follow_symlinks: bool = False,
+    scan_workers: int | None = None,
+    tree_style: TreeStyle | None = None,
+    skip_generated: bool = True,
 ) -> tuple[list[str], list[tuple[Path, Callable[[], str]]]]:
     """
     Generate a file tree structure for a given directory, respecting includes/excludes.
@@ -69,6 +102,15 @@ def generate_file_tree(
         exclude_patterns: List of glob patterns to exclude
         include_patterns: List of glob patterns to include (files only)
         respect_gitignore: Whether to respect .gitignore files
+        follow_symlinks: Whether to descend into symlinked directories. Every
+                         directory and file is visited once per (st_dev, st_ino);
+                         later paths to it are listed as references to the first.
+        scan_workers: Number of threads listing directories concurrently (None
+                      walks serially). The result does not depend on it.
+        tree_style: How to render the file tree (default: flat, one full path
+                    per line)
+        skip_generated: Whether to list generated, vendored and lock files in
+                        the tree as skipped, without their content
 
     Returns:
         Tuple of (file_tree, files_content) where file_tree is a list of
@@ -76,113 +118,362 @@ def generate_file_tree(
         files_content is a list of tuples, each containing the relative
         file path and a function to get its content.
     """
-    file_tree: list[str] = []
-    files_to_read: list[tuple[Path, Callable[[], str]]] = (
-        []
-    )  # Store (relative_path, content_getter)
-    combined_exclude = set(exclude_patterns) | ALWAYS_EXCLUDE
+    return generate_file_tree_from_source(
+        FilesystemSource(
+            root_dir,
+            follow_symlinks=follow_symlinks,
+            include_plan=IncludePlan(include_patterns),
+            scan_workers=scan_workers,
+        ),
+        exclude_patterns,
+        include_patterns,
+        respect_gitignore=respect_gitignore,
+        tree_style=tree_style,
+        skip_generated=skip_generated,
+    )
 
-    # Set up gitignore matcher if requested
-    gitignore_matcher: Callable[[Path], bool] = lambda _: False
 
-    if respect_gitignore:
-        local_gitignore_path = root_dir / ".gitignore"
-        local_matcher = get_gitignore_matcher(local_gitignore_path, root_dir)
+def get_global_gitignore_path() -> Path | None:
+    """Return the user's global gitignore file (core.excludesfile), if it exists."""
+    try:
+        return global_excludes_file()
+    except Exception as e:
+        logging.warning("Unexpected error getting global gitignore: %s", e)
+    return None
 
-        global_matcher: Callable[[Path], bool] = lambda _: False
 
-        # Try to get global gitignore matcher too
-        try:
-            result = subprocess.run(
-                ["git", "config", "--global", "--get", "core.excludesfile"],
-                capture_output=True,
-                text=True,
-                check=False,
-                encoding="utf-8",  # Explicitly set encoding
-            )
-            if result.returncode == 0 and result.stdout and result.stdout.strip():
-                global_gitignore_path = Path(result.stdout.strip()).expanduser()
-                if global_gitignore_path.exists():
-                    global_matcher = get_gitignore_matcher(global_gitignore_path, root_dir)
-                else:
-                    logging.debug("Global gitignore file not found at: %s", global_gitignore_path)
+def generate_file_tree_from_source(
+    source: InputSource,
+    exclude_patterns: list[str],
+    include_patterns: list[str],
+    *,
+    respect_gitignore: bool = True,
+    observer: ProgressObserver | None = None,
+    cancel_token: CancellationToken | None = None,
+    tree_style: TreeStyle | None = None,
+    skip_generated: bool = True,
+) -> tuple[list[str], list[tuple[Path, Callable[[], str]]]]:
+    """
+    Generate a file tree structure for any input source, respecting includes/excludes.
 
-        except (subprocess.SubprocessError, FileNotFoundError) as e:
-            # Git not installed or other error
-            logging.debug("Could not get global gitignore: %s", e)
-        except Exception as e:
-            logging.warning("Unexpected error getting global gitignore: %s", e)
+    Args:
+        source: The input source to list
+        exclude_patterns: List of glob patterns to exclude
+        include_patterns: List of glob patterns to include (files only)
+        respect_gitignore: Whether to respect .gitignore files
+        observer: Optional observer notified of every entry walked and of the
+                  final selection
+        cancel_token: Optional token checked before every entry
+        tree_style: How to render the file tree (default: flat)
+        skip_generated: Whether to list generated, vendored and lock files in
+                        the tree as skipped, without their content
 
-        def combined_matcher(path: Path) -> bool:
-            return local_matcher(path) or global_matcher(path)
+    Returns:
+        Tuple of (file_tree, files_content), as returned by generate_file_tree.
 
-        gitignore_matcher = combined_matcher
+    Raises:
+        PromptCancelledError: If cancel_token is cancelled during the walk
+    """
+    scan = scan_source(
+        source,
+        exclude_patterns,
+        include_patterns,
+        respect_gitignore=respect_gitignore,
+        observer=observer,
+        cancel_token=cancel_token,
+        skip_generated=skip_generated,
+    )
+    tree_entries, files_to_read = scan.select()
+    return render_tree(tree_entries, tree_style), files_to_read
 
-    for path in sorted(root_dir.rglob("*")):
-        try:
-            rel_path = path.relative_to(root_dir)
-            rel_path_str = str(rel_path)
-        except ValueError:
-            # Should not happen with rglob starting from root_dir, but handle defensively
-            logging.warning("Path %s could not be made relative to %s", path, root_dir)
-            continue
 
-        # --- Exclusion checks ---
+def scan_source(
+    source: InputSource,
+    exclude_patterns: list[str],
+    include_patterns: list[str],
+    *,
+    respect_gitignore: bool = True,
+    observer: ProgressObserver | None = None,
+    cancel_token: CancellationToken | None = None,
+    skip_generated: bool = True,
+) -> "ScanResult":
+    """
+    Walk an input source once, respecting includes/excludes.
 
-        # 1. Check explicit exclude patterns and ALWAYS_EXCLUDE
-        # We check against the relative path string.
-        # Add '/' suffix check for directory patterns like 'node_modules/'
-        is_explicitly_excluded = any(
-            fnmatch.fnmatch(rel_path_str, pattern)
-            or (path.is_dir() and fnmatch.fnmatch(rel_path_str + "/", pattern))
-            for pattern in combined_exclude
-        )
-        if is_explicitly_excluded:
-            if path.is_dir():
-                logging.debug(
-                    "Excluding directory and its contents based on exclude patterns: %s", rel_path
-                )
-                # To prevent rglob from descending into excluded directories,
-                # this check ideally happens before yielding, but rglob yields all paths first.
-                # We rely on filtering *after* rglob generates the path.
-                # A future optimization might involve os.walk for finer control.
-            else:
-                logging.debug("Excluding file based on exclude patterns: %s", rel_path)
-            continue  # Skip this path
+    Takes the same arguments as generate_file_tree_from_source. Files are not
+    read, apart from the first block of local files for the generated-file
+    signals; outputs select their entries from the result with
+    ScanResult.select.
+
+    Returns:
+        The directories and files that passed the excludes, .gitignore and
+        include patterns, in walk order
+    """
+    from codebase_prompt_gen.scan import ScanResult
+
+    scan = ScanResult(
+        source.name,
+        include_patterns=include_patterns,
+        prunes_directories=isinstance(source, FilesystemSource),
+        root=source.root_dir if isinstance(source, FilesystemSource) else None,
+    )
+    combined_exclude = set(exclude_patterns) | ALWAYS_EXCLUDE
+    include_plan = IncludePlan(include_patterns)
+
+    is_ignored = _source_gitignore_matcher(source) if respect_gitignore else None
+    classifier = _source_classifier(source) if skip_generated else None
+    # Directories listed as skipped; nothing below them is listed
+    skipped_dirs: set[Path] = set()
+
+    # Files whose content the outputs may read
+    selected_paths: list[Path] = []
+    # Files already kept, keyed by their source identity, only tracked for an observer
+    seen_files: set[Hashable] = set()
+    selected_count = 0
+    selected_bytes = 0
+
+    for entry in source.entries():
+        if cancel_token is not None:
+            cancel_token.raise_if_cancelled()
+        rel_path = entry.path
+        rel_path_str = str(rel_path)
 
-        # 2. Check gitignore patterns (if enabled)
-        # Pass the absolute path to the matcher wrapper for robust matching
-        if respect_gitignore and gitignore_matcher(path):
-            logging.debug("Excluding path based on gitignore: %s", rel_path)
+        # --- Exclusion checks ---
+        if _is_walk_excluded(entry, combined_exclude, is_ignored, skipped_dirs):
+            if observer is not None:
+                observer.entry_walked(rel_path, entry.is_dir, True)
             continue  # Skip this path
 
         # --- Inclusion logic ---
 
         # Handle directories: Add to tree if not excluded/ignored
-        if path.is_dir():
-            file_tree.append(f"📁 {rel_path}/")  # Add trailing slash for clarity
+        if entry.is_dir:
+            reason = classifier.classify_dir(rel_path) if classifier is not None else None
+            if reason is not None:
+                logging.debug("Skipping %s directory: %s", reason, rel_path)
+                skipped_dirs.add(rel_path)
+                scan.skipped[rel_path] = reason
+            if observer is not None:
+                observer.entry_walked(rel_path, True, reason is not None)
+            # A directory already walked via another path (or a cycle) references it
+            scan.entries.append(entry)
             continue  # Handled directory, move to the next path
 
         # Handle files: Check include patterns if they exist
-        elif path.is_file():
-            should_include_file = True  # Default to include
-            if include_patterns:
-                # If include_patterns are specified, the file MUST match at least one
-                should_include_file = any(
-                    fnmatch.fnmatch(rel_path_str, pattern) for pattern in include_patterns
-                )
+        if not include_plan.matches(rel_path_str) or entry.read is None:
+            logging.debug("Skipping file %s due to not matching include patterns", rel_path)
+            if observer is not None:
+                observer.entry_walked(rel_path, False, True)
+            continue
 
-            if should_include_file:
-                logging.debug("Including file: %s", rel_path)
-                file_tree.append(f"📄 {rel_path}")
-                # Store relative path for the tree/prompt, and a getter capturing the absolute path
-                files_to_read.append((rel_path, build_file_content_getter(path)))
-            else:
-                logging.debug("Skipping file %s due to not matching include patterns", rel_path)
+        # Generated, vendored and lock files are listed but not read
+        if classifier is not None:
+            reason = classifier.classify_file(rel_path, entry.read_head)
+            if reason is not None:
+                logging.debug("Skipping %s file: %s", reason, rel_path)
+                scan.skipped[rel_path] = reason
+                scan.entries.append(entry)
+                if observer is not None:
+                    observer.entry_walked(rel_path, False, True)
+                continue
+
+        logging.debug("Including file: %s", rel_path)
+        scan.entries.append(entry)
+        selected_paths.append(rel_path)
+        if observer is not None:
+            # Each underlying file is read once, however many paths lead to it
+            duplicate = entry.identity is not None and entry.identity in seen_files
+            observer.entry_walked(rel_path, False, duplicate)
+            if not duplicate:
+                if entry.identity is not None:
+                    seen_files.add(entry.identity)
+                selected_count += 1
+                selected_bytes += entry.size or 0
+
+    source.expect_reads(selected_paths)
+    if observer is not None:
+        observer.files_selected(selected_count, selected_bytes)
+    return scan
+
+
+def _source_gitignore_matcher(source: InputSource) -> Callable[[Path], bool]:
+    """
+    Build a matcher for the source's .gitignore and the global excludes file.
 
-        # Note: Symlinks and other file types are currently ignored by this logic
+    Returns:
+        A function that returns True if a path relative to the source root
+        is ignored
+    """
+    local_matcher: Callable[[Path], bool] = lambda _: False
+    global_matcher: Callable[[Path], bool] = lambda _: False
+    match_root = Path().absolute()
+
+    local_gitignore = source.gitignore_file()
+    if local_gitignore is not None:
+        local_gitignore_path, match_root = local_gitignore
+        match_root = match_root.absolute()
+        local_matcher = get_gitignore_matcher(local_gitignore_path, match_root)
+
+    # Try to get global gitignore matcher too
+    global_gitignore_path = get_global_gitignore_path()
+    if global_gitignore_path is not None:
+        global_matcher = get_gitignore_matcher(global_gitignore_path, match_root)
+
+    def is_ignored(rel_path: Path) -> bool:
+        # Pass the absolute path to the matchers for robust matching
+        path = match_root / rel_path
+        return local_matcher(path) or global_matcher(path)
+
+    return is_ignored
+
+
+def _source_classifier(source: InputSource) -> "FileClassifier":
+    """Build the generated-file classifier from the source's .gitattributes."""
+    from codebase_prompt_gen.classify import FileClassifier
+
+    gitattributes = source.gitattributes()
+    return FileClassifier(gitattributes.decode("utf-8", errors="replace") if gitattributes else "")
+
+
+def _is_walk_excluded(
+    entry: SourceEntry,
+    combined_exclude: set[str],
+    is_ignored: Callable[[Path], bool] | None,
+    skipped_dirs: set[Path],
+) -> bool:
+    """Check an entry against the exclude patterns, .gitignore and skipped directories."""
+    rel_path = entry.path
+    # 1. Check explicit exclude patterns and ALWAYS_EXCLUDE
+    # Add '/' suffix check for directory patterns like 'node_modules/'
+    if _is_explicitly_excluded(str(rel_path), entry.is_dir, combined_exclude):
+        if entry.is_dir:
+            logging.debug(
+                "Excluding directory and its contents based on exclude patterns: %s", rel_path
+            )
+        else:
+            logging.debug("Excluding file based on exclude patterns: %s", rel_path)
+        return True
+
+    # 2. Check gitignore patterns (if enabled)
+    if is_ignored is not None and is_ignored(rel_path):
+        logging.debug("Excluding path based on gitignore: %s", rel_path)
+        return True
+
+    # 3. Skip everything below a vendored directory
+    return bool(skipped_dirs) and not skipped_dirs.isdisjoint(rel_path.parents)
+
+
+def _member_selector(
+    source: InputSource,
+    combined_exclude: set[str],
+    *,
+    respect_gitignore: bool,
+    skip_generated: bool,
+) -> Callable[[PurePosixPath], bool]:
+    """
+    Build a predicate telling whether scan_source may select a file of the source.
 
-    return file_tree, files_to_read
+    The predicate applies the checks of scan_source to the file and its parent
+    directories, with the source's .gitignore and .gitattributes as they are
+    known when it is built. Content signals are not checked.
+    """
+    is_ignored = _source_gitignore_matcher(source) if respect_gitignore else None
+    classifier = _source_classifier(source) if skip_generated else None
+
+    def may_select(path: PurePosixPath) -> bool:
+        rel_path = Path(path)
+        skipped_dirs: set[Path] = set()
+        for parent in reversed(rel_path.parents[:-1]):
+            parent_entry = SourceEntry(parent, is_dir=True)
+            if _is_walk_excluded(parent_entry, combined_exclude, is_ignored, skipped_dirs):
+                continue
+            if classifier is not None and classifier.classify_dir(parent) is not None:
+                skipped_dirs.add(parent)
+        entry = SourceEntry(rel_path, is_dir=False)
+        if _is_walk_excluded(entry, combined_exclude, is_ignored, skipped_dirs):
+            return False
+        return classifier is None or classifier.classify_file(rel_path) is None
+
+    return may_select
+
+
+def _is_explicitly_excluded(rel_path_str: str, is_dir: bool, patterns: Iterable[str]) -> bool:
+    """Check a relative path against exclude patterns, including 'dir/' forms."""
+    return any(
+        fnmatch.fnmatch(rel_path_str, pattern)
+        or (is_dir and fnmatch.fnmatch(rel_path_str + "/", pattern))
+        for pattern in patterns
+    )
+
+
+class FilesystemSource(InputSource):
+    """Input source that walks a directory on local disk."""
+
+    def __init__(
+        self,
+        root_dir: Path,
+        follow_symlinks: bool = False,
+        include_plan: IncludePlan | None = None,
+        scan_workers: int | None = None,
+    ) -> None:
+        """
+        Set up the walk.
+
+        Args:
+            root_dir: The directory to walk
+            follow_symlinks: Whether to descend into symlinked directories
+            include_plan: Optional plan of the include patterns; directories it
+                          rules out are listed but not descended into
+            scan_workers: Number of threads listing directories concurrently.
+                          None walks serially, which is fastest on local disks.
+        """
+        self.root_dir = root_dir
+        self.follow_symlinks = follow_symlinks
+        self.scan_workers = scan_workers
+        self.include_plan = include_plan if include_plan and include_plan.prunes else None
+        self.name = root_dir.name
+
+    def gitignore_file(self) -> tuple[Path, Path] | None:
+        return self.root_dir / ".gitignore", self.root_dir
+
+    def gitattributes(self) -> bytes | None:
+        try:
+            return (self.root_dir / ".gitattributes").read_bytes()
+        except OSError:
+            return None
+
+    def entries(self) -> Iterator[SourceEntry]:
+        root_dir = self.root_dir
+        # Directories reached again through a link, mapped to where they were first seen
+        dir_aliases: dict[Path, Path] = {}
+        descend = self.include_plan.may_contain if self.include_plan else None
+
+        from codebase_prompt_gen.walk import walk_sorted
+
+        for path, stat in walk_sorted(
+            root_dir, self.follow_symlinks, dir_aliases, descend, self.scan_workers
+        ):
+            if stat is None:
+                continue  # Broken symlinks are ignored
+            try:
+                rel_path = path.relative_to(root_dir)
+            except ValueError:
+                # Should not happen when walking from root_dir, but handle defensively
+                logging.warning("Path %s could not be made relative to %s", path, root_dir)
+                continue
+
+            if stat_module.S_ISDIR(stat.st_mode):
+                yield SourceEntry(rel_path, is_dir=True, alias=dir_aliases.get(path))
+            elif stat_module.S_ISREG(stat.st_mode):
+                yield SourceEntry(
+                    rel_path,
+                    is_dir=False,
+                    read=build_file_content_getter(path),
+                    size=stat.st_size,
+                    identity=(stat.st_dev, stat.st_ino) if self.follow_symlinks else None,
+                    read_head=build_file_head_reader(path),
+                )
+            # Note: Other file types (sockets, FIFOs, devices) are currently ignored
 
 
 def build_file_content_getter(file_path: Path) -> Callable[[], str]:
@@ -205,33 +496,237 @@ def build_file_content_getter(file_path: Path) -> Callable[[], str]:
     return get_content
 
 
+def build_file_head_reader(file_path: Path) -> Callable[[int], bytes]:
+    """Builds a closure that reads the first bytes of a file."""
+
+    def read_head(size: int) -> bytes:
+        try:
+            with file_path.open("rb") as f:
+                return f.read(size)
+        except OSError as e:
+            logging.debug("Error reading the start of %s: %s", file_path, e)
+            return b""
+
+    return read_head
+
+
+def open_source(
+    repo_path: Path,
+    exclude_patterns: list[str],
+    include_patterns: list[str],
+    *,
+    follow_symlinks: bool = False,
+    rev: str | None = None,
+    strip_components: int = 0,
+    scan_workers: int | None = None,
+    respect_gitignore: bool = True,
+    skip_generated: bool = True,
+) -> InputSource:
+    """
+    Open the input source for a repository path, revision or archive.
+
+    Args:
+        repo_path: Resolved path to a directory, or to a tar or zip archive
+        exclude_patterns: List of glob patterns to exclude
+        include_patterns: List of glob patterns to include (files only)
+        follow_symlinks: Whether to follow symlinked directories
+        rev: Optional git tree-ish to read instead of the working tree
+        strip_components: Number of leading path components to remove from
+                          archive members
+        scan_workers: Number of threads listing directories concurrently
+        respect_gitignore: Whether the scan will respect .gitignore files, so
+                           tar archives need not buffer ignored members
+        skip_generated: Whether the scan will skip generated files, so tar
+                        archives need not buffer them
+
+    Returns:
+        The input source, to be used as a context manager
+
+    Raises:
+        ValueError: If the revision or archive cannot be read
+    """
+    include_plan = IncludePlan(include_patterns)
+    # Sources other than the working tree are imported only when used
+    if rev:
+        from codebase_prompt_gen.git_source import GitRevSource
+
+        return GitRevSource(repo_path, rev)
+    if repo_path.is_file():
+        from codebase_prompt_gen.archive_source import open_archive_source
+
+        combined_exclude = set(exclude_patterns) | ALWAYS_EXCLUDE
+
+        def keep(path: PurePosixPath) -> bool:
+            # Archive members that can never be selected get no content getter
+            path_str = str(path)
+            excluded = _is_explicitly_excluded(path_str, False, combined_exclude)
+            return not excluded and include_plan.matches(path_str)
+
+        def selector(source: InputSource) -> Callable[[PurePosixPath], bool]:
+            return _member_selector(
+                source,
+                combined_exclude,
+                respect_gitignore=respect_gitignore,
+                skip_generated=skip_generated,
+            )
+
+        return open_archive_source(
+            repo_path, strip_components=strip_components, keep=keep, selector=selector
+        )
+    return FilesystemSource(
+        repo_path,
+        follow_symlinks=follow_symlinks,
+        include_plan=include_plan,
+        scan_workers=scan_workers,
+    )
+
+
 def generate_prompt(
     repo_path: Path,
     exclude_patterns: list[str],
     include_patterns: list[str],
     output_stream: Callable[[str], Any] | None = None,
     respect_gitignore: bool = True,
+    *,
+    output_format: str = "markdown",
+    index_file: Path | None = None,
+    follow_symlinks: bool = False,
+    rev: str | None = None,
+    strip_components: int = 0,
+    outline_policy: "OutlinePolicy | None" = None,
+    observer: ProgressObserver | None = None,
+    cancel_token: CancellationToken | None = None,
+    scan_workers: int | None = None,
+    tree_style: TreeStyle | None = None,
+    boilerplate: bool = False,
+    skip_generated: bool = True,
 ) -> None:
     """
     Generate a prompt for AI models containing the file tree and file contents.
 
     Args:
-        repo_path: Path to the Git repository root directory
+        repo_path: Path to the Git repository root directory, or to a tar or
+                   zip archive to read without extracting it
         exclude_patterns: List of glob patterns to exclude
         include_patterns: List of glob patterns to include (files only)
         output_stream: Optional callable that accepts a string and writes it
-                      (defaults to sys.stdout.write if None)
+                      (defaults to a buffered sink on standard output if None)
         respect_gitignore: Whether to respect .gitignore files
+        output_format: Name of the renderer to use ("markdown", "jsonl" or "xml")
+        index_file: Optional path of a sidecar index recording the byte range of
+                    every file section. The output stream must then write UTF-8
+                    without newline translation.
+        follow_symlinks: Whether to follow symlinked directories, reading files
+                         reached through several links only once
+        rev: Optional git tree-ish (branch, tag, commit) to read instead of the
+             working tree. Nothing is checked out.
+        strip_components: Number of leading path components to remove from
+                          archive members (like tar --strip-components)
+        outline_policy: Optional policy selecting files to emit as outlines
+                        (signatures and docstrings) instead of their full text
+        observer: Optional observer receiving progress events
+        cancel_token: Optional token that stops the run when cancelled. It is
+                      checked between directory entries and between files.
+        scan_workers: Number of threads listing directories concurrently, for
+                      high-latency filesystems. None walks serially.
+        tree_style: How to render the file tree (default: flat)
+        boilerplate: Whether to emit blocks of lines repeated at the start or
+                     end of many files once, replacing each copy by a reference
+        skip_generated: Whether to list generated, vendored and lock files in
+                        the tree as skipped, without their content
 
     Returns:
         None. Writes prompt using the provided output_stream or stdout.
+
+    Raises:
+        PromptCancelledError: If cancel_token is cancelled before the run completes
+        OutputClosedError: If the reader of the output went away, e.g. a closed pipe
+    """
+    from codebase_prompt_gen.scan import PromptTarget
+
+    # --- Output Handling ---
+    sink = None
+    if not output_stream:
+        sink = stdout_sink()
+        output_stream = sink.write
+    try:
+        generate_prompts(
+            repo_path,
+            exclude_patterns,
+            [
+                PromptTarget(
+                    output_stream,
+                    include_patterns=include_patterns,
+                    output_format=output_format,
+                    tree_style=tree_style,
+                    outline_policy=outline_policy,
+                    index_file=index_file,
+                    boilerplate=boilerplate,
+                )
+            ],
+            respect_gitignore=respect_gitignore,
+            follow_symlinks=follow_symlinks,
+            rev=rev,
+            strip_components=strip_components,
+            observer=observer,
+            cancel_token=cancel_token,
+            scan_workers=scan_workers,
+            skip_generated=skip_generated,
+        )
+    finally:
+        if sink is not None:
+            sink.flush()
+
+
+def generate_prompts(
+    repo_path: Path,
+    exclude_patterns: list[str],
+    targets: list["PromptTarget"],
+    *,
+    respect_gitignore: bool = True,
+    follow_symlinks: bool = False,
+    rev: str | None = None,
+    strip_components: int = 0,
+    observer: ProgressObserver | None = None,
+    cancel_token: CancellationToken | None = None,
+    scan_workers: int | None = None,
+    skip_generated: bool = True,
+) -> None:
+    """
+    Generate several prompts from a single walk of a repository.
+
+    The repository is walked once with the union of the targets' include
+    patterns, and every file is read at most once however many targets
+    select it. Each target gets its own file tree, format and outline budget.
+
+    Args:
+        repo_path: Path to the Git repository root directory, or to a tar or
+                   zip archive to read without extracting it
+        exclude_patterns: List of glob patterns to exclude from every target
+        targets: The prompts to write
+        respect_gitignore: Whether to respect .gitignore files
+        follow_symlinks: Whether to follow symlinked directories
+        rev: Optional git tree-ish to read instead of the working tree
+        strip_components: Number of leading path components to remove from
+                          archive members
+        observer: Optional observer receiving progress events
+        cancel_token: Optional token that stops the run when cancelled
+        scan_workers: Number of threads listing directories concurrently
+        skip_generated: Whether to list generated, vendored and lock files in
+                        the trees as skipped, without their content
+
+    Returns:
+        None. Writes each prompt using its target's output_stream.
+
+    Raises:
+        PromptCancelledError: If cancel_token is cancelled before the run completes
+        OutputClosedError: If a target's output stream reports its reader went away
     """
-    # Configure basic logging
-    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    # Fail fast on an unknown format, before any scanning happens
+    renderers = [get_renderer(target.output_format) for target in targets]
 
     try:
         repo_path_obj = Path(repo_path).resolve(strict=True)  # Ensure path exists
-        repo_name = repo_path_obj.name
     except FileNotFoundError:
         logging.exception("Repository path not found: %s", repo_path)
         print(f"Error: Repository path not found: {repo_path}")
@@ -240,61 +735,237 @@ def generate_prompt(
         logging.exception("Error resolving repository path %s", repo_path)
         return
 
+    from codebase_prompt_gen.scan import scan_include_patterns
+
+    include_patterns = scan_include_patterns(targets)
     logging.info("Generating file tree for %s", repo_path_obj)
+    if rev:
+        logging.info("Revision: %s", rev)
     logging.info("Exclude patterns: %s", exclude_patterns)
     logging.info("Include patterns: %s", include_patterns)
     logging.info("Respect gitignore: %s", respect_gitignore)
+    logging.info("Skip generated files: %s", skip_generated)
 
-    file_tree, files_content = generate_file_tree(
+    source = open_source(
         repo_path_obj,
         exclude_patterns,
         include_patterns,
+        follow_symlinks=follow_symlinks,
+        rev=rev,
+        strip_components=strip_components,
+        scan_workers=scan_workers,
         respect_gitignore=respect_gitignore,
+        skip_generated=skip_generated,
     )
 
-    # Build the prompt header
-    prompt_header = f"# Repository: {repo_name}\n\n"
-    prompt_header += "## File Tree Structure\n\n"
-    if file_tree:
-        prompt_header += "```\n" + "\n".join(file_tree) + "\n```"
-    else:
-        prompt_header += "No files or directories found matching the criteria."
-    prompt_header += "\n\n"
-    prompt_header += "## File Contents\n\n"
+    with source:
+        if observer is not None:
+            observer.phase_started(PHASE_WALK)
+        scan = scan_source(
+            source,
+            exclude_patterns,
+            include_patterns,
+            respect_gitignore=respect_gitignore,
+            observer=observer,
+            cancel_token=cancel_token,
+            skip_generated=skip_generated,
+        )
+        _write_prompts(
+            scan,
+            [_TargetWriter(target, renderer, scan) for target, renderer in zip(targets, renderers)],
+            observer=observer,
+            cancel_token=cancel_token,
+        )
 
-    # --- Output Handling ---
-    writer: Callable[[str], Any] = (
-        output_stream
-        if output_stream
-        else lambda text: print(text, end="", flush=True, file=sys.stdout)
-    )
 
+class _TargetWriter:
+    """Writes the prompt of one target while the files are read."""
+
+    def __init__(
+        self, target: "PromptTarget", renderer: PromptRenderer, scan: "ScanResult"
+    ) -> None:
+        self.target = target
+        self.renderer = renderer
+        tree_entries, files_content = scan.select(target.include_patterns)
+        self.file_tree = render_tree(tree_entries, target.tree_style)
+        self.files = {file_path for file_path, _ in files_content}
+        self.indexer = None
+        if target.index_file:
+            from codebase_prompt_gen.index import IndexingWriter, rendering_options
+
+            self.indexer = IndexingWriter(
+                target.output_stream,
+                renderer.name,
+                rendering_options(renderer.name, target.outline_policy, target.boilerplate),
+            )
+        # Bytes of file content emitted so far, for budget-based outlining
+        self.used = 0
+        # Repeated blocks found in this target's files, in order of their numbers
+        self.boilerplate: list[BoilerplateBlock] = []
+        self._strip_order: list[BoilerplateBlock] = []
+
+    def use_boilerplate(self, blocks: list["BoilerplateBlock"]) -> None:
+        """Keep the repeated blocks that were found in this target's files."""
+        self.boilerplate = [block for block in blocks if not block.paths.isdisjoint(self.files)]
+        # Longer blocks first, so a block is not cut short by a prefix of it
+        self._strip_order = sorted(self.boilerplate, key=lambda block: -block.line_count)
+
+    def write_header(self, repo_name: str) -> None:
+        header = self.renderer.header(repo_name, self.file_tree, self.boilerplate)
+        if self.indexer:
+            self.indexer.write_header(header)
+        else:
+            self.target.output_stream(header)
+
+    def write_section(self, file_path: Path, content: str, stat: os.stat_result | None) -> None:
+        is_outline = False
+        outline_policy = self.target.outline_policy
+        if outline_policy:
+            content, is_outline, size = outline_policy.apply(file_path, content, self.used)
+            self.used += size
+        if self.boilerplate and not is_outline:
+            from codebase_prompt_gen.boilerplate import strip_boilerplate
+
+            content = strip_boilerplate(content, self._strip_order)
+
+        if self.indexer:
+            parts = self.renderer.file_section_parts(file_path, content, is_outline)
+            self.indexer.write_section(file_path, content, parts, stat)
+        else:
+            self.target.output_stream(self.renderer.file_section(file_path, content, is_outline))
+
+    def write_footer(self) -> None:
+        footer = (self.renderer.empty() if not self.files else "") + self.renderer.footer()
+        if self.indexer:
+            self.indexer.write_footer(footer)
+            if self.target.index_file:
+                self.indexer.index.save(self.target.index_file)
+        else:
+            self.target.output_stream(footer)
+
+
+def _read_entry(
+    scan: "ScanResult",
+    entry: SourceEntry,
+    selected_by: list[_TargetWriter],
+    observer: ProgressObserver | None,
+) -> tuple[os.stat_result | None, str]:
+    """Read a scanned file, with its stat if a target records it in an index."""
+    # Stat before reading so a change during the read is caught next time
+    stat = None
+    if scan.root and any(w.indexer for w in selected_by):
+        with contextlib.suppress(OSError):
+            stat = (scan.root / entry.path).stat()
+    # Call the getter to read content only when needed
     try:
-        # Write header
-        writer(prompt_header)
-
-        # Write file contents incrementally
-        if not files_content:
-            writer("No file contents included based on criteria.\n")
-
-        for file_path, content_getter in files_content:
-            # Use the relative path for display
-            relative_path_str = str(file_path)
-            writer(f"### `{relative_path_str}`\n\n")
-            # Determine language for markdown code block if possible (simple extension mapping)
-            lang = file_path.suffix.lstrip(".") if file_path.suffix else ""
-            writer(f"```{(lang)}\n")  # Add lang hint if available
-            # Call the getter to read content only when needed
-            try:
-                content = content_getter()
-                writer(content)
-            except Exception:
-                # Should be caught by getter, but as a fallback
-                logging.exception("Unexpected error getting content for %s", file_path)
-            writer("\n```\n\n")
+        content = entry.read() if entry.read is not None else ""
+    except Exception:
+        # Should be caught by getter, but as a fallback
+        logging.exception("Unexpected error getting content for %s", entry.path)
+        content = ""
+    if observer is not None:
+        observer.file_read(entry.path, len(content))
+    return stat, content
+
+
+def _detect_boilerplate(
+    scan: "ScanResult",
+    writers: list[_TargetWriter],
+    read_ahead: dict[Path, tuple[os.stat_result | None, str]],
+    observer: ProgressObserver | None = None,
+    cancel_token: CancellationToken | None = None,
+) -> list["BoilerplateBlock"]:
+    """
+    Find repeated blocks in a sample of the files selected by boilerplate targets.
 
-        logging.info("Prompt generation complete.")
+    The sampled files are kept in read_ahead, so they are still read only once.
+    """
+    from codebase_prompt_gen.boilerplate import MAX_SAMPLE_BYTES, SAMPLE_FILES, BoilerplateDetector
+
+    boilerplate_writers = [w for w in writers if w.target.boilerplate]
+    candidates = [
+        entry
+        for entry in scan.entries
+        if not entry.is_dir
+        and entry.read is not None
+        and (entry.size is None or entry.size <= MAX_SAMPLE_BYTES)
+        and any(entry.path in w.files for w in boilerplate_writers)
+    ]
+    # Spread the sample evenly, so blocks common to one part of the tree are found
+    step = max(1.0, len(candidates) / SAMPLE_FILES)
+    sample = [
+        candidates[int(number * step)] for number in range(min(len(candidates), SAMPLE_FILES))
+    ]
+
+    detector = BoilerplateDetector()
+    for entry in sample:
+        if cancel_token is not None:
+            cancel_token.raise_if_cancelled()
+        selected_by = [w for w in writers if entry.path in w.files]
+        stat, content = _read_entry(scan, entry, selected_by, observer)
+        read_ahead[entry.path] = (stat, content)
+        detector.add(entry.path, content)
+    blocks = detector.blocks()
+    logging.info("Found %d repeated blocks in %d sampled files", len(blocks), len(sample))
+    return blocks
+
+
+def _write_prompts(
+    scan: "ScanResult",
+    writers: list[_TargetWriter],
+    observer: ProgressObserver | None = None,
+    cancel_token: CancellationToken | None = None,
+) -> None:
+    """Read the scanned files once and write every target section by section."""
+    if observer is not None:
+        observer.phase_started(PHASE_WRITE)
+
+    try:
+        # Files read ahead for boilerplate detection, kept until they are written
+        read_ahead: dict[Path, tuple[os.stat_result | None, str]] = {}
+        if any(w.target.boilerplate for w in writers):
+            blocks = _detect_boilerplate(scan, writers, read_ahead, observer, cancel_token)
+            for target_writer in writers:
+                if target_writer.target.boilerplate:
+                    target_writer.use_boilerplate(blocks)
+
+        for target_writer in writers:
+            target_writer.write_header(scan.name)
+
+        # Write file contents incrementally, in walk order
+        for entry in scan.entries:
+            if entry.is_dir or entry.read is None:
+                continue
+            file_path = entry.path
+            selected_by = [w for w in writers if file_path in w.files]
+            if not selected_by:
+                continue
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            if file_path in read_ahead:
+                stat, content = read_ahead.pop(file_path)
+            else:
+                stat, content = _read_entry(scan, entry, selected_by, observer)
 
+            for target_writer in selected_by:
+                target_writer.write_section(file_path, content, stat)
+            if observer is not None:
+                observer.file_written(file_path)
+
+        for target_writer in writers:
+            target_writer.write_footer()
+
+        logging.info("Prompt generation complete.")
+        if observer is not None:
+            observer.phase_started(PHASE_DONE)
+
+    except PromptCancelledError:
+        logging.info("Prompt generation cancelled.")
+        raise
+    except OutputClosedError:
+        # The reader exited early (e.g. `| head`); reading on would be wasted
+        logging.debug("Output closed by its reader, stopping.")
+        raise
     except OSError:
         logging.exception("Error writing output")
     except Exception:
@@ -0,0 +1,194 @@
+"""
+Per-directory Cursor rule files.
+
+Instead of one rule holding the entire codebase, one `.mdc` rule is written per
+top-level directory (plus one for files at the repository root), each scoped
+with `globs:` frontmatter so Cursor only attaches the parts that are relevant.
+Rules are rendered in parallel and a file on disk is only replaced when its
+content hash changes.
+"""
+
+import logging
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Literal
+
+from codebase_prompt_gen.core import open_source, scan_source
+from codebase_prompt_gen.index import atomic_write, content_hash
+from codebase_prompt_gen.renderers import MarkdownRenderer
+from codebase_prompt_gen.tree import TreeEntry, render_tree
+
+CURSOR_RULES_DIR = Path(".cursor") / "rules"
+RULE_PREFIX = "codebase-"
+GENERATED_MARKER = "(generated by codebase-prompt)"
+
+RuleStatus = Literal["written", "unchanged", "removed"]
+
+
+@dataclass
+class CursorRule:
+    """One rule file and the part of the scan it covers."""
+
+    filename: str
+    title: str
+    globs: list[str]
+    tree_entries: list[TreeEntry] = field(default_factory=list)
+    files_content: list[tuple[Path, Callable[[], str]]] = field(default_factory=list)
+
+
+def plan_cursor_rules(
+    repo_name: str,
+    tree_entries: list[TreeEntry],
+    files_content: list[tuple[Path, Callable[[], str]]],
+) -> list[CursorRule]:
+    """
+    Split a scan into one rule per top-level directory and one for root files.
+
+    Args:
+        repo_name: Name of the repository, used in rule titles
+        tree_entries: The tree entries as returned by ScanResult.select
+        files_content: The files as returned by ScanResult.select
+
+    Returns:
+        The rules, sorted by file name
+    """
+    root_rule = CursorRule(f"{RULE_PREFIX}root.mdc", f"{repo_name} (root files)", [])
+    dir_rules: dict[str, CursorRule] = {}
+
+    def rule_for(top: str) -> CursorRule:
+        if top not in dir_rules:
+            dir_rules[top] = CursorRule(
+                f"{RULE_PREFIX}dir-{top}.mdc", f"{repo_name}/{top}", [f"{top}/**"]
+            )
+        return dir_rules[top]
+
+    for entry in tree_entries:
+        if entry.is_dir or len(entry.path.parts) > 1:
+            rule_for(entry.path.parts[0]).tree_entries.append(entry)
+        else:
+            root_rule.tree_entries.append(entry)
+
+    for file_path, content_getter in files_content:
+        if len(file_path.parts) > 1:
+            rule_for(file_path.parts[0]).files_content.append((file_path, content_getter))
+        else:
+            root_rule.globs.append(file_path.as_posix())
+            root_rule.files_content.append((file_path, content_getter))
+
+    rules = [rule for rule in dir_rules.values() if rule.files_content]
+    if root_rule.files_content:
+        rules.append(root_rule)
+    return sorted(rules, key=lambda rule: rule.filename)
+
+
+def render_cursor_rule(rule: CursorRule) -> str:
+    """Render a rule file: frontmatter followed by the Markdown prompt for its files."""
+    renderer = MarkdownRenderer()
+    chunks = [
+        "---\n",
+        f"description: Codebase context for {rule.title} {GENERATED_MARKER}\n",
+        f"globs: {','.join(rule.globs)}\n",
+        "alwaysApply: false\n",
+        "---\n",
+        renderer.header(rule.title, render_tree(rule.tree_entries)),
+    ]
+    chunks.extend(
+        renderer.file_section(file_path, content_getter())
+        for file_path, content_getter in rule.files_content
+    )
+    chunks.append(renderer.footer())
+    return "".join(chunks)
+
+
+def _write_rule_if_changed(rules_dir: Path, rule: CursorRule) -> RuleStatus:
+    """Render a rule and atomically replace its file only if the content changed."""
+    text = render_cursor_rule(rule)
+    target = rules_dir / rule.filename
+    try:
+        existing = target.read_text(encoding="utf-8")
+    except (FileNotFoundError, UnicodeDecodeError):
+        existing = None
+    if existing is not None and content_hash(existing) == content_hash(text):
+        return "unchanged"
+    atomic_write(target, text.encode("utf-8"))
+    return "written"
+
+
+def _is_generated_rule(path: Path) -> bool:
+    """Check whether a per-directory rule file was written by this tool."""
+    if not (path.name.startswith(RULE_PREFIX) and path.suffix == ".mdc"):
+        return False
+    try:
+        with path.open(encoding="utf-8") as f:
+            head = f.read(4096)
+    except (OSError, UnicodeDecodeError):
+        return False
+    return GENERATED_MARKER in head
+
+
+def write_cursor_rules(
+    repo_path: Path,
+    exclude_patterns: list[str],
+    include_patterns: list[str],
+    *,
+    respect_gitignore: bool = True,
+    follow_symlinks: bool = False,
+    max_workers: int | None = None,
+    scan_workers: int | None = None,
+    skip_generated: bool = True,
+) -> dict[str, RuleStatus]:
+    """
+    Write one Cursor rule per top-level directory into .cursor/rules.
+
+    Args:
+        repo_path: Path to the Git repository root directory
+        exclude_patterns: List of glob patterns to exclude
+        include_patterns: List of glob patterns to include (files only)
+        respect_gitignore: Whether to respect .gitignore files
+        follow_symlinks: Whether to follow symlinked directories
+        max_workers: Number of rules rendered in parallel (default: executor default)
+        scan_workers: Number of threads listing directories concurrently (default: serial)
+        skip_generated: Whether to list generated, vendored and lock files in
+                        the tree as skipped, without their content
+
+    Returns:
+        The status of every rule file that was written, left unchanged or
+        removed because its directory no longer exists, by file name.
+    """
+    repo_path_obj = Path(repo_path).resolve(strict=True)
+    rules_dir = repo_path_obj / CURSOR_RULES_DIR
+    rules_dir.mkdir(parents=True, exist_ok=True)
+
+    # The rules directory itself must never end up in the rules
+    exclude_patterns = [*exclude_patterns, ".cursor", ".cursor/**"]
+    with open_source(
+        repo_path_obj,
+        exclude_patterns,
+        include_patterns,
+        follow_symlinks=follow_symlinks,
+        scan_workers=scan_workers,
+    ) as source:
+        tree_entries, files_content = scan_source(
+            source,
+            exclude_patterns,
+            include_patterns,
+            respect_gitignore=respect_gitignore,
+            skip_generated=skip_generated,
+        ).select()
+    rules = plan_cursor_rules(repo_path_obj.name, tree_entries, files_content)
+
+    statuses: dict[str, RuleStatus] = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(lambda rule: _write_rule_if_changed(rules_dir, rule), rules)
+        for rule, status in zip(rules, results, strict=True):
+            statuses[rule.filename] = status
+
+    for path in sorted(rules_dir.iterdir()):
+        if path.name not in statuses and _is_generated_rule(path):
+            logging.info("Removing stale Cursor rule %s", path)
+            path.unlink()
+            statuses[path.name] = "removed"
+
+    return statuses
@@ -0,0 +1,177 @@
+"""
+Input source that reads a git revision without checking it out.
+
+The tree is listed with a single `git ls-tree` call and blob contents are
+streamed through one long-lived `git cat-file --batch` process.
+"""
+
+import logging
+import os
+import subprocess
+import threading
+from collections.abc import Callable, Iterator
+from pathlib import Path, PurePosixPath
+from typing import IO
+
+from codebase_prompt_gen.sources import InputSource, SourceEntry, entries_from_file_list
+
+# Tree entry modes that are not regular file content
+SYMLINK_MODE = "120000"
+# cat-file --batch describes each object as "<oid> <type> <size>"
+OBJECT_HEADER_FIELDS = 3
+
+
+class GitCatFileBatch:
+    """
+    A persistent `git cat-file --batch` process.
+
+    The process is started on the first read and serves every following read,
+    so reading many blobs costs one process instead of one per blob.
+    """
+
+    def __init__(self, repo_dir: Path) -> None:
+        self.repo_dir = repo_dir
+        self._process: subprocess.Popen[bytes] | None = None
+        self._lock = threading.Lock()
+
+    def _streams(self) -> tuple[IO[bytes], IO[bytes]]:
+        if self._process is None:
+            self._process = subprocess.Popen(
+                ["git", "cat-file", "--batch"],
+                cwd=self.repo_dir,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        stdin, stdout = self._process.stdin, self._process.stdout
+        if stdin is None or stdout is None:
+            msg = "git cat-file process has no pipes"
+            raise OSError(msg)
+        return stdin, stdout
+
+    def read(self, object_name: str) -> bytes:
+        """
+        Read the content of an object.
+
+        Args:
+            object_name: An object id or any name git accepts, e.g. "HEAD:README.md"
+
+        Returns:
+            The raw object content
+
+        Raises:
+            KeyError: If the object does not exist or the name is ambiguous
+        """
+        with self._lock:
+            stdin, stdout = self._streams()
+            stdin.write(object_name.encode("utf-8") + b"\n")
+            stdin.flush()
+            header = stdout.readline().split()
+            if len(header) != OBJECT_HEADER_FIELDS:  # Not "<name> missing"
+                raise KeyError(object_name)
+            size = int(header[2])
+            data = stdout.read(size)
+            stdout.read(1)  # Trailing newline after the content
+            return data
+
+    def close(self) -> None:
+        """Stop the cat-file process."""
+        if self._process is None:
+            return
+        if self._process.stdin:
+            self._process.stdin.close()
+        try:
+            self._process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+            self._process.wait()
+        if self._process.stdout:
+            self._process.stdout.close()
+        self._process = None
+
+
+class GitRevSource(InputSource):
+    """Input source listing the tree of a git revision (commit, tag or tree-ish)."""
+
+    def __init__(self, repo_dir: Path, rev: str) -> None:
+        """
+        List the revision's tree.
+
+        Args:
+            repo_dir: A directory inside the git repository. As with
+                      `git ls-tree`, only the part of the tree below it is listed.
+            rev: The tree-ish to read, e.g. "v1.0", "HEAD~3" or a commit id
+
+        Raises:
+            ValueError: If the revision cannot be listed
+        """
+        if rev.startswith("-"):
+            msg = f"Invalid revision: {rev!r}"
+            raise ValueError(msg)
+        self.repo_dir = repo_dir
+        self.rev = rev
+        self.name = f"{repo_dir.name}@{rev}"
+        self._batch = GitCatFileBatch(repo_dir)
+        # (path, object id, size) of every regular file
+        self._blobs = self._list_tree()
+
+    def _list_tree(self) -> list[tuple[PurePosixPath, str, int]]:
+        try:
+            result = subprocess.run(
+                ["git", "ls-tree", "-r", "-z", "-l", self.rev],
+                cwd=self.repo_dir,
+                capture_output=True,
+                check=False,
+            )
+        except (OSError, subprocess.SubprocessError) as e:
+            msg = f"Could not run git to list {self.rev!r}: {e}"
+            raise ValueError(msg) from e
+        if result.returncode != 0:
+            stderr = result.stderr.decode("utf-8", errors="replace").strip()
+            msg = f"Could not list revision {self.rev!r}: {stderr}"
+            raise ValueError(msg)
+
+        blobs: list[tuple[PurePosixPath, str, int]] = []
+        for record in result.stdout.split(b"\0"):
+            if not record:
+                continue
+            meta, _, raw_path = record.partition(b"\t")
+            mode, object_type, object_id, size = meta.decode("ascii").split()
+            path = PurePosixPath(os.fsdecode(raw_path))
+            if object_type != "blob" or mode == SYMLINK_MODE:
+                logging.debug("Skipping %s entry %s in %s", object_type, path, self.rev)
+                continue
+            blobs.append((path, object_id, int(size)))
+        return blobs
+
+    def _content_getter(self, path: PurePosixPath, object_id: str) -> Callable[[], str]:
+        def get_content() -> str:
+            try:
+                return self._batch.read(object_id).decode("utf-8", errors="replace")
+            except Exception:
+                logging.exception("Error reading %s from %s", path, self.rev)
+                return ""
+
+        return get_content
+
+    def entries(self) -> Iterator[SourceEntry]:
+        return entries_from_file_list(
+            (path, self._content_getter(path, object_id), size, None)
+            for path, object_id, size in self._blobs
+        )
+
+    def gitignore_file(self) -> tuple[Path, Path] | None:
+        for path, object_id, _ in self._blobs:
+            if path == PurePosixPath(".gitignore"):
+                return self._materialize_gitignore(self._batch.read(object_id))
+        return self._materialize_gitignore(None)
+
+    def gitattributes(self) -> bytes | None:
+        for path, object_id, _ in self._blobs:
+            if path == PurePosixPath(".gitattributes"):
+                return self._batch.read(object_id)
+        return None
+
+    def close(self) -> None:
+        self._batch.close()
+        super().close()
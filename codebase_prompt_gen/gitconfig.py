@@ -0,0 +1,119 @@
+"""
+Reading the user's global git configuration without running git.
+
+Spawning `git config` costs more than the rest of a short run, so the global
+configuration files are parsed directly. Only what prompt generation needs
+is supported: plain `key = value` entries, quoting and escapes, comments and
+`[include] path = ...`. Conditional includes are not followed.
+"""
+
+import logging
+import os
+from pathlib import Path
+
+# Nesting limit for [include], as in git
+MAX_INCLUDE_DEPTH = 10
+
+_ESCAPES = {"n": "\n", "t": "\t", "b": "\b", '"': '"', "\\": "\\"}
+
+
+def global_config_files() -> list[Path]:
+    """
+    Return the global configuration files git reads, in reading order.
+
+    Later files take precedence, as with `git config --global`.
+    """
+    override = os.environ.get("GIT_CONFIG_GLOBAL")
+    if override:
+        return [Path(override).expanduser()]
+    return [_xdg_config_home() / "git" / "config", Path("~/.gitconfig").expanduser()]
+
+
+def _xdg_config_home() -> Path:
+    return Path(os.environ.get("XDG_CONFIG_HOME") or "~/.config").expanduser()
+
+
+def _parse_value(raw: str) -> str:
+    """Unquote a raw config value and strip its trailing comment."""
+    value: list[str] = []
+    quoted = False
+    # Whitespace outside quotes is kept only between words
+    pending_space = ""
+    chars = iter(raw.strip())
+    for char in chars:
+        if char == "\\":
+            escaped = next(chars, "")
+            value.append(pending_space + _ESCAPES.get(escaped, escaped))
+            pending_space = ""
+        elif char == '"':
+            value.append(pending_space)
+            pending_space = ""
+            quoted = not quoted
+        elif not quoted and char in "#;":
+            break
+        elif not quoted and char.isspace():
+            pending_space += char
+        else:
+            value.append(pending_space + char)
+            pending_space = ""
+    return "".join(value)
+
+
+def read_config_file(path: Path, values: dict[str, str], depth: int = 0) -> None:
+    """
+    Read a git configuration file into a mapping of "section.key" to value.
+
+    Args:
+        path: The file to read; a missing file is skipped
+        values: Mapping to update; later entries replace earlier ones
+        depth: Current [include] nesting depth
+    """
+    try:
+        lines = path.read_text(encoding="utf-8", errors="replace").splitlines()
+    except OSError:
+        return
+    section = ""
+    for line in lines:
+        stripped = line.strip()
+        if not stripped or stripped[0] in "#;":
+            continue
+        if stripped.startswith("["):
+            header, _, rest = stripped[1:].partition("]")
+            # Subsections ([remote "origin"]) are case-sensitive but unused here
+            section = header.split(None, 1)[0].split(".", 1)[0].lower() if header else ""
+            stripped = rest.strip()
+            if not stripped or stripped[0] in "#;":
+                continue
+        key, separator, raw_value = stripped.partition("=")
+        key = key.strip().lower()
+        # A key without "=" is a boolean true
+        value = _parse_value(raw_value) if separator else "true"
+        if section == "include" and key == "path":
+            if depth >= MAX_INCLUDE_DEPTH:
+                logging.warning("Too many nested includes in git config %s", path)
+                continue
+            included = Path(value).expanduser()
+            read_config_file(path.parent / included, values, depth + 1)
+        else:
+            values[f"{section}.{key}"] = value
+
+
+def global_excludes_file() -> Path | None:
+    """
+    Return the global excludes file git would use (core.excludesFile).
+
+    Falls back to git's default, $XDG_CONFIG_HOME/git/ignore, when the
+    configuration does not set one.
+
+    Returns:
+        The path, or None if that file does not exist
+    """
+    values: dict[str, str] = {}
+    for config_file in global_config_files():
+        read_config_file(config_file, values)
+    configured = values.get("core.excludesfile")
+    path = Path(configured).expanduser() if configured else _xdg_config_home() / "git" / "ignore"
+    if path.is_file():
+        return path
+    logging.debug("Global gitignore file not found at: %s", path)
+    return None
@@ -0,0 +1,480 @@
+"""
+Sidecar index for prompt files.
+
+The index records where every file section lives in a written prompt (byte
+offset and length), where the file's content sits inside that section, and a
+hash of the source content. Tools can use it to seek straight to one file's
+content, and update_prompt_file uses it to rewrite only the sections whose
+source files changed. The index also records the rendering options the
+sections were written with; an update run with other options rewrites the
+whole file rather than reuse sections that no longer match them.
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import IO, Any, Literal
+
+from codebase_prompt_gen.core import generate_file_tree, generate_prompt
+from codebase_prompt_gen.outline import OutlinePolicy
+from codebase_prompt_gen.renderers import get_renderer
+from codebase_prompt_gen.tree import TreeStyle
+
+INDEX_VERSION = 2
+INDEX_SUFFIX = ".idx.json"
+
+UpdateMode = Literal["unchanged", "in-place", "compacted", "full"]
+
+
+def index_path_for(output_file: Path) -> Path:
+    """Return the sidecar index path for a prompt file."""
+    return output_file.with_name(output_file.name + INDEX_SUFFIX)
+
+
+def rendering_options(
+    output_format: str, outline_policy: OutlinePolicy | None = None, boilerplate: bool = False
+) -> dict[str, Any]:
+    """
+    Return the options that shape the bytes of the file sections.
+
+    Args:
+        output_format: Name of the renderer
+        outline_policy: Optional policy selecting files emitted as outlines
+        boilerplate: Whether repeated blocks are replaced by references to
+                     the header
+
+    Returns:
+        A JSON-serialisable record; sections are reused only by an update
+        with an equal record
+    """
+    return {
+        "format": output_format,
+        "outline": asdict(outline_policy) if outline_policy else None,
+        "boilerplate": boilerplate,
+    }
+
+
+def content_hash(content: str) -> str:
+    """Return the hex digest used to detect changed file content."""
+    return hashlib.sha256(content.encode("utf-8", errors="surrogatepass")).hexdigest()
+
+
+@dataclass
+class Region:
+    """A byte range of the prompt file that is not tied to a source file."""
+
+    offset: int
+    length: int
+    sha256: str
+
+
+@dataclass
+class FileSection:
+    """The byte range of one file's section in the prompt file."""
+
+    path: str
+    offset: int
+    length: int
+    content_offset: int
+    content_length: int
+    sha256: str
+    size: int | None = None
+    mtime_ns: int | None = None
+
+
+# A region of an updated prompt, with the old region to copy or its new bytes
+_Piece = tuple[Region | FileSection, Region | FileSection | None, bytes | None]
+
+
+@dataclass
+class PromptIndex:
+    """Layout of a prompt file: header, one section per file, then footer."""
+
+    output_format: str
+    # Options the sections were rendered with, from rendering_options
+    rendering: dict[str, Any] = field(default_factory=dict)
+    header: Region = field(default_factory=lambda: Region(0, 0, ""))
+    sections: list[FileSection] = field(default_factory=list)
+    footer: Region = field(default_factory=lambda: Region(0, 0, ""))
+    created_ns: int = field(default_factory=time.time_ns)
+
+    @property
+    def total_length(self) -> int:
+        """Size in bytes of the prompt file this index describes."""
+        return self.footer.offset + self.footer.length
+
+    def find(self, path: str) -> FileSection | None:
+        """Return the section for a relative path, or None if it is not indexed."""
+        for section in self.sections:
+            if section.path == path:
+                return section
+        return None
+
+    def save(self, index_file: Path) -> None:
+        """Atomically write the index next to its prompt file."""
+        data = {"version": INDEX_VERSION, **asdict(self)}
+        atomic_write(index_file, json.dumps(data, ensure_ascii=False).encode("utf-8"))
+
+    @classmethod
+    def load(cls, index_file: Path) -> "PromptIndex | None":
+        """Load an index, returning None if it is missing, unreadable or outdated."""
+        try:
+            data = json.loads(index_file.read_text(encoding="utf-8"))
+            if data.pop("version", None) != INDEX_VERSION:
+                return None
+            return cls(
+                output_format=data["output_format"],
+                rendering=data["rendering"],
+                header=Region(**data["header"]),
+                sections=[FileSection(**section) for section in data["sections"]],
+                footer=Region(**data["footer"]),
+                created_ns=data["created_ns"],
+            )
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logging.warning("Ignoring unreadable prompt index %s: %s", index_file, e)
+            return None
+
+
+class IndexingWriter:
+    """
+    Wraps an output stream and records the layout of everything written.
+
+    The wrapped stream must write text as UTF-8 without newline translation,
+    otherwise the recorded offsets will not match the file on disk.
+    """
+
+    def __init__(
+        self,
+        writer: Callable[[str], Any],
+        output_format: str,
+        rendering: dict[str, Any] | None = None,
+    ) -> None:
+        self._writer = writer
+        self.offset = 0
+        self.index = PromptIndex(
+            output_format=output_format,
+            rendering=rendering if rendering is not None else rendering_options(output_format),
+        )
+
+    def _write(self, text: str) -> int:
+        data = text.encode("utf-8", errors="surrogatepass")
+        self._writer(text)
+        self.offset += len(data)
+        return len(data)
+
+    def write_header(self, text: str) -> None:
+        """Write and record the header region."""
+        offset = self.offset
+        length = self._write(text)
+        self.index.header = Region(offset, length, content_hash(text))
+
+    def write_section(
+        self,
+        file_path: Path,
+        content: str,
+        parts: tuple[str, str, str],
+        stat: os.stat_result | None = None,
+    ) -> None:
+        """Write and record one file section given its rendered parts."""
+        prefix, body, suffix = parts
+        prefix_length = len(prefix.encode("utf-8", errors="surrogatepass"))
+        body_length = len(body.encode("utf-8", errors="surrogatepass"))
+        offset = self.offset
+        length = self._write(prefix + body + suffix)
+        self.index.sections.append(
+            FileSection(
+                path=file_path.as_posix(),
+                offset=offset,
+                length=length,
+                content_offset=offset + prefix_length,
+                content_length=body_length,
+                sha256=content_hash(content),
+                size=stat.st_size if stat else None,
+                mtime_ns=stat.st_mtime_ns if stat else None,
+            )
+        )
+
+    def write_footer(self, text: str) -> None:
+        """Write and record the footer region."""
+        offset = self.offset
+        length = self._write(text)
+        self.index.footer = Region(offset, length, content_hash(text))
+
+
+def read_section(output_file: Path, section: FileSection, content_only: bool = True) -> bytes:
+    """
+    Read one file's section from a prompt file without parsing the rest of it.
+
+    Args:
+        output_file: The prompt file the index describes
+        section: The indexed section to read
+        content_only: Return only the file content rather than the whole section
+
+    Returns:
+        The raw UTF-8 bytes of the requested range
+    """
+    start = section.content_offset if content_only else section.offset
+    length = section.content_length if content_only else section.length
+    if length == 0:
+        return b""
+    with output_file.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        return m[start : start + length]
+
+
+def atomic_write(target: Path, data: bytes) -> None:
+    """Write bytes to a temporary file next to target and move it into place."""
+    fd, tmp_name = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        Path(tmp_name).replace(target)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def _stat_or_none(path: Path) -> os.stat_result | None:
+    try:
+        return path.stat()
+    except OSError:
+        return None
+
+
+def update_prompt_file(
+    repo_path: Path,
+    output_file: Path,
+    exclude_patterns: list[str],
+    include_patterns: list[str],
+    *,
+    respect_gitignore: bool = True,
+    output_format: str = "markdown",
+    follow_symlinks: bool = False,
+    scan_workers: int | None = None,
+    tree_style: TreeStyle | None = None,
+    skip_generated: bool = True,
+) -> UpdateMode:
+    """
+    Bring an indexed prompt file up to date, rewriting as little as possible.
+
+    Source files whose size and mtime match the index are not read at all;
+    files whose content hash is unchanged keep their existing bytes. When every
+    changed region keeps its length, the new bytes are written in place.
+    Otherwise the file is compacted into a new copy, reusing unchanged sections
+    from the old one, and moved into place atomically. A file indexed with
+    other rendering options is written from scratch.
+
+    Args:
+        repo_path: Path to the Git repository root directory
+        output_file: The prompt file to update
+        exclude_patterns: List of glob patterns to exclude
+        include_patterns: List of glob patterns to include (files only)
+        respect_gitignore: Whether to respect .gitignore files
+        output_format: Name of the renderer to use
+        follow_symlinks: Whether to follow symlinked directories
+        scan_workers: Number of threads listing directories concurrently (default: serial)
+        tree_style: How to render the file tree (default: flat)
+        skip_generated: Whether to list generated, vendored and lock files in
+                        the tree as skipped, without their content
+
+    Returns:
+        How the file was brought up to date.
+    """
+    # Fail fast on an unknown format, before any scanning happens
+    get_renderer(output_format)
+    index_file = index_path_for(output_file)
+    old_index = PromptIndex.load(index_file)
+    output_stat = _stat_or_none(output_file)
+    rendering = rendering_options(output_format)
+
+    if (
+        old_index is None
+        or old_index.rendering != rendering
+        or output_stat is None
+        or output_stat.st_size != old_index.total_length
+    ):
+        logging.info("No usable index for %s, writing it from scratch", output_file)
+        with output_file.open("w", encoding="utf-8", newline="") as f:
+            generate_prompt(
+                repo_path,
+                exclude_patterns,
+                include_patterns,
+                output_stream=f.write,
+                respect_gitignore=respect_gitignore,
+                output_format=output_format,
+                index_file=index_file,
+                follow_symlinks=follow_symlinks,
+                scan_workers=scan_workers,
+                tree_style=tree_style,
+                skip_generated=skip_generated,
+            )
+        return "full"
+
+    repo_path_obj = Path(repo_path).resolve(strict=True)
+    file_tree, files_content = generate_file_tree(
+        repo_path_obj,
+        exclude_patterns,
+        include_patterns,
+        respect_gitignore=respect_gitignore,
+        follow_symlinks=follow_symlinks,
+        scan_workers=scan_workers,
+        tree_style=tree_style,
+        skip_generated=skip_generated,
+    )
+    new_index = PromptIndex(output_format=output_format, rendering=rendering)
+    pieces = _plan_update(old_index, new_index, repo_path_obj, file_tree, files_content)
+
+    old_regions: list[Region | FileSection] = [
+        old_index.header,
+        *old_index.sections,
+        old_index.footer,
+    ]
+    # In place is possible when the layout is identical: same number of pieces,
+    # reused pieces at their old position and rewritten pieces at their old size
+    in_place = len(pieces) == len(old_regions) and all(
+        (old is old_region) if data is None else region.length == old_region.length
+        for (region, old, data), old_region in zip(pieces, old_regions, strict=True)
+    )
+
+    mode: UpdateMode
+    if in_place:
+        changed = _write_in_place(output_file, pieces, old_regions)
+        mode = "in-place" if changed else "unchanged"
+    else:
+        _write_compacted(output_file, pieces)
+        mode = "compacted"
+    new_index.save(index_file)
+    logging.info("Updated %s (%s)", output_file, mode)
+    return mode
+
+
+def _plan_update(
+    old_index: PromptIndex,
+    new_index: PromptIndex,
+    repo_path: Path,
+    file_tree: list[str],
+    files_content: list[tuple[Path, Callable[[], str]]],
+) -> list[_Piece]:
+    """
+    Lay out the updated prompt, reusing the old bytes of unchanged regions.
+
+    Fills in new_index with region lengths and section-relative content
+    offsets; the regions are placed when they are written.
+
+    Returns:
+        Every region of the new layout, paired with either the old region
+        whose bytes can be reused or the freshly rendered bytes
+    """
+    renderer = get_renderer(new_index.output_format)
+    old_sections = {section.path: section for section in old_index.sections}
+    pieces: list[_Piece] = []
+
+    def add_region(region: Region, old: Region, text: str) -> None:
+        region.sha256 = content_hash(text)
+        if region.sha256 == old.sha256:
+            region.length = old.length
+            pieces.append((region, old, None))
+        else:
+            data = text.encode("utf-8", errors="surrogatepass")
+            region.length = len(data)
+            pieces.append((region, None, data))
+
+    add_region(new_index.header, old_index.header, renderer.header(repo_path.name, file_tree))
+
+    for file_path, content_getter in files_content:
+        rel_path = file_path.as_posix()
+        old = old_sections.get(rel_path)
+        stat = _stat_or_none(repo_path / file_path)
+        section = FileSection(rel_path, 0, 0, 0, 0, "")
+        if stat is not None:
+            section.size, section.mtime_ns = stat.st_size, stat.st_mtime_ns
+        new_index.sections.append(section)
+
+        # Trust an unchanged stat only if the file was not modified while the
+        # old index was being written (the "racy" timestamp case)
+        if (
+            old is not None
+            and stat is not None
+            and (old.size, old.mtime_ns) == (stat.st_size, stat.st_mtime_ns)
+            and stat.st_mtime_ns < old_index.created_ns
+        ):
+            section.sha256 = old.sha256
+        else:
+            content = content_getter()
+            section.sha256 = content_hash(content)
+            if old is None or old.sha256 != section.sha256:
+                prefix, body, suffix = renderer.file_section_parts(file_path, content)
+                prefix_bytes = prefix.encode("utf-8", errors="surrogatepass")
+                body_bytes = body.encode("utf-8", errors="surrogatepass")
+                data = prefix_bytes + body_bytes + suffix.encode("utf-8", errors="surrogatepass")
+                section.length = len(data)
+                section.content_offset = len(prefix_bytes)
+                section.content_length = len(body_bytes)
+                pieces.append((section, None, data))
+                continue
+
+        section.length = old.length
+        section.content_offset = old.content_offset - old.offset
+        section.content_length = old.content_length
+        pieces.append((section, old, None))
+
+    footer_text = (renderer.empty() if not files_content else "") + renderer.footer()
+    add_region(new_index.footer, old_index.footer, footer_text)
+    return pieces
+
+
+def _write_in_place(
+    output_file: Path, pieces: list[_Piece], old_regions: list[Region | FileSection]
+) -> bool:
+    """Overwrite the rewritten regions at their old offsets; return whether any were."""
+    changed = False
+    with output_file.open("r+b") as f:
+        for (region, _, data), old_region in zip(pieces, old_regions, strict=True):
+            _place(region, old_region.offset)
+            if data is not None:
+                f.seek(region.offset)
+                f.write(data)
+                changed = True
+    return changed
+
+
+def _write_compacted(output_file: Path, pieces: list[_Piece]) -> None:
+    """Write the new layout to a copy of the prompt file and move it into place."""
+    fd, tmp_name = tempfile.mkstemp(
+        dir=output_file.parent, prefix=f".{output_file.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as out, output_file.open("rb") as old_file:
+            _copy_pieces(out, old_file, pieces)
+        Path(tmp_name).replace(output_file)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def _copy_pieces(out: IO[bytes], old_file: IO[bytes], pieces: list[_Piece]) -> None:
+    """Write the pieces one after another, placing each at its new offset."""
+    offset = 0
+    with mmap.mmap(old_file.fileno(), 0, access=mmap.ACCESS_READ) as old_map:
+        for region, old, data in pieces:
+            _place(region, offset)
+            if data is None and old is not None:
+                out.write(old_map[old.offset : old.offset + old.length])
+            elif data is not None:
+                out.write(data)
+            offset += region.length
+
+
+def _place(region: Region | FileSection, offset: int) -> None:
+    """Move a region, whose content offset is still section-relative, to offset."""
+    region.offset = offset
+    if isinstance(region, FileSection):
+        region.content_offset += offset
@@ -0,0 +1,224 @@
+"""
+Outline (skeleton) mode for large files.
+
+An outline keeps a file's structure - imports, class and function signatures
+and docstrings - and drops the bodies. Python is outlined with `ast`; other
+common languages use fast line-based regex outliners.
+"""
+
+import ast
+import fnmatch
+import functools
+import logging
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+
+# Longest assignment value kept verbatim in a Python outline
+MAX_VALUE_LENGTH = 80
+
+_JS_PATTERNS = [
+    r"^\s*(import|export)\b",
+    r"^\s*(export\s+)?(default\s+)?(async\s+)?function\b",
+    r"^\s*(export\s+)?(default\s+)?(abstract\s+)?class\b",
+    r"^\s*(export\s+)?(declare\s+)?(interface|type|enum|namespace)\b",
+    r"^\s*(export\s+)?(const|let|var)\s+[\w$]+\s*(:[^=]+)?=\s*(async\s+)?(\([^)]*\)|[\w$]+)\s*=>",
+    r"^\s+(public\s+|private\s+|protected\s+|static\s+|async\s+|readonly\s+|get\s+|set\s+)*"
+    r"(?!(if|for|while|switch|catch|return|function)\b)[\w$]+\s*\([^;]*\)\s*(:[^{;()]*)?\{\s*$",
+]
+_GO_PATTERNS = [
+    r"^(package|import|func|type|var|const)\b",
+    r'^\s+(\w+\s+)?"[^"]+"$',  # Entries of an import ( ... ) block
+]
+_RUST_PATTERNS = [
+    r"^\s*(#\[|//!|///)",
+    r"^\s*(pub(\([^)]*\))?\s+)?(async\s+)?(const\s+)?(unsafe\s+)?(extern\s+\S+\s+)?"
+    r"(fn|struct|enum|union|trait|impl|mod|use|type|const|static|macro_rules!)\b",
+]
+_JVM_PATTERNS = [
+    r"^\s*(package|import|using|namespace)\b",
+    r"^\s*@\w+",
+    r"^\s*((public|private|protected|internal|static|final|abstract|sealed|open|override|"
+    r"data|inline|suspend|async|virtual|partial|readonly)\s+)*"
+    r"(class|interface|enum|record|struct|object|fun|def|trait)\b",
+    r"^\s*((public|private|protected|internal|static|final|abstract|override|virtual|async|"
+    r"synchronized)\s+)+[\w<>\[\],.? ]+\s+\w+\s*\(",
+]
+_C_PATTERNS = [
+    r"^\s*#\s*(include|define)\b",
+    r"^\s*(class|struct|union|namespace|enum|typedef|template|using)\b",
+    r"^[A-Za-z_][\w\s\*&:<>,]*\b\w+\s*\([^;]*$",  # Function definitions at column 0
+]
+_RUBY_PATTERNS = [r"^\s*(require|require_relative|include|extend|module|class|def|attr_\w+)\b"]
+
+# Pattern sources by suffix; compiled on first use, as most runs outline nothing
+REGEX_OUTLINERS: dict[str, list[str]] = {}
+for _suffixes, _patterns in (
+    ((".js", ".jsx", ".mjs", ".cjs", ".ts", ".tsx", ".mts", ".cts"), _JS_PATTERNS),
+    ((".go",), _GO_PATTERNS),
+    ((".rs",), _RUST_PATTERNS),
+    ((".java", ".kt", ".kts", ".scala", ".cs"), _JVM_PATTERNS),
+    ((".c", ".h", ".cc", ".cpp", ".cxx", ".hh", ".hpp", ".hxx"), _C_PATTERNS),
+    ((".rb",), _RUBY_PATTERNS),
+):
+    for _suffix in _suffixes:
+        REGEX_OUTLINERS[_suffix] = _patterns
+
+
+@functools.cache
+def _compiled_outliner(suffix: str) -> list[re.Pattern[str]]:
+    return [re.compile(pattern) for pattern in REGEX_OUTLINERS[suffix]]
+
+
+@dataclass
+class OutlinePolicy:
+    """
+    Decides which files are emitted as outlines instead of full text.
+
+    A file is outlined if any configured condition holds: it is at least
+    min_size bytes, it matches one of the patterns, or emitting it in full
+    would take the content emitted so far past budget bytes.
+    """
+
+    min_size: int | None = None
+    patterns: list[str] = field(default_factory=list)
+    budget: int | None = None
+
+    def __bool__(self) -> bool:
+        return self.min_size is not None or bool(self.patterns) or self.budget is not None
+
+    def applies(self, file_path: Path, size: int, used: int) -> bool:
+        """
+        Check whether a file should be outlined.
+
+        Args:
+            file_path: Relative path of the file
+            size: Size of the file content in bytes
+            used: Bytes of file content emitted so far
+
+        Returns:
+            True if the file should be emitted as an outline
+        """
+        if self.min_size is not None and size >= self.min_size:
+            return True
+        if self.budget is not None and used + size > self.budget:
+            return True
+        path_str = file_path.as_posix()
+        return any(fnmatch.fnmatch(path_str, pattern) for pattern in self.patterns)
+
+    def apply(self, file_path: Path, content: str, used: int) -> tuple[str, bool, int]:
+        """
+        Outline a file's content if the policy selects it and it can be outlined.
+
+        Args:
+            file_path: Relative path of the file
+            content: The full file content
+            used: Bytes of file content emitted so far
+
+        Returns:
+            Tuple of (content to emit, whether it is an outline, its size in bytes)
+        """
+        size = len(content.encode("utf-8", errors="surrogatepass"))
+        if self.applies(file_path, size, used):
+            skeleton = outline(file_path, content)
+            if skeleton is not None:
+                logging.debug("Emitting outline of %s", file_path)
+                return skeleton, True, len(skeleton.encode("utf-8", errors="surrogatepass"))
+        return content, False, size
+
+
+def outline(file_path: Path, content: str) -> str | None:
+    """
+    Outline a file's content.
+
+    Args:
+        file_path: Path of the file, used to pick an outliner by extension
+        content: The full file content
+
+    Returns:
+        The outline, or None if the language is not supported or the file
+        could not be outlined
+    """
+    suffix = file_path.suffix.lower()
+    if suffix in {".py", ".pyi"}:
+        return outline_python(content)
+    if suffix not in REGEX_OUTLINERS:
+        return None
+    return outline_by_regex(content, _compiled_outliner(suffix))
+
+
+def outline_by_regex(content: str, patterns: list[re.Pattern[str]]) -> str | None:
+    """Keep only the lines matching one of the patterns, or None if none match."""
+    lines = [
+        line.rstrip()
+        for line in content.splitlines()
+        if any(pattern.match(line) for pattern in patterns)
+    ]
+    return "\n".join(lines) + "\n" if lines else None
+
+
+def outline_python(content: str) -> str | None:
+    """
+    Outline Python source with ast.
+
+    Keeps the module docstring, imports, assignments (with long values
+    elided), and class and function signatures with their docstrings.
+    Function bodies become `...`. Returns None if the source does not parse.
+    """
+    try:
+        tree = ast.parse(content)
+    except (SyntaxError, ValueError) as e:
+        logging.debug("Could not parse Python source for outline: %s", e)
+        return None
+    tree.body = _skeleton_body(tree.body)
+    return ast.unparse(tree) + "\n"
+
+
+def _docstring(body: list[ast.stmt]) -> list[ast.stmt]:
+    """Return the docstring statement of a body as a list (empty if none)."""
+    if (
+        body
+        and isinstance(body[0], ast.Expr)
+        and isinstance(body[0].value, ast.Constant)
+        and isinstance(body[0].value.value, str)
+    ):
+        return [body[0]]
+    return []
+
+
+def _ellipsis() -> ast.stmt:
+    return ast.Expr(value=ast.Constant(value=Ellipsis))
+
+
+def _skeleton_body(body: list[ast.stmt]) -> list[ast.stmt]:
+    """Reduce a module or class body to its outline."""
+    skeleton: list[ast.stmt] = _docstring(body)
+    for node in body[len(skeleton) :]:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            skeleton.append(node)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            node.body = [*_docstring(node.body), _ellipsis()]
+            skeleton.append(node)
+        elif isinstance(node, ast.ClassDef):
+            node.body = _skeleton_body(node.body) or [_ellipsis()]
+            skeleton.append(node)
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            if node.value is not None and len(ast.unparse(node.value)) > MAX_VALUE_LENGTH:
+                node.value = ast.Constant(value=Ellipsis)
+            skeleton.append(node)
+        elif isinstance(node, (ast.If, ast.Try)):
+            # Keep conditional imports and definitions, e.g. `if TYPE_CHECKING:`
+            inner = _skeleton_body(node.body)
+            if inner:
+                node.body = inner
+                node.orelse = _skeleton_body(node.orelse)
+                if isinstance(node, ast.Try):
+                    for handler in node.handlers:
+                        handler.body = _skeleton_body(handler.body) or [ast.Pass()]
+                    finalbody = _skeleton_body(node.finalbody)
+                    # A try needs a handler or a finally clause to stay valid
+                    if not finalbody and node.finalbody and not node.handlers:
+                        finalbody = [ast.Pass()]
+                    node.finalbody = finalbody
+                skeleton.append(node)
+    return skeleton
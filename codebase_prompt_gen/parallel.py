@@ -0,0 +1,189 @@
+"""
+Multi-process rendering of prompt files.
+
+Reading, decoding and outlining files is CPU-bound and runs on one core in
+generate_prompt. Here the selected files are split into contiguous chunks
+that worker processes render to temporary section files; the parent copies
+the chunks into the output in order with os.copy_file_range, so the result is
+byte-identical to the serial output.
+"""
+
+import logging
+import math
+import os
+import shutil
+import tempfile
+from collections.abc import Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import IO
+
+from codebase_prompt_gen.core import build_file_content_getter, generate_file_tree
+from codebase_prompt_gen.outline import OutlinePolicy
+from codebase_prompt_gen.renderers import get_renderer
+from codebase_prompt_gen.tree import TreeStyle
+
+# Chunks per worker process, so that a chunk of large files does not leave
+# the other processes idle at the end
+CHUNKS_PER_PROCESS = 4
+
+
+def render_chunk(
+    root_dir: Path,
+    file_paths: list[Path],
+    output_format: str,
+    chunk_file: Path,
+    outline_policy: OutlinePolicy | None = None,
+) -> Path:
+    """
+    Render the sections of a chunk of files into a file.
+
+    Runs in a worker process, so every argument is picklable.
+
+    Args:
+        root_dir: Root directory the file paths are relative to
+        file_paths: Relative paths of the files, in output order
+        output_format: Name of the renderer to use
+        chunk_file: File to write the sections to
+        outline_policy: Optional outline policy without a budget
+
+    Returns:
+        chunk_file
+    """
+    renderer = get_renderer(output_format)
+    # Newlines are not translated, on Windows either, as in the serial output
+    with chunk_file.open("w", encoding="utf-8", newline="") as f:
+        for file_path in file_paths:
+            content = build_file_content_getter(root_dir / file_path)()
+            is_outline = False
+            if outline_policy:
+                content, is_outline, _ = outline_policy.apply(file_path, content, 0)
+            f.write(renderer.file_section(file_path, content, is_outline))
+    return chunk_file
+
+
+def copy_file_contents(source: IO[bytes], target: IO[str]) -> None:
+    """
+    Append a file's bytes to the current position of another file.
+
+    Uses os.copy_file_range, which copies in the kernel (and can share
+    extents on filesystems that support it), and falls back to a buffered
+    copy where it is unavailable.
+
+    Args:
+        source: The file to copy, opened for binary reading at its start
+        target: The output file; it is flushed first so that its position is
+                up to date
+    """
+    target.flush()
+    target_fd = target.fileno()
+    source_fd = source.fileno()
+    remaining = os.fstat(source_fd).st_size
+    copy_file_range = getattr(os, "copy_file_range", None)
+    if copy_file_range is not None:
+        try:
+            while remaining > 0:
+                copied = copy_file_range(source_fd, target_fd, remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+        except OSError as e:
+            # E.g. EXDEV on older kernels or ENOSYS in some sandboxes
+            logging.debug("copy_file_range failed, copying through user space: %s", e)
+    if remaining > 0:
+        source.seek(-remaining, os.SEEK_END)
+        with open(target_fd, "wb", closefd=False) as raw_target:
+            shutil.copyfileobj(source, raw_target)
+
+
+def _chunks(items: list[Path], count: int) -> Iterator[list[Path]]:
+    """Split a list into at most count contiguous chunks of near-equal length."""
+    size = max(1, math.ceil(len(items) / count))
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def write_prompt_file_parallel(
+    repo_path: Path,
+    output_file: Path,
+    exclude_patterns: list[str],
+    include_patterns: list[str],
+    *,
+    processes: int,
+    respect_gitignore: bool = True,
+    output_format: str = "markdown",
+    follow_symlinks: bool = False,
+    outline_policy: OutlinePolicy | None = None,
+    scan_workers: int | None = None,
+    tree_style: TreeStyle | None = None,
+    skip_generated: bool = True,
+) -> None:
+    """
+    Write a prompt file, rendering file sections in several processes.
+
+    The output is byte-identical to generate_prompt writing to the same file.
+
+    Args:
+        repo_path: Path to the Git repository root directory
+        output_file: The prompt file to write
+        exclude_patterns: List of glob patterns to exclude
+        include_patterns: List of glob patterns to include (files only)
+        processes: Number of worker processes
+        respect_gitignore: Whether to respect .gitignore files
+        output_format: Name of the renderer to use
+        follow_symlinks: Whether to follow symlinked directories
+        outline_policy: Optional outline policy. A budget depends on every
+                        preceding file and cannot be split across processes.
+        scan_workers: Number of threads listing directories concurrently
+        tree_style: How to render the file tree (default: flat)
+        skip_generated: Whether to list generated, vendored and lock files in
+                        the tree as skipped, without their content
+
+    Raises:
+        ValueError: If the outline policy has a budget or the format is unknown
+    """
+    if outline_policy is not None and outline_policy.budget is not None:
+        msg = "An outline budget cannot be combined with multi-process rendering"
+        raise ValueError(msg)
+    renderer = get_renderer(output_format)
+    repo_path_obj = Path(repo_path).resolve(strict=True)
+
+    file_tree, files_content = generate_file_tree(
+        repo_path_obj,
+        exclude_patterns,
+        include_patterns,
+        respect_gitignore=respect_gitignore,
+        follow_symlinks=follow_symlinks,
+        scan_workers=scan_workers,
+        tree_style=tree_style,
+        skip_generated=skip_generated,
+    )
+    file_paths = [file_path for file_path, _ in files_content]
+    logging.info("Rendering %d files in %d processes", len(file_paths), processes)
+
+    # Chunks live next to the output so copy_file_range stays on one filesystem
+    with tempfile.TemporaryDirectory(
+        prefix=".codebase-prompt-", dir=output_file.parent
+    ) as chunk_dir, ProcessPoolExecutor(max_workers=processes) as executor:
+        futures: list[Future[Path]] = [
+            executor.submit(
+                render_chunk,
+                repo_path_obj,
+                chunk,
+                output_format,
+                Path(chunk_dir) / f"chunk-{number:06d}",
+                outline_policy,
+            )
+            for number, chunk in enumerate(_chunks(file_paths, processes * CHUNKS_PER_PROCESS))
+        ]
+
+        with output_file.open("w", encoding="utf-8", newline="") as out:
+            out.write(renderer.header(repo_path_obj.name, file_tree))
+            # Chunks are copied in order while later ones are still rendering
+            for future in futures:
+                chunk_file = future.result()
+                with chunk_file.open("rb") as chunk:
+                    copy_file_contents(chunk, out)
+                chunk_file.unlink()
+            out.write((renderer.empty() if not file_paths else "") + renderer.footer())
+    logging.info("Prompt generation complete.")
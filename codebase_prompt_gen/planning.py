@@ -0,0 +1,92 @@
+"""
+Traversal planning from include patterns.
+
+Include patterns are matched with fnmatch, where `*` also matches `/`, so the
+only part of a pattern that constrains the directories a match can live in is
+its literal prefix up to the last `/` before the first wildcard. The literal
+tail after the last wildcard likewise constrains how a matching path ends.
+An IncludePlan derives both up front so the walk can skip whole directories
+and most non-matching files can be rejected without running fnmatch.
+"""
+
+import fnmatch
+import os
+import re
+from pathlib import PurePath
+
+# Characters that start a wildcard in fnmatch patterns
+_WILDCARD = re.compile(r"[*?\[\]]")
+
+
+def _parts(path: str) -> tuple[str, ...]:
+    """Split a path into components the way fnmatch compares them (normcase)."""
+    return PurePath(os.path.normcase(path)).parts
+
+
+class IncludePlan:
+    """Which directories and files include patterns can possibly match."""
+
+    def __init__(self, include_patterns: list[str]) -> None:
+        """
+        Analyse include patterns.
+
+        Args:
+            include_patterns: Glob patterns as passed to --include. An empty
+                              list includes everything.
+        """
+        self.include_patterns = include_patterns
+        # (directory prefix, required path suffix, has wildcards) for every pattern
+        self._constraints: list[tuple[tuple[str, ...], str, bool]] = []
+        for pattern in include_patterns:
+            first = _WILDCARD.search(pattern)
+            literal_head = os.path.normcase(pattern[: first.start()] if first else pattern)
+            prefix = literal_head.rpartition(os.sep)[0]
+            # A match must end with the literal text after the last wildcard
+            suffix = os.path.normcase(_WILDCARD.split(pattern)[-1])
+            self._constraints.append((_parts(prefix) if prefix else (), suffix, first is not None))
+
+    @property
+    def prunes(self) -> bool:
+        """Whether the plan can rule out any directory."""
+        return bool(self._constraints) and all(prefix for prefix, _, _ in self._constraints)
+
+    def may_contain(self, rel_dir: PurePath) -> bool:
+        """
+        Check whether a directory can hold a file matching an include pattern.
+
+        Args:
+            rel_dir: Directory path relative to the root
+
+        Returns:
+            False only if no pattern can match anything below the directory
+        """
+        if not self._constraints:
+            return True
+        parts = _parts(str(rel_dir))
+        for prefix, _, wildcard in self._constraints:
+            if len(parts) <= len(prefix):
+                # The directory leads towards the prefix
+                if parts == prefix[: len(parts)]:
+                    return True
+            # Below the prefix, only a wildcard can match deeper paths
+            elif wildcard and parts[: len(prefix)] == prefix:
+                return True
+        return False
+
+    def matches(self, rel_path_str: str) -> bool:
+        """
+        Check a relative file path against the include patterns.
+
+        Args:
+            rel_path_str: File path relative to the root
+
+        Returns:
+            True if no patterns are set or the path matches at least one
+        """
+        if not self.include_patterns:
+            return True
+        name = os.path.normcase(rel_path_str)
+        return any(
+            name.endswith(suffix) and fnmatch.fnmatch(rel_path_str, pattern)
+            for pattern, (_, suffix, _) in zip(self.include_patterns, self._constraints)
+        )
@@ -0,0 +1,106 @@
+"""
+Progress events and cancellation for callers embedding prompt generation.
+
+A ProgressObserver receives events as a run walks the source and writes the
+prompt; a CancellationToken lets another thread stop the run. Both are
+optional, and a run without them does no extra work beyond a None check per
+entry.
+"""
+
+import threading
+from pathlib import Path
+
+# Phases reported to ProgressObserver.phase_started, in order
+PHASE_WALK = "walk"
+PHASE_WRITE = "write"
+PHASE_DONE = "done"
+
+
+class PromptCancelledError(Exception):
+    """Raised when a run is stopped through its CancellationToken."""
+
+
+class CancellationToken:
+    """
+    A thread-safe flag that stops a running prompt generation.
+
+    The token is checked between directory entries while walking and between
+    files while writing, so a run stops shortly after cancel() is called.
+    """
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        """Request the run using this token to stop."""
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether cancel() has been called."""
+        return self._event.is_set()
+
+    def raise_if_cancelled(self) -> None:
+        """
+        Stop the current run if cancellation was requested.
+
+        Raises:
+            PromptCancelledError: If cancel() has been called
+        """
+        if self._event.is_set():
+            msg = "Prompt generation was cancelled"
+            raise PromptCancelledError(msg)
+
+
+class ProgressObserver:
+    """
+    Base class for progress observers.
+
+    Every method is a no-op; subclasses override the events they need.
+    Events are delivered synchronously on the thread running the generation,
+    so handlers should return quickly.
+    """
+
+    def phase_started(self, phase: str) -> None:
+        """
+        Called when the run enters a new phase.
+
+        Args:
+            phase: One of PHASE_WALK, PHASE_WRITE or PHASE_DONE
+        """
+
+    def entry_walked(self, path: Path, is_dir: bool, excluded: bool) -> None:
+        """
+        Called for every directory and file the walk sees.
+
+        Args:
+            path: Path relative to the root of the source
+            is_dir: Whether the entry is a directory
+            excluded: Whether the entry was left out of the prompt
+        """
+
+    def files_selected(self, count: int, total_bytes: int) -> None:
+        """
+        Called once the walk is done, before any file is read.
+
+        Args:
+            count: Number of files that will be written
+            total_bytes: Their combined size, as far as the source knows it
+        """
+
+    def file_read(self, path: Path, length: int) -> None:
+        """
+        Called after a file's content has been read.
+
+        Args:
+            path: Path relative to the root of the source
+            length: Length of the content in characters
+        """
+
+    def file_written(self, path: Path) -> None:
+        """
+        Called after a file's section has been written to the output.
+
+        Args:
+            path: Path relative to the root of the source
+        """
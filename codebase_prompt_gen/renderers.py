@@ -0,0 +1,255 @@
+"""
+Output renderers for generated prompts.
+
+A renderer turns the scan result into text, one section at a time, so the
+prompt can be streamed to its destination without buffering the document.
+"""
+
+import re
+from abc import ABC, abstractmethod
+from collections.abc import Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from codebase_prompt_gen.boilerplate import BoilerplateBlock
+
+# Characters that are not allowed in XML 1.0 documents, even when escaped
+_XML_INVALID_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+_BACKTICK_RUN = re.compile(r"`{3,}")
+
+
+def language_hint(file_path: Path) -> str:
+    """Return a language hint for a file based on its extension (may be empty)."""
+    return file_path.suffix.lstrip(".") if file_path.suffix else ""
+
+
+def markdown_fence(content: str) -> str:
+    """
+    Return a code fence that cannot be closed by anything inside the content.
+
+    Args:
+        content: The text that will be placed between the fences
+
+    Returns:
+        A run of backticks longer than the longest run found in the content
+        (at least three).
+    """
+    longest = max((len(match) for match in _BACKTICK_RUN.findall(content)), default=2)
+    return "`" * max(3, longest + 1)
+
+
+def xml_escape(text: str, quote: bool = False) -> str:
+    """
+    Escape text for use in XML character data or attribute values.
+
+    Args:
+        text: The text to escape
+        quote: Whether double quotes should also be escaped (for attributes)
+
+    Returns:
+        The escaped text with characters invalid in XML replaced by U+FFFD.
+    """
+    text = text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    if quote:
+        text = text.replace('"', "&quot;")
+    return _XML_INVALID_CHARS.sub("\ufffd", text)
+
+
+class PromptRenderer(ABC):
+    """
+    Base class for prompt renderers.
+
+    Each method returns one complete section of the output, which the caller
+    writes as soon as it is produced.
+    """
+
+    name = ""
+
+    @abstractmethod
+    def header(
+        self, repo_name: str, file_tree: list[str], boilerplate: Sequence["BoilerplateBlock"] = ()
+    ) -> str:
+        """
+        Render everything that precedes the first file section.
+
+        Repeated blocks, if any, are listed once here; file sections refer to
+        them by number.
+        """
+
+    @abstractmethod
+    def file_section_parts(
+        self, file_path: Path, content: str, outline: bool = False
+    ) -> tuple[str, str, str]:
+        """
+        Render the section for a single file as (prefix, body, suffix).
+
+        The body is the file content as it appears in the output (escaped if the
+        format requires it), which lets callers locate it inside the section.
+        When outline is True the content is a skeleton of the file, not its full text.
+        """
+
+    def file_section(self, file_path: Path, content: str, outline: bool = False) -> str:
+        """Render the section for a single file."""
+        return "".join(self.file_section_parts(file_path, content, outline))
+
+    def empty(self) -> str:
+        """Render the placeholder used when no file contents are included."""
+        return ""
+
+    def footer(self) -> str:
+        """Render everything that follows the last file section."""
+        return ""
+
+
+class MarkdownRenderer(PromptRenderer):
+    """Renders the prompt as Markdown with fenced code blocks."""
+
+    name = "markdown"
+
+    def header(
+        self, repo_name: str, file_tree: list[str], boilerplate: Sequence["BoilerplateBlock"] = ()
+    ) -> str:
+        header = f"# Repository: {repo_name}\n\n"
+        header += "## File Tree Structure\n\n"
+        if file_tree:
+            header += "```\n" + "\n".join(file_tree) + "\n```"
+        else:
+            header += "No files or directories found matching the criteria."
+        header += "\n\n"
+        if boilerplate:
+            header += "## Repeated Blocks\n\n"
+            header += (
+                "These blocks start or end several files. In the file contents below, "
+                "each copy is replaced by `[repeated block N: L lines]`.\n\n"
+            )
+            for block in boilerplate:
+                fence = markdown_fence(block.text)
+                text = block.text.rstrip("\n")
+                header += f"### Block {block.number} ({block.position}, {block.line_count} lines)"
+                header += f"\n\n{fence}\n{text}\n{fence}\n\n"
+        header += "## File Contents\n\n"
+        return header
+
+    def file_section_parts(
+        self, file_path: Path, content: str, outline: bool = False
+    ) -> tuple[str, str, str]:
+        fence = markdown_fence(content)
+        note = " (outline)" if outline else ""
+        prefix = f"### `{file_path}`{note}\n\n{fence}{language_hint(file_path)}\n"
+        return prefix, content, f"\n{fence}\n\n"
+
+    def empty(self) -> str:
+        return "No file contents included based on criteria.\n"
+
+
+class JsonLinesRenderer(PromptRenderer):
+    """
+    Renders the prompt as JSON Lines.
+
+    The first record describes the repository and its file tree; every
+    following record describes one file.
+    """
+
+    name = "jsonl"
+
+    def header(
+        self, repo_name: str, file_tree: list[str], boilerplate: Sequence["BoilerplateBlock"] = ()
+    ) -> str:
+        import json  # Only JSON Lines output needs it
+
+        records = [{"type": "repository", "name": repo_name, "tree": file_tree}]
+        records.extend(
+            {
+                "type": "boilerplate",
+                "id": block.number,
+                "position": block.position,
+                "lines": block.line_count,
+                "content": block.text,
+            }
+            for block in boilerplate
+        )
+        return "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+
+    def file_section_parts(
+        self, file_path: Path, content: str, outline: bool = False
+    ) -> tuple[str, str, str]:
+        import json
+
+        record = {
+            "type": "file",
+            "path": file_path.as_posix(),
+            "size": len(content.encode("utf-8", errors="surrogatepass")),
+            "lang": language_hint(file_path),
+            "content": content,
+        }
+        if outline:
+            record["outline"] = True
+        return "", json.dumps(record, ensure_ascii=False), "\n"
+
+
+class XmlRenderer(PromptRenderer):
+    """Renders the prompt as an XML document with one element per file."""
+
+    name = "xml"
+
+    def header(
+        self, repo_name: str, file_tree: list[str], boilerplate: Sequence["BoilerplateBlock"] = ()
+    ) -> str:
+        lines = [
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            f'<repository name="{xml_escape(repo_name, quote=True)}">',
+            "<file_tree>",
+            *(xml_escape(entry) for entry in file_tree),
+            "</file_tree>",
+        ]
+        if boilerplate:
+            lines.append("<repeated_blocks>")
+            lines.extend(
+                f'<block id="{block.number}" position="{block.position}" '
+                f'lines="{block.line_count}">\n{xml_escape(block.text)}\n</block>'
+                for block in boilerplate
+            )
+            lines.append("</repeated_blocks>")
+        lines.append("<files>")
+        return "\n".join(lines) + "\n"
+
+    def file_section_parts(
+        self, file_path: Path, content: str, outline: bool = False
+    ) -> tuple[str, str, str]:
+        path = xml_escape(file_path.as_posix(), quote=True)
+        lang = xml_escape(language_hint(file_path), quote=True)
+        size = len(content.encode("utf-8", errors="surrogatepass"))
+        note = ' outline="true"' if outline else ""
+        prefix = f'<file path="{path}" size="{size}" lang="{lang}"{note}>\n'
+        return prefix, xml_escape(content), "\n</file>\n"
+
+    def footer(self) -> str:
+        return "</files>\n</repository>\n"
+
+
+RENDERERS: dict[str, type[PromptRenderer]] = {
+    MarkdownRenderer.name: MarkdownRenderer,
+    JsonLinesRenderer.name: JsonLinesRenderer,
+    XmlRenderer.name: XmlRenderer,
+}
+
+
+def get_renderer(output_format: str) -> PromptRenderer:
+    """
+    Create a renderer for the given output format.
+
+    Args:
+        output_format: One of the names in RENDERERS
+
+    Returns:
+        A new renderer instance
+
+    Raises:
+        ValueError: If the output format is unknown
+    """
+    try:
+        return RENDERERS[output_format]()
+    except KeyError:
+        msg = f"Unknown output format: {output_format!r} (choose from {', '.join(RENDERERS)})"
+        raise ValueError(msg) from None
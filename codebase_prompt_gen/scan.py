@@ -0,0 +1,141 @@
+"""
+Scan results shared by several outputs.
+
+A scan walks an input source once, applying the exclude patterns and
+.gitignore, and keeps every entry that any output may need. Each output then
+selects its own files from the result with its own include patterns, so a
+full prompt and, say, a tests-only prompt can be written from one walk, with
+every file read at most once.
+"""
+
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from codebase_prompt_gen.planning import IncludePlan
+from codebase_prompt_gen.sources import SourceEntry
+from codebase_prompt_gen.tree import TreeEntry, TreeStyle
+
+if TYPE_CHECKING:
+    from codebase_prompt_gen.outline import OutlinePolicy
+
+
+@dataclass
+class ScanResult:
+    """The entries of one walk of an input source that passed the excludes."""
+
+    # Name shown in the prompt header
+    name: str
+    # Directories, and files matching the scan's include patterns, in walk order
+    entries: list[SourceEntry] = field(default_factory=list)
+    # Include patterns the scan applied (empty: every file was kept)
+    include_patterns: list[str] = field(default_factory=list)
+    # Whether the walk skipped directories the include patterns rule out
+    prunes_directories: bool = False
+    # Local directory the paths are relative to, for stat() (None for other sources)
+    root: Path | None = None
+    # Generated, vendored and lock files (and vendored directories), by the reason
+    skipped: dict[Path, str] = field(default_factory=dict)
+
+    def select(
+        self, include_patterns: list[str] | None = None
+    ) -> tuple[list[TreeEntry], list[tuple[Path, Callable[[], str]]]]:
+        """
+        Select the tree entries and files of one output.
+
+        The result is what a walk with these include patterns alone would
+        have produced, provided they are narrower than the scan's patterns.
+
+        Args:
+            include_patterns: Glob patterns to include (files only). None or an
+                              empty list selects every scanned file.
+
+        Returns:
+            Tuple of (tree_entries, files_content), where files reached through
+            several paths are listed once and referenced from the others, and
+            skipped files are in the tree only.
+        """
+        if include_patterns == self.include_patterns:
+            # The scan already applied exactly these patterns
+            include_patterns = None
+        plan = IncludePlan(include_patterns or [])
+        prune = self.prunes_directories and plan.prunes
+
+        tree_entries: list[TreeEntry] = []
+        files_content: list[tuple[Path, Callable[[], str]]] = []
+        # Files already selected, keyed by their source identity
+        seen_files: dict[Hashable, Path] = {}
+
+        for entry in self.entries:
+            rel_path = entry.path
+            # A walk with this plan alone lists such directories but not their contents;
+            # the plan is closed under parents, so checking the parent is enough
+            if prune and rel_path.parent != Path() and not plan.may_contain(rel_path.parent):
+                continue
+            if entry.is_dir:
+                tree_entries.append(
+                    TreeEntry(
+                        rel_path,
+                        is_dir=True,
+                        same_as=entry.alias,
+                        skipped=self.skipped.get(rel_path),
+                    )
+                )
+                continue
+            if entry.read is None or not plan.matches(str(rel_path)):
+                continue
+            skipped = self.skipped.get(rel_path)
+            if skipped is not None:
+                # Listed, but its content is left out
+                tree_entries.append(
+                    TreeEntry(rel_path, is_dir=False, size=entry.size, skipped=skipped)
+                )
+                continue
+            if entry.identity is not None:
+                first = seen_files.get(entry.identity)
+                if first is not None:
+                    tree_entries.append(
+                        TreeEntry(rel_path, is_dir=False, size=entry.size, same_as=first)
+                    )
+                    continue
+                seen_files[entry.identity] = rel_path
+            tree_entries.append(TreeEntry(rel_path, is_dir=False, size=entry.size))
+            files_content.append((rel_path, entry.read))
+        return tree_entries, files_content
+
+
+@dataclass
+class PromptTarget:
+    """One output written from a scan, with its own selection and rendering."""
+
+    # Callable that accepts a string and writes it
+    output_stream: Callable[[str], Any]
+    # Glob patterns to include (files only); empty selects every scanned file
+    include_patterns: list[str] = field(default_factory=list)
+    # Name of the renderer to use
+    output_format: str = "markdown"
+    # How to render the file tree (None: flat)
+    tree_style: TreeStyle | None = None
+    # Files to emit as outlines; a budget is counted for this target alone
+    outline_policy: "OutlinePolicy | None" = None
+    # Optional sidecar index of the file sections
+    index_file: Path | None = None
+    # Emit blocks repeated at the start or end of many files once, near the top
+    boilerplate: bool = False
+
+
+def scan_include_patterns(targets: list[PromptTarget]) -> list[str]:
+    """
+    Return the include patterns a scan feeding several targets must apply.
+
+    Args:
+        targets: The targets to feed
+
+    Returns:
+        The union of the targets' patterns, or an empty list (everything) if
+        any target includes every file
+    """
+    if any(not target.include_patterns for target in targets):
+        return []
+    return list(dict.fromkeys(p for target in targets for p in target.include_patterns))
@@ -0,0 +1,205 @@
+"""
+Buffered output sinks for prompt text.
+
+A prompt is written as many strings: the header, one string per file section
+and the footer. Writing each of them straight to a file or pipe, and
+flushing stdout after each one, costs a system call per string. An
+OutputSink gathers the strings in a large buffer, encodes them once and
+writes them in big blocks, flushing according to an explicit policy.
+
+When the reader of a pipe exits early (`codebase-prompt | head`), the next
+write raises OutputClosedError, which stops the run before it reads the rest
+of the repository.
+"""
+
+import contextlib
+import errno
+import os
+import sys
+import time
+from types import TracebackType
+from typing import IO, Any
+
+# Characters buffered before they are written out
+BUFFER_SIZE = 1 << 20
+
+# Flush only when the buffer is full and when the sink is closed
+FLUSH_FULL = "full"
+# Flush after every write: the header, each file section and the footer
+FLUSH_SECTION = "section"
+# Flush when the buffer is full or FLUSH_INTERVAL seconds have passed since the last flush
+FLUSH_INTERVAL = "interval"
+FLUSH_POLICIES = (FLUSH_FULL, FLUSH_SECTION, FLUSH_INTERVAL)
+
+# Seconds between flushes for the interval policy
+FLUSH_INTERVAL_SECONDS = 0.2
+
+
+class OutputClosedError(Exception):
+    """Raised when the reader of the output has gone away, e.g. a closed pipe."""
+
+
+def _is_closed_pipe(error: OSError) -> bool:
+    if isinstance(error, BrokenPipeError) or error.errno == errno.EPIPE:
+        return True
+    # Windows reports writes to a closed pipe as EINVAL
+    return sys.platform == "win32" and error.errno == errno.EINVAL
+
+
+class OutputSink:
+    """
+    Buffers prompt text and writes it to a stream in large blocks.
+
+    Use its write method as the output_stream of generate_prompt:
+
+        with OutputSink(Path("prompt.md").open("wb"), close_stream=True) as sink:
+            generate_prompt(repo, [], [], output_stream=sink.write)
+    """
+
+    def __init__(
+        self,
+        stream: IO[bytes] | IO[str] | Any,
+        flush_policy: str = FLUSH_FULL,
+        buffer_size: int = BUFFER_SIZE,
+        binary: bool = True,
+        close_stream: bool = False,
+    ) -> None:
+        """
+        Set up the sink.
+
+        Args:
+            stream: Stream to write to. Binary streams receive UTF-8; text
+                    streams (binary=False) receive str, without newline
+                    translation by the sink.
+            flush_policy: FLUSH_FULL, FLUSH_SECTION or FLUSH_INTERVAL
+            buffer_size: Characters buffered before they are written
+            binary: Whether the stream takes bytes
+            close_stream: Whether close() also closes the stream
+
+        Raises:
+            ValueError: If the flush policy is unknown
+        """
+        if flush_policy not in FLUSH_POLICIES:
+            msg = (
+                f"Unknown flush policy: {flush_policy!r} (choose from {', '.join(FLUSH_POLICIES)})"
+            )
+            raise ValueError(msg)
+        self._stream = stream
+        self.flush_policy = flush_policy
+        self.buffer_size = buffer_size
+        self.binary = binary
+        self.close_stream = close_stream
+        self._pending: list[str] = []
+        self._pending_size = 0
+        self._last_flush = time.monotonic()
+
+    def write(self, text: str) -> None:
+        """
+        Buffer text, writing the buffer out as the flush policy requires.
+
+        Raises:
+            OutputClosedError: If the reader of the output has gone away
+            OSError: If writing fails otherwise
+        """
+        self._pending.append(text)
+        self._pending_size += len(text)
+        if (
+            self._pending_size >= self.buffer_size
+            or self.flush_policy == FLUSH_SECTION
+            or (
+                self.flush_policy == FLUSH_INTERVAL
+                and time.monotonic() - self._last_flush >= FLUSH_INTERVAL_SECONDS
+            )
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Write out the buffer and flush the stream.
+
+        Raises:
+            OutputClosedError: If the reader of the output has gone away
+            OSError: If writing fails otherwise
+        """
+        text = "".join(self._pending)
+        self._pending.clear()
+        self._pending_size = 0
+        self._last_flush = time.monotonic()
+        try:
+            if text:
+                self._stream.write(text.encode("utf-8") if self.binary else text)
+            flush = getattr(self._stream, "flush", None)
+            if flush is not None:
+                flush()
+        except OSError as e:
+            if _is_closed_pipe(e):
+                raise OutputClosedError(str(e)) from e
+            raise
+
+    def close(self) -> None:
+        """
+        Flush the buffer, and close the stream if the sink owns it.
+
+        Raises:
+            OutputClosedError: If the reader of the output has gone away
+            OSError: If writing or closing fails
+        """
+        try:
+            self.flush()
+        finally:
+            if self.close_stream:
+                self._stream.close()
+
+    def __enter__(self) -> "OutputSink":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        if exc_type is OutputClosedError:
+            # Nothing more can be written; only release the stream
+            self._pending.clear()
+            if self.close_stream:
+                with contextlib.suppress(OSError):
+                    self._stream.close()
+            return
+        self.close()
+
+
+def stdout_sink(flush_policy: str | None = None) -> OutputSink:
+    """
+    Return a sink writing to standard output.
+
+    Args:
+        flush_policy: Flush policy; by default every section is flushed on a
+                      terminal, so output appears as it is generated, and pipes
+                      are flushed at intervals, so a reader that exits early
+                      is noticed soon
+
+    Returns:
+        A sink that does not close standard output
+    """
+    if flush_policy is None:
+        flush_policy = FLUSH_SECTION if sys.stdout.isatty() else FLUSH_INTERVAL
+    # Text printed earlier must come out before the sink writes underneath it
+    sys.stdout.flush()
+    buffer = getattr(sys.stdout, "buffer", None)
+    if buffer is not None:
+        return OutputSink(buffer, flush_policy)
+    return OutputSink(sys.stdout, flush_policy, binary=False)
+
+
+def silence_stdout() -> None:
+    """
+    Point standard output at the null device after its reader went away.
+
+    Otherwise Python reports a BrokenPipeError when it flushes standard
+    output at exit.
+    """
+    with contextlib.suppress(OSError, ValueError):
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        os.close(devnull)
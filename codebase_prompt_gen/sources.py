@@ -0,0 +1,143 @@
+"""
+Input sources for prompt generation.
+
+An input source lists the files and directories a prompt is generated from.
+The filesystem walk in core is one source; others read from places that are
+not a checked-out directory, such as a git revision or an archive.
+"""
+
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Hashable, Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from types import TracebackType
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import tempfile
+
+
+@dataclass(frozen=True)
+class SourceEntry:
+    """A file or directory offered by an input source."""
+
+    # Path relative to the root of the source
+    path: Path
+    is_dir: bool
+    # Lazily reads the file content (files only)
+    read: Callable[[], str] | None = None
+    # Size in bytes, when the source knows it without reading the file
+    size: int | None = None
+    # Files sharing an identity are the same underlying data and read only once
+    identity: Hashable | None = None
+    # For directories that were not descended into: where they were first seen
+    alias: Path | None = None
+    # Reads up to the given number of leading bytes, where the source can do so cheaply
+    read_head: Callable[[int], bytes] | None = None
+
+
+class InputSource(ABC):
+    """
+    Base class for input sources.
+
+    Sources are context managers so that they can hold resources, such as a
+    subprocess, for as long as file contents are still being read.
+    """
+
+    # Name shown in the prompt header
+    name = ""
+    _gitignore_dir: "tempfile.TemporaryDirectory[str] | None" = None
+
+    @abstractmethod
+    def entries(self) -> Iterator[SourceEntry]:
+        """
+        Yield every entry of the source.
+
+        Entries are yielded in the order of sorted(Path.rglob("*")) on an
+        equivalent directory: depth-first, with siblings sorted by name.
+        """
+
+    @abstractmethod
+    def gitignore_file(self) -> tuple[Path, Path] | None:
+        """
+        Return the source's top-level .gitignore on local disk, if it has one.
+
+        Returns:
+            Tuple of (gitignore_path, root_path) to build a matcher from, where
+            entry paths are matched relative to root_path, or None.
+        """
+
+    def expect_reads(self, paths: Iterable[Path]) -> None:
+        """
+        Announce the files whose content will be read, once the scan is done.
+
+        Sources that must buffer content to serve it in walk order buffer
+        only these files; other sources ignore the call.
+
+        Args:
+            paths: Paths of the selected files, relative to the root of the source
+        """
+        del paths  # Only sources that buffer content use them
+
+    def gitattributes(self) -> bytes | None:
+        """Return the content of the source's top-level .gitattributes, if it has one."""
+        return None
+
+    def _materialize_gitignore(self, data: bytes | None) -> tuple[Path, Path]:
+        """
+        Write .gitignore content to a temporary root so the usual matcher can parse it.
+
+        Args:
+            data: The .gitignore content, or None if the source has none
+
+        Returns:
+            Tuple of (gitignore_path, root_path) as returned by gitignore_file
+        """
+        if self._gitignore_dir is None:
+            import tempfile
+
+            self._gitignore_dir = tempfile.TemporaryDirectory(prefix="codebase-prompt-")
+        root = Path(self._gitignore_dir.name)
+        gitignore_path = root / ".gitignore"
+        if data is not None:
+            gitignore_path.write_bytes(data)
+        return gitignore_path, root
+
+    def close(self) -> None:
+        """Release any resources held by the source."""
+        if self._gitignore_dir is not None:
+            self._gitignore_dir.cleanup()
+            self._gitignore_dir = None
+
+    def __enter__(self) -> "InputSource":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+def entries_from_file_list(
+    files: Iterable[tuple[PurePosixPath, Callable[[], str] | None, int | None, Hashable | None]],
+) -> Iterator[SourceEntry]:
+    """
+    Turn a flat list of files into entries, adding their parent directories.
+
+    Args:
+        files: (path, content_getter, size, identity) for every file, in any order
+
+    Yields:
+        Directory and file entries in the order InputSource.entries documents
+    """
+    seen_dirs: set[PurePosixPath] = set()
+    for path, read, size, identity in sorted(files, key=lambda item: item[0].parts):
+        for depth in range(1, len(path.parts)):
+            parent = PurePosixPath(*path.parts[:depth])
+            if parent not in seen_dirs:
+                seen_dirs.add(parent)
+                yield SourceEntry(Path(parent), is_dir=True)
+        yield SourceEntry(Path(path), is_dir=False, read=read, size=size, identity=identity)
@@ -0,0 +1,205 @@
+"""
+Renderings of the file tree section.
+
+The flat rendering lists every entry with its full relative path. In deep
+repositories that repeats long directory prefixes on every line, so the
+indented rendering prints each directory name once and indents its contents,
+can collapse chains of single-child directories into one line, and can
+summarise directories with many entries as a file count and size.
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+
+TREE_LAYOUTS = ("flat", "indented")
+
+# Indentation per level of the indented rendering
+INDENT = "  "
+
+
+@dataclass(frozen=True)
+class TreeEntry:
+    """A directory or file shown in the file tree."""
+
+    path: Path
+    is_dir: bool
+    # Size in bytes, when known (files only)
+    size: int | None = None
+    # Where the same directory or file was first listed, for repeated entries
+    same_as: Path | None = None
+    # Why the content was left out (e.g. "lockfile"), for generated and vendored entries
+    skipped: str | None = None
+
+    def note(self) -> str:
+        """Return the remark printed after the entry's name, if any."""
+        if self.same_as is not None:
+            return f" (same as {self.same_as}{'/' if self.is_dir else ''})"
+        if self.skipped is not None:
+            return f" (skipped: {self.skipped})"
+        return ""
+
+
+@dataclass(frozen=True)
+class TreeStyle:
+    """How the file tree section is rendered."""
+
+    # "flat" or "indented"
+    layout: str = "flat"
+    # Join chains of directories that contain a single directory into one line
+    collapse_chains: bool = False
+    # Summarise directories with more direct entries than this (None: never)
+    summarize_above: int | None = None
+
+    def __post_init__(self) -> None:
+        if self.layout not in TREE_LAYOUTS:
+            msg = f"Unknown tree layout: {self.layout!r} (choose from {', '.join(TREE_LAYOUTS)})"
+            raise ValueError(msg)
+        if self.layout == "flat" and (self.collapse_chains or self.summarize_above is not None):
+            msg = "Collapsing and summarising directories need the indented tree layout"
+            raise ValueError(msg)
+
+
+@dataclass
+class _Node:
+    """A directory (or file) of the tree being rendered."""
+
+    name: str
+    entry: TreeEntry | None = None
+    children: dict[str, "_Node"] = field(default_factory=dict)
+
+    @property
+    def is_dir(self) -> bool:
+        # Directories implied by a nested entry have no entry of their own
+        return self.entry is None or self.entry.is_dir
+
+    def totals(self) -> tuple[int, int]:
+        """Return the number of files below this node and their combined size."""
+        files, size = 0, 0
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            for child in node.children.values():
+                if child.is_dir:
+                    stack.append(child)
+                else:
+                    files += 1
+                    size += (child.entry.size if child.entry else None) or 0
+        return files, size
+
+
+def render_flat(entries: list[TreeEntry]) -> list[str]:
+    """Render every entry on its own line with its full path."""
+    lines = []
+    for entry in entries:
+        if entry.is_dir:
+            lines.append(f"📁 {entry.path}/{entry.note()}")
+        else:
+            lines.append(f"📄 {entry.path}{entry.note()}")
+    return lines
+
+
+def _build(entries: list[TreeEntry]) -> _Node:
+    root = _Node("")
+    for entry in entries:
+        node = root
+        for part in entry.path.parts[:-1]:
+            node = node.children.setdefault(part, _Node(part))
+        name = entry.path.name
+        existing = node.children.get(name)
+        if existing is not None:
+            existing.entry = entry
+        else:
+            node.children[name] = _Node(name, entry)
+    return root
+
+
+def render_indented(
+    entries: list[TreeEntry],
+    collapse_chains: bool = False,
+    summarize_above: int | None = None,
+) -> list[str]:
+    """
+    Render entries as an indented hierarchy.
+
+    Args:
+        entries: Tree entries in walk order (parents before their contents)
+        collapse_chains: Join chains of single-directory directories into one line
+        summarize_above: Summarise directories with more direct entries than
+                         this as "N files, M bytes" instead of listing them
+
+    Returns:
+        The lines of the rendering
+    """
+    lines: list[str] = []
+    # (node, depth) pairs still to render, in reverse order
+    stack = [(child, 0) for child in reversed(_build(entries).children.values())]
+    while stack:
+        node, depth = stack.pop()
+        indent = INDENT * depth
+        note = node.entry.note() if node.entry else ""
+        if not node.is_dir:
+            lines.append(f"{indent}{node.name}{note}")
+            continue
+
+        label = node.name
+        while collapse_chains and not note and len(node.children) == 1:
+            (child,) = node.children.values()
+            if not child.is_dir or (child.entry and child.entry.note()):
+                break
+            label = f"{label}/{child.name}"
+            node = child
+
+        if note:
+            lines.append(f"{indent}{label}/{note}")
+        elif summarize_above is not None and len(node.children) > summarize_above:
+            files, size = node.totals()
+            lines.append(f"{indent}{label}/ ({files} files, {size} bytes)")
+        else:
+            lines.append(f"{indent}{label}/")
+            stack.extend((child, depth + 1) for child in reversed(node.children.values()))
+    return lines
+
+
+def render_tree(entries: list[TreeEntry], style: TreeStyle | None = None) -> list[str]:
+    """
+    Render the file tree section.
+
+    Args:
+        entries: Tree entries in walk order
+        style: How to render them (default: flat)
+
+    Returns:
+        The lines of the rendering
+    """
+    if style is None or style.layout == "flat":
+        return render_flat(entries)
+    return render_indented(entries, style.collapse_chains, style.summarize_above)
+
+
+def tree_rendering_sizes(
+    entries: list[TreeEntry], summarize_above: int | None = None
+) -> dict[str, tuple[int, int]]:
+    """
+    Measure every rendering of a tree.
+
+    Args:
+        entries: Tree entries in walk order
+        summarize_above: Threshold for the summarising rendering (None: skip it)
+
+    Returns:
+        (lines, UTF-8 bytes) of each rendering, by a descriptive name
+    """
+    styles = {
+        "flat": TreeStyle(),
+        "indented": TreeStyle("indented"),
+        "indented, collapsed": TreeStyle("indented", collapse_chains=True),
+    }
+    if summarize_above is not None:
+        styles["indented, collapsed, summarised"] = TreeStyle(
+            "indented", collapse_chains=True, summarize_above=summarize_above
+        )
+    sizes = {}
+    for name, style in styles.items():
+        lines = render_tree(entries, style)
+        sizes[name] = (len(lines), len("\n".join(lines).encode("utf-8")))
+    return sizes
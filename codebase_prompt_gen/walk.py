@@ -0,0 +1,205 @@
+"""
+Sorted directory walking, optionally listing directories concurrently.
+
+The walk always yields paths in the order of sorted(Path.rglob("*")):
+depth-first, with siblings sorted by name. On filesystems where every listing
+and stat is a network round trip (NFS, SSHFS, some overlay mounts), the
+listings can be fetched ahead of the walk on a bounded thread pool; the walk
+itself still consumes them one at a time, in the same order, so the output
+does not depend on the number of workers.
+"""
+
+import logging
+import os
+import stat as stat_module
+import threading
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+# A directory listing: entries sorted by name, each with its stat (following
+# symlinks), or None if the entry could not be stat'ed (e.g. a broken link)
+Listing = list[tuple[os.DirEntry[str], os.stat_result | None]]
+
+
+def list_directory(directory: Path) -> Listing:
+    """
+    List a directory sorted by name and stat every entry.
+
+    Unreadable directories are treated as empty.
+
+    Args:
+        directory: The directory to list
+
+    Returns:
+        The sorted listing
+    """
+    try:
+        with os.scandir(directory) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+    except OSError as e:
+        logging.warning("Could not list directory %s: %s", directory, e)
+        return []
+    listing: Listing = []
+    for entry in entries:
+        try:
+            listing.append((entry, entry.stat()))
+        except OSError:
+            listing.append((entry, None))
+    return listing
+
+
+def _is_walkable_dir(
+    entry: os.DirEntry[str], stat: os.stat_result | None, follow_symlinks: bool
+) -> bool:
+    """Check whether an entry is a directory the walk may descend into."""
+    if stat is None or not stat_module.S_ISDIR(stat.st_mode):
+        return False
+    return follow_symlinks or not entry.is_symlink()
+
+
+class DirectoryPrefetcher:
+    """
+    Lists directories ahead of a walk on a thread pool.
+
+    Every listed directory immediately queues the listings of the
+    subdirectories the walk will descend into, so the pool works through the
+    tree in parallel while the walk waits only for the listing it needs next.
+    """
+
+    def __init__(
+        self,
+        root_dir: Path,
+        max_workers: int,
+        follow_symlinks: bool,
+        descend: Callable[[Path], bool] | None = None,
+    ) -> None:
+        self.root_dir = root_dir
+        self.follow_symlinks = follow_symlinks
+        self.descend = descend
+        # Imported here: serial walks never start a pool
+        from concurrent.futures import ThreadPoolExecutor
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="codebase-prompt-walk"
+        )
+        self._lock = threading.Lock()
+        self._futures: dict[Path, Future[Listing]] = {}
+        # Directories queued so far, by (st_dev, st_ino), so link cycles end
+        self._queued: set[tuple[int, int]] = set()
+        self._closed = False
+
+    def submit(self, directory: Path, stat: os.stat_result | None = None) -> None:
+        """Queue a directory listing, unless the directory was already queued."""
+        with self._lock:
+            if self._closed:
+                return
+            if stat is not None:
+                key = (stat.st_dev, stat.st_ino)
+                if key in self._queued:
+                    return
+                self._queued.add(key)
+            self._futures[directory] = self._executor.submit(self._list, directory)
+
+    def _list(self, directory: Path) -> Listing:
+        listing = list_directory(directory)
+        for entry, stat in listing:
+            if not _is_walkable_dir(entry, stat, self.follow_symlinks):
+                continue
+            path = Path(entry.path)
+            if self.descend is None or self.descend(path.relative_to(self.root_dir)):
+                self.submit(path, stat)
+        return listing
+
+    def get(self, directory: Path) -> Listing:
+        """
+        Return a directory's listing, waiting for it if it is still queued.
+
+        Directories that were never queued (e.g. reached first through another
+        link than the one the prefetch took) are listed right away.
+        """
+        with self._lock:
+            future = self._futures.pop(directory, None)
+        if future is None:
+            return list_directory(directory)
+        return future.result()
+
+    def close(self) -> None:
+        """Stop queueing listings and drop the ones not started yet."""
+        with self._lock:
+            self._closed = True
+            self._futures.clear()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+def walk_sorted(
+    root_dir: Path,
+    follow_symlinks: bool,
+    dir_aliases: dict[Path, Path],
+    descend: Callable[[Path], bool] | None = None,
+    max_workers: int | None = None,
+) -> Iterator[tuple[Path, os.stat_result | None]]:
+    """
+    Walk a directory tree depth-first in sorted order.
+
+    When following symlinks, each directory is listed at most once per
+    (st_dev, st_ino), so link cycles and repeated links terminate in time
+    proportional to the distinct tree.
+
+    Args:
+        root_dir: The root directory to walk
+        follow_symlinks: Whether to descend into symlinked directories
+        dir_aliases: Filled with every yielded directory that was not descended
+                     into because it was already walked, mapped to the relative
+                     path it was first seen at
+        descend: Optional predicate on a directory's relative path; directories
+                 it rejects are yielded but never listed
+        max_workers: Number of threads listing directories ahead of the walk.
+                     None or 1 lists each directory when the walk reaches it.
+
+    Yields:
+        (path, stat) for every path under root_dir, in the same order as
+        sorted(rglob("*")). stat follows symlinks and is None if it failed.
+    """
+    root_stat = root_dir.stat()
+    visited: dict[tuple[int, int], Path] = {(root_stat.st_dev, root_stat.st_ino): Path()}
+
+    prefetcher = None
+    list_dir: Callable[[Path], Listing] = list_directory
+    if max_workers is not None and max_workers > 1:
+        prefetcher = DirectoryPrefetcher(root_dir, max_workers, follow_symlinks, descend)
+        prefetcher.submit(root_dir, root_stat)
+        list_dir = prefetcher.get
+
+    try:
+        stack: list[Iterator[tuple[os.DirEntry[str], os.stat_result | None]]] = [
+            iter(list_dir(root_dir))
+        ]
+        while stack:
+            item = next(stack[-1], None)
+            if item is None:
+                stack.pop()
+                continue
+
+            entry, stat = item
+            path = Path(entry.path)
+            if _is_walkable_dir(entry, stat, follow_symlinks):
+                if descend is not None and not descend(path.relative_to(root_dir)):
+                    logging.debug("Skipping directory no include pattern can match: %s", path)
+                elif not follow_symlinks or stat is None:
+                    stack.append(iter(list_dir(path)))
+                else:
+                    key = (stat.st_dev, stat.st_ino)
+                    first = visited.get(key)
+                    if first is not None:
+                        dir_aliases[path] = first
+                    else:
+                        visited[key] = path.relative_to(root_dir)
+                        stack.append(iter(list_dir(path)))
+            yield path, stat
+    finally:
+        if prefetcher is not None:
+            prefetcher.close()
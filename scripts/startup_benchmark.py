@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Measure the fixed start-up cost of the codebase-prompt CLI.
+
+Editor hooks run the CLI on every save, so most runs are short and dominated
+by interpreter start-up, imports and setup. This script reports:
+1. The slowest imports of the CLI, from `python -X importtime`
+2. The wall time of complete CLI runs on a tiny repository
+
+Usage:
+    python scripts/startup_benchmark.py [--runs N] [--top N] [--max-ms MS]
+
+With --max-ms it exits with status 1 when the median run is slower, so it can
+guard against start-up regressions in CI.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+CLI_MODULE = "codebase_prompt_gen.cli.main"
+
+
+def import_times(top: int) -> list[tuple[int, int, str]]:
+    """Return the slowest imports of the CLI as (cumulative us, self us, module)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {CLI_MODULE}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = []
+    for line in result.stderr.splitlines():
+        # "import time: <self us> | <cumulative us> | <indented module name>"
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line.removeprefix("import time:").split("|")
+        times.append((int(cumulative_us), int(self_us), module.rstrip()))
+    return sorted(times, reverse=True)[:top]
+
+
+def make_tiny_repo(root: Path) -> None:
+    """Create a repository of a few small files."""
+    (root / "src").mkdir()
+    (root / "README.md").write_text("# Tiny\n")
+    (root / ".gitignore").write_text("*.pyc\n")
+    (root / "src" / "main.py").write_text('print("hello")\n')
+
+
+def run_times(runs: int) -> list[float]:
+    """Return the wall time in seconds of each CLI run on a tiny repository."""
+    times = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        repo = Path(temp_dir) / "repo"
+        repo.mkdir()
+        make_tiny_repo(repo)
+        output = Path(temp_dir) / "prompt.md"
+        command = [sys.executable, "-m", CLI_MODULE, str(repo), "--output", str(output)]
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run(command, capture_output=True, check=True)
+            times.append(time.perf_counter() - start)
+    return times
+
+
+def main() -> int:
+    """Run the benchmark and print its report."""
+    parser = argparse.ArgumentParser(description="Measure the CLI start-up cost")
+    parser.add_argument("--runs", type=int, default=10, help="CLI runs to time (default: 10)")
+    parser.add_argument("--top", type=int, default=15, help="Imports to list (default: 15)")
+    parser.add_argument("--max-ms", type=float, help="Fail if the median run exceeds this")
+    args = parser.parse_args()
+
+    print(f"Slowest imports of {CLI_MODULE}:")
+    print(f"{'Cumulative ms':>14}  {'Self ms':>8}  Module")
+    for cumulative_us, self_us, module in import_times(args.top):
+        print(f"{cumulative_us / 1000:>14.1f}  {self_us / 1000:>8.1f}  {module}")
+
+    times = run_times(args.runs)
+    median_ms = statistics.median(times) * 1000
+    print(
+        f"\nCLI on a tiny repository, {args.runs} runs: "
+        f"min {min(times) * 1000:.1f} ms, median {median_ms:.1f} ms, "
+        f"max {max(times) * 1000:.1f} ms"
+    )
+    if args.max_ms is not None and median_ms > args.max_ms:
+        print(f"Median {median_ms:.1f} ms exceeds the limit of {args.max_ms:.1f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
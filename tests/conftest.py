@@ -0,0 +1,86 @@
+"""Fixtures shared by the tests."""
+
+from collections import Counter
+from collections.abc import Callable, Iterator, Mapping
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from codebase_prompt_gen import core
+from codebase_prompt_gen.core import generate_prompt
+
+
+@pytest.fixture
+def ignore_nothing() -> Iterator[None]:
+    """Make every .gitignore, including the global excludes file, ignore nothing."""
+    with mock.patch("codebase_prompt_gen.core.parse_gitignore", return_value=lambda _: False):
+        yield
+
+
+@pytest.fixture
+def no_global_gitignore() -> Iterator[None]:
+    """Leave the user's global excludes file out, so only the repository's .gitignore applies."""
+    with mock.patch("codebase_prompt_gen.core.get_global_gitignore_path", return_value=None):
+        yield
+
+
+@pytest.fixture
+def make_repo(tmp_path: Path) -> Callable[..., Path]:
+    """
+    Return a function creating a repository from file contents.
+
+    The function takes the contents (str or bytes) by relative path and an
+    optional directory name (default: "repo"), and returns the repository root.
+    """
+
+    def make(files: Mapping[str, str | bytes], name: str = "repo") -> Path:
+        root = tmp_path / name
+        root.mkdir(parents=True, exist_ok=True)
+        for rel_path, content in files.items():
+            path = root / rel_path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if isinstance(content, bytes):
+                path.write_bytes(content)
+            else:
+                path.write_text(content, encoding="utf-8")
+        return root
+
+    return make
+
+
+@pytest.fixture
+def render() -> Callable[..., str]:
+    """Return a function running generate_prompt on a path and returning the prompt."""
+
+    def run(repo_path: Path, **kwargs) -> str:
+        chunks: list[str] = []
+        generate_prompt(
+            repo_path,
+            exclude_patterns=kwargs.pop("exclude_patterns", []),
+            include_patterns=kwargs.pop("include_patterns", []),
+            output_stream=chunks.append,
+            **kwargs,
+        )
+        return "".join(chunks)
+
+    return run
+
+
+@pytest.fixture
+def file_reads() -> Iterator[Counter[Path]]:
+    """Count the content reads of every working-tree file, by path."""
+    reads: Counter[Path] = Counter()
+    build_getter = core.build_file_content_getter
+
+    def counting_getter(file_path: Path) -> Callable[[], str]:
+        getter = build_getter(file_path)
+
+        def get_content() -> str:
+            reads[file_path] += 1
+            return getter()
+
+        return get_content
+
+    with mock.patch.object(core, "build_file_content_getter", counting_getter):
+        yield reads
@@ -0,0 +1,177 @@
+"""Tests for reading prompts from tar and zip archives."""
+
+import io
+import tarfile
+import zipfile
+from collections.abc import Callable
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from codebase_prompt_gen.archive_source import TarStreamSource, member_path
+
+FILES = {
+    "project/.gitignore": b"*.log\n",
+    "project/src/main.py": b"print('hello')\n",
+    "project/debug.log": b"ignored\n",
+    "project/README.md": b"# Project\n",
+}
+
+
+def write_tar(path: Path) -> None:
+    """Write FILES, plus a hardlink, to a gzip-compressed tar archive."""
+    with tarfile.open(path, "w:gz") as tar:
+        for name, data in FILES.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+        link = tarfile.TarInfo("project/src/alias.py")
+        link.type = tarfile.LNKTYPE
+        link.linkname = "project/src/main.py"
+        tar.addfile(link)
+
+
+def write_zip(path: Path) -> None:
+    """Write FILES to a zip archive."""
+    with zipfile.ZipFile(path, "w") as archive:
+        for name, data in FILES.items():
+            archive.writestr(name, data)
+
+
+pytestmark = pytest.mark.usefixtures("no_global_gitignore")
+
+
+def test_member_path() -> None:
+    """Test that member names are made relative and stripped."""
+    assert member_path("/project/./src/../main.py", 1) == Path("src/main.py")
+    assert member_path("project/", 1) is None
+
+
+def test_tar_archive_prompt(tmp_path: Path, render: Callable[..., str]) -> None:
+    """Test that a compressed tar is read without extraction, honoring its .gitignore."""
+    archive = tmp_path / "drop.tar.gz"
+    write_tar(archive)
+
+    prompt = render(archive, strip_components=1)
+
+    assert "# Repository: drop" in prompt
+    assert "📄 src/main.py" in prompt
+    assert "print('hello')" in prompt
+    assert "debug.log" not in prompt
+    # The hardlink is listed as a reference to the file it shares data with
+    assert "📄 src/main.py (same as src/alias.py)" in prompt
+    assert prompt.count("print('hello')") == 1
+
+
+def test_zip_archive_prompt(tmp_path: Path, render: Callable[..., str]) -> None:
+    """Test that a zip archive produces the same prompt as the equivalent tar."""
+    archive = tmp_path / "drop.zip"
+    write_zip(archive)
+
+    prompt = render(archive, strip_components=1)
+
+    file_tree = prompt.split("## File Tree Structure")[1].split("## File Contents")[0]
+    assert "📄 .gitignore\n📄 README.md\n📁 src/\n📄 src/main.py" in file_tree
+    assert "debug.log" not in prompt
+
+
+def test_tar_skips_data_of_unselectable_members(tmp_path: Path) -> None:
+    """Test that members rejected by the keep predicate are listed without buffering."""
+    archive = tmp_path / "drop.tar.gz"
+    write_tar(archive)
+
+    with TarStreamSource(archive, strip_components=1, keep=lambda p: p.suffix == ".py") as source:
+        entries = {str(entry.path): entry for entry in source.entries()}
+
+    assert entries["README.md"].read is None
+    assert entries["src/main.py"].read is not None
+    # .gitignore is always kept so that it can be applied
+    assert entries[".gitignore"].read is not None
+
+
+def write_members(path: Path, members: list[tuple[str, bytes]], link: str | None = None) -> None:
+    """Write members in the given order, plus an optional hardlink src/alias.py to link."""
+    with tarfile.open(path, "w:gz") as tar:
+        for name, data in members:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+        if link is not None:
+            info = tarfile.TarInfo("project/src/alias.py")
+            info.type = tarfile.LNKTYPE
+            info.linkname = link
+            tar.addfile(info)
+
+
+def render_recording(
+    render: Callable[..., str], archive: Path
+) -> tuple[str, list[str], list[Path]]:
+    """Render an archive, returning the prompt, the members extracted and the archives opened."""
+    extracted: list[str] = []
+    opened: list[Path] = []
+    extractfile = tarfile.TarFile.extractfile
+    tar_open = tarfile.open
+
+    def recording_extractfile(tar: tarfile.TarFile, member: tarfile.TarInfo):
+        extracted.append(member.name)
+        return extractfile(tar, member)
+
+    def recording_open(name: Path, *args, **kwargs):
+        opened.append(name)
+        return tar_open(name, *args, **kwargs)
+
+    with mock.patch.object(tarfile.TarFile, "extractfile", recording_extractfile):
+        with mock.patch.object(tarfile, "open", recording_open):
+            prompt = render(archive, strip_components=1)
+    return prompt, extracted, opened
+
+
+def test_tar_buffers_only_selected_members(tmp_path: Path, render: Callable[..., str]) -> None:
+    """Test that ignored and generated members are never buffered, only listed."""
+    archive = tmp_path / "drop.tar.gz"
+    write_members(archive, [*FILES.items(), ("project/uv.lock", b"version = 1\n")])
+
+    prompt, extracted, opened = render_recording(render, archive)
+
+    assert "📄 uv.lock (skipped: lockfile)" in prompt
+    assert "print('hello')" in prompt
+    # One pass, deciding on each member as it streams past
+    assert opened == [archive]
+    assert extracted == [
+        "project/.gitignore",
+        "project/src/main.py",
+        "project/README.md",
+    ]
+
+
+def test_tar_buffers_members_preceding_the_gitignore(
+    tmp_path: Path, render: Callable[..., str]
+) -> None:
+    """Test that members before .gitignore are buffered, as the filter is not known yet."""
+    archive = tmp_path / "drop.tar.gz"
+    members = [(name, FILES[name]) for name in ("project/debug.log", "project/.gitignore")]
+    write_members(archive, [*members, ("project/other.log", b"also ignored\n")])
+
+    prompt, extracted, opened = render_recording(render, archive)
+
+    assert "ignored" not in prompt
+    assert opened == [archive]
+    assert extracted == ["project/debug.log", "project/.gitignore"]
+
+
+def test_tar_reads_skipped_members_again_when_selected(
+    tmp_path: Path, render: Callable[..., str]
+) -> None:
+    """Test that a second pass reads only the members the first pass wrongly skipped."""
+    archive = tmp_path / "drop.tar.gz"
+    # The hardlink is selected, but its ignored target was not buffered
+    write_members(archive, list(FILES.items()), link="project/debug.log")
+
+    prompt, extracted, opened = render_recording(render, archive)
+
+    assert "📄 src/alias.py" in prompt
+    assert "ignored" in prompt
+    assert opened == [archive, archive]
+    assert extracted[-1] == "project/debug.log"
+    assert extracted.count("project/src/main.py") == 1
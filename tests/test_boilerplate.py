@@ -0,0 +1,89 @@
+"""Tests for cross-file boilerplate detection."""
+
+import io
+import json
+import xml.etree.ElementTree as ET
+from collections import Counter
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from codebase_prompt_gen.boilerplate import (
+    LEADING,
+    TRAILING,
+    BoilerplateDetector,
+    strip_boilerplate,
+)
+from codebase_prompt_gen.core import generate_prompt
+
+LICENSE = "".join(f"# Licensed under the terms, line {number}\n" for number in range(12))
+FOOTER = "".join(f"// end marker {number}\n" for number in range(5))
+
+
+def test_detector_finds_leading_and_trailing_blocks() -> None:
+    """Test block detection, non-overlapping ends and line-aligned replacement."""
+    detector = BoilerplateDetector()
+    for number in range(4):
+        detector.add(Path(f"lib{number}.js"), f"{LICENSE}code({number});\n{FOOTER}")
+    # Identical short files are one leading block, not also a trailing one
+    for number in range(3):
+        detector.add(Path(f"empty{number}.py"), "pass\n" * 6)
+    detector.add(Path("unique.js"), "alone\n" * 10)
+
+    blocks = detector.blocks()
+    assert [(block.position, block.line_count) for block in blocks] == [
+        (LEADING, 12),
+        (TRAILING, 5),
+        (LEADING, 6),
+    ]
+    license_block, footer_block, _ = blocks
+    assert license_block.text == LICENSE
+    assert footer_block.text == FOOTER
+    assert license_block.paths == {Path(f"lib{number}.js") for number in range(4)}
+
+    stripped = strip_boilerplate(f"{LICENSE}other();\n{FOOTER}", blocks)
+    assert stripped == "[repeated block 1: 12 lines]\nother();\n[repeated block 2: 5 lines]\n"
+    # A copy that does not end on a line boundary is left alone
+    misaligned = f"x{FOOTER}"
+    assert strip_boilerplate(misaligned, blocks) == misaligned
+
+
+@pytest.mark.usefixtures("no_global_gitignore")
+def test_generate_prompt_emits_blocks_once(
+    make_repo: Callable[..., Path], file_reads: Counter[Path]
+) -> None:
+    """Test that blocks are listed once, copies are referenced and files read once."""
+    files = {
+        f"module_{number}.js": f"{LICENSE}export const n = {number};\n" for number in range(10)
+    }
+    root = make_repo({**files, "README.md": "# Readme\n"})
+
+    outputs = {}
+    for output_format in ("jsonl", "xml", "markdown"):
+        buffer = io.StringIO()
+        generate_prompt(
+            root,
+            [],
+            [],
+            output_stream=buffer.write,
+            output_format=output_format,
+            boilerplate=True,
+        )
+        outputs[output_format] = buffer.getvalue()
+
+    assert set(file_reads.values()) == {3}  # Once per format
+
+    records = [json.loads(line) for line in outputs["jsonl"].splitlines()]
+    blocks = [record for record in records if record["type"] == "boilerplate"]
+    assert blocks == [
+        {"type": "boilerplate", "id": 1, "position": "leading", "lines": 12, "content": LICENSE}
+    ]
+    files = {record["path"]: record["content"] for record in records if record["type"] == "file"}
+    assert files["module_3.js"] == "[repeated block 1: 12 lines]\nexport const n = 3;\n"
+    assert files["README.md"] == "# Readme\n"
+
+    repository = ET.fromstring(outputs["xml"])
+    assert repository.find("repeated_blocks/block").get("lines") == "12"
+
+    assert outputs["markdown"].count("Licensed under the terms, line 0") == 1
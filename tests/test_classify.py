@@ -0,0 +1,112 @@
+"""Tests for generated, vendored and lock file classification."""
+
+import io
+from collections import Counter
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from codebase_prompt_gen import classify
+from codebase_prompt_gen.classify import (
+    GENERATED,
+    LOCKFILE,
+    MINIFIED,
+    VENDORED,
+    FileClassifier,
+)
+from codebase_prompt_gen.core import generate_prompt
+from codebase_prompt_gen.tree import TreeStyle
+
+
+def head_of(text: str):
+    """Return a read_head function for the given content."""
+    return lambda size: text.encode()[:size]
+
+
+def test_classifier_signals() -> None:
+    """Test names, .gitattributes, generated-code comments and minified code."""
+    classifier = FileClassifier(
+        "# Generated docs\n"
+        "docs/*.html linguist-generated\n"
+        "api_pb2.py -linguist-generated\n"
+        "/lib/** linguist-vendored=true\n"
+        "third_party/kept/** -linguist-vendored\n"
+        "*.txt text eol=lf\n"
+    )
+
+    assert classifier.classify_file(Path("uv.lock")) == LOCKFILE
+    assert classifier.classify_file(Path("web/package-lock.json")) == LOCKFILE
+    assert classifier.classify_file(Path("proto/user_pb2.py")) == GENERATED
+    assert classifier.classify_file(Path("static/app.min.js")) == MINIFIED
+    assert classifier.classify_file(Path("docs/index.html")) == GENERATED
+    assert classifier.classify_file(Path("lib/deep/dep.js")) == VENDORED
+    # Attributes set to false win over the built-in signals, without reading the file
+    assert classifier.classify_file(Path("api_pb2.py"), head_of("// @generated\n")) is None
+    assert classifier.classify_file(Path("notes.txt")) is None
+
+    assert classifier.classify_dir(Path("vendor")) == VENDORED
+    assert classifier.classify_dir(Path("src/node_modules")) == VENDORED
+    assert classifier.classify_dir(Path("third_party/kept")) is None
+    assert classifier.classify_dir(Path("third_party")) is None
+    assert classifier.classify_dir(Path("src")) is None
+
+    generated = "// Code generated by protoc-gen-go. DO NOT EDIT.\n\npackage api\n"
+    assert classifier.classify_file(Path("api.go"), head_of(generated)) == GENERATED
+    banner = "# Generated by the protocol buffer compiler.  DO NOT EDIT!\nimport sys\n"
+    assert classifier.classify_file(Path("stub.py"), head_of(banner)) == GENERATED
+    block = "/*\n * Copyright\n *\n * @generated by the schema compiler\n */\nint x;\n"
+    assert classifier.classify_file(Path("schema.c"), head_of(block)) == GENERATED
+    # Only comments opening the file count, not strings or later comments quoting the marker
+    mention = 'MARKER = "// Code generated by x. DO NOT EDIT."\n'
+    assert classifier.classify_file(Path("marker.py"), head_of(mention)) is None
+    quote = 'import re\n\n# Matches "# Generated by protoc.  DO NOT EDIT!" and @generated\n'
+    assert classifier.classify_file(Path("marker.py"), head_of(quote)) is None
+    source = Path(classify.__file__).read_bytes()
+    assert classifier.classify_file(Path("classify.py"), lambda size: source[:size]) is None
+    assert classifier.classify_file(Path("api.go")) is None  # No content available
+
+    assert classifier.classify_file(Path("bundle.js"), head_of("var a=1;" * 600)) == MINIFIED
+    readable = "function f() {\n  return 1;\n}\n" * 100
+    assert classifier.classify_file(Path("app.js"), head_of(readable)) is None
+    # Long lines outside JavaScript and CSS are left alone
+    assert classifier.classify_file(Path("data.csv"), head_of("1," * 3000)) is None
+
+
+@pytest.mark.usefixtures("no_global_gitignore")
+def test_skipped_files_are_listed_but_not_read(
+    make_repo: Callable[..., Path], file_reads: Counter[Path]
+) -> None:
+    """Test the tree markers, that skipped files are never read, and the override."""
+    root = make_repo(
+        {
+            "src/main.py": "print('hello')\n",
+            "src/models.py": "# @generated by the model compiler\nA = 1\n",
+            "uv.lock": "version = 1\n",
+            "vendor/pkg/pkg.go": "package pkg\n",
+        }
+    )
+
+    def run(**kwargs) -> str:
+        buffer = io.StringIO()
+        generate_prompt(root, [], [], output_stream=buffer.write, **kwargs)
+        return buffer.getvalue()
+
+    output = run()
+    assert {path.name for path in file_reads} == {"main.py"}
+    indented = run(tree_style=TreeStyle("indented"))
+    everything = run(skip_generated=False)
+
+    assert "📄 src/models.py (skipped: generated)" in output
+    assert "📄 uv.lock (skipped: lockfile)" in output
+    assert "📁 vendor/ (skipped: vendored)" in output
+    assert "vendor/pkg" not in output
+    assert "A = 1" not in output
+    assert "### `src/main.py`" in output
+
+    assert "  models.py (skipped: generated)\n" in indented
+    assert "vendor/ (skipped: vendored)\n" in indented
+
+    assert "skipped" not in everything
+    assert "### `uv.lock`" in everything
+    assert "### `vendor/pkg/pkg.go`" in everything
@@ -2,11 +2,14 @@
 
 import os
 import sys
-import tempfile
+from collections.abc import Callable
 from pathlib import Path
 from unittest import mock
 
+import pytest
+
 from codebase_prompt_gen.cli.main import main
+from codebase_prompt_gen.core import scan_source
 
 
 def test_main_version(capsys) -> None:
@@ -17,136 +20,134 @@ def test_main_version(capsys) -> None:
         assert "Codebase AI Prompt Generator v" in captured.out
 
 
-def test_main_default(capsys) -> None:
+@pytest.mark.usefixtures("ignore_nothing")
+def test_main_default(capsys, make_repo: Callable[..., Path]) -> None:
     """Test the default behavior with no arguments."""
-    with tempfile.TemporaryDirectory() as tempdir:
-        temp_path = Path(tempdir)
-        # Create a test file
-        (temp_path / "test.py").write_text('print("Hello")\n')
+    repo = make_repo({"test.py": 'print("Hello")\n'})
+
+    # Change to the repository and run the main function
+    with mock.patch.object(sys, "argv", ["codebase-prompt"]):
+        old_cwd = Path.cwd()
+        try:
+            os.chdir(repo)
+            assert main() == 0
+            captured = capsys.readouterr()
+            assert "# Repository:" in captured.out
+            assert "test.py" in captured.out
+        finally:
+            os.chdir(old_cwd)
 
-        # Mock the gitignore parser
-        def mock_parse_gitignore(_gitignore_file):
-            return lambda _: False  # No ignores from gitignore
 
-        # Change to the temp directory and run the main function
-        with mock.patch.object(sys, "argv", ["codebase-prompt"]):
-            with mock.patch("codebase_prompt_gen.core.parse_gitignore", mock_parse_gitignore):
-                old_cwd = Path.cwd()
-                try:
-                    os.chdir(tempdir)
-                    assert main() == 0
-                    captured = capsys.readouterr()
-                    assert "# Repository:" in captured.out
-                    assert "test.py" in captured.out
-                finally:
-                    os.chdir(old_cwd)
-
-
-def test_main_with_output_file() -> None:
+@pytest.mark.usefixtures("ignore_nothing")
+def test_main_with_output_file(make_repo: Callable[..., Path], tmp_path: Path) -> None:
     """Test main function with output to a file."""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        test_file = Path(temp_dir) / "test.py"
-        test_file.write_text("print('test')")
-
-        output_file = Path(temp_dir) / "output.md"
-
-        # Mock gitignore parser to avoid actual parsing
-        def mock_parse_gitignore(_gitignore_file):
-            return lambda _: False
-
-        # Test with specified output file
-        with mock.patch("codebase_prompt_gen.core.parse_gitignore", mock_parse_gitignore):
-            with mock.patch.object(
-                sys, "argv", ["codebase-prompt", str(temp_dir), "--output", str(output_file)]
-            ):
-                with mock.patch("codebase_prompt_gen.cli.main.generate_prompt") as mock_generate:
-                    assert main() == 0
-                    # Check that generate_prompt was called with correct args
-                    mock_generate.assert_called_once()
-                    args, kwargs = mock_generate.call_args
-                    assert str(args[0]) == str(temp_dir)
-                    assert args[1] == []  # exclude_patterns
-                    assert args[2] == []  # include_patterns
-                    assert kwargs["respect_gitignore"] is True
-                    assert callable(kwargs["output_stream"])  # Check that output_stream is callable
-
-
-def test_main_with_cursor() -> None:
+    repo = make_repo({"test.py": "print('test')"})
+    output_file = tmp_path / "output.md"
+
+    # Test with specified output file
+    with mock.patch.object(
+        sys, "argv", ["codebase-prompt", str(repo), "--output", str(output_file)]
+    ):
+        with mock.patch("codebase_prompt_gen.cli.main.generate_prompt") as mock_generate:
+            assert main() == 0
+            # Check that generate_prompt was called with correct args
+            mock_generate.assert_called_once()
+            args, kwargs = mock_generate.call_args
+            assert str(args[0]) == str(repo)
+            assert args[1] == []  # exclude_patterns
+            assert args[2] == []  # include_patterns
+            assert kwargs["respect_gitignore"] is True
+            assert callable(kwargs["output_stream"])  # Check that output_stream is callable
+
+
+@pytest.mark.usefixtures("ignore_nothing")
+def test_main_with_cursor(make_repo: Callable[..., Path]) -> None:
     """Test the --cursor flag."""
-    with tempfile.TemporaryDirectory() as tempdir:
-        temp_path = Path(tempdir)
-        # Create a test file
-        (temp_path / "test.py").write_text('print("Hello")\n')
-
-        # Create .cursor directory to ensure it works with existing directories
-        cursor_dir = temp_path / ".cursor" / "rules"
-        cursor_dir.mkdir(parents=True, exist_ok=True)
-
-        # Mock the gitignore parser
-        def mock_parse_gitignore(_gitignore_file):
-            return lambda _: False  # No ignores from gitignore
-
-        # Run with cursor flag
-        with mock.patch.object(sys, "argv", ["codebase-prompt", tempdir, "--cursor"]):
-            with mock.patch("codebase_prompt_gen.core.parse_gitignore", mock_parse_gitignore):
-                with mock.patch("codebase_prompt_gen.cli.main.generate_prompt") as mock_generate:
-                    assert main() == 0
-
-                    # Check that generate_prompt was called with correct args
-                    mock_generate.assert_called_once()
-                    args, kwargs = mock_generate.call_args
-                    assert str(args[0]) == str(tempdir)
-                    assert args[1] == []  # exclude_patterns
-                    assert args[2] == []  # include_patterns
-                    assert kwargs["respect_gitignore"] is True
-                    assert callable(kwargs["output_stream"])  # Check that output_stream is callable
-
-
-def test_main_with_cursor_override_output() -> None:
-    """Test that --cursor overrides --output."""
-    with tempfile.TemporaryDirectory() as tempdir:
-        temp_path = Path(tempdir)
-        # Create a test file
-        (temp_path / "test.py").write_text('print("Hello")\n')
-
-        output_file = temp_path / "output.md"
-
-        # Mock the gitignore parser
-        def mock_parse_gitignore(_gitignore_file):
-            return lambda _: False  # No ignores from gitignore
-
-        # Mock logging.warning to check for the warning message
-        with mock.patch("logging.warning") as mock_warning:
-            # Run with both cursor and output flags
-            with mock.patch.object(
-                sys,
-                "argv",
-                ["codebase-prompt", tempdir, "--cursor", "--output", str(output_file)],
-            ):
-                with mock.patch("codebase_prompt_gen.core.parse_gitignore", mock_parse_gitignore):
-                    with mock.patch(
-                        "codebase_prompt_gen.cli.main.generate_prompt"
-                    ) as mock_generate:
-                        assert main() == 0
-
-                        # Check that generate_prompt was called with correct args
-                        mock_generate.assert_called_once()
-                        args, kwargs = mock_generate.call_args
-                        assert str(args[0]) == str(tempdir)
-                        assert args[1] == []  # exclude_patterns
-                        assert args[2] == []  # include_patterns
-                        assert kwargs["respect_gitignore"] is True
-                        assert callable(
-                            kwargs["output_stream"]
-                        )  # Check that output_stream is callable
-
-                        # Verify that the warning was logged
-                        mock_warning.assert_called_once()
-                        warning_message = mock_warning.call_args[0][0]
-                        assert (
-                            "cursor flag overrides" in warning_message.lower()
-                            or "overrides" in warning_message.lower()
-                        )
+    repo = make_repo({"test.py": 'print("Hello")\n'})
+    # Create .cursor directory to ensure it works with existing directories
+    (repo / ".cursor" / "rules").mkdir(parents=True)
+
+    # Run with cursor flag
+    with mock.patch.object(sys, "argv", ["codebase-prompt", str(repo), "--cursor"]):
+        with mock.patch("codebase_prompt_gen.cli.main.generate_prompt") as mock_generate:
+            assert main() == 0
+
+            # Check that generate_prompt was called with correct args
+            mock_generate.assert_called_once()
+            args, kwargs = mock_generate.call_args
+            assert str(args[0]) == str(repo)
+            assert args[1] == []  # exclude_patterns
+            assert args[2] == []  # include_patterns
+            assert kwargs["respect_gitignore"] is True
+            assert callable(kwargs["output_stream"])  # Check that output_stream is callable
+
+
+@pytest.mark.usefixtures("ignore_nothing")
+def test_main_with_cursor_and_output(make_repo: Callable[..., Path], tmp_path: Path) -> None:
+    """Test that --cursor and --output are both written from one scan."""
+    repo = make_repo({"test.py": 'print("Hello")\n'})
+    output_file = tmp_path / "output.md"
+
+    # Run with both cursor and output flags
+    argv = ["codebase-prompt", str(repo), "--cursor", "--output", str(output_file)]
+    with mock.patch.object(sys, "argv", argv):
+        with mock.patch("codebase_prompt_gen.core.scan_source", wraps=scan_source) as mock_scan:
+            assert main() == 0
+            # The repository is walked once for both outputs
+            mock_scan.assert_called_once()
+
+    cursor_file = repo / ".cursor" / "rules" / "entire-codebase.mdc"
+    assert cursor_file.read_text() == output_file.read_text()
+    assert 'print("Hello")' in output_file.read_text()
+
+
+@pytest.mark.usefixtures("no_global_gitignore")
+def test_main_with_targets(make_repo: Callable[..., Path], tmp_path: Path) -> None:
+    """Test --target outputs with their own include patterns and formats."""
+    repo = make_repo({"app.py": "APP = 1\n", "tests/test_app.py": "def test_app(): pass\n"})
+    full_file = tmp_path / "full.md"
+    tests_file = tmp_path / "tests.xml"
+
+    argv = [
+        "codebase-prompt",
+        str(repo),
+        "--output",
+        str(full_file),
+        "--target",
+        str(tests_file),
+        "include=tests/*",
+        "format=xml",
+    ]
+    with mock.patch.object(sys, "argv", argv):
+        assert main() == 0
+
+    full = full_file.read_text()
+    assert "APP = 1" in full
+    assert "def test_app" in full
+    tests = tests_file.read_text()
+    assert "APP = 1" not in tests
+    assert "def test_app" in tests
+    assert tests.lstrip().startswith("<")
+
+    with mock.patch.object(sys, "argv", [*argv, "colour=blue"]):
+        with pytest.raises(SystemExit):
+            main()
+
+
+def test_main_cursor_split_rejects_other_outputs(capsys, tmp_path: Path) -> None:
+    """Test that --cursor-split fails instead of ignoring options for other outputs."""
+    for options in (
+        ["--output", str(tmp_path / "x.md")],
+        ["--target", str(tmp_path / "y.md")],
+        ["--format", "xml"],
+        ["--compress-level", "9"],
+    ):
+        argv = ["codebase-prompt", str(tmp_path), "--cursor-split", *options]
+        with mock.patch.object(sys, "argv", argv):
+            with pytest.raises(SystemExit):
+                main()
+        assert "--cursor-split" in capsys.readouterr().err
+    assert not list(tmp_path.iterdir())
 
 
 def test_main_error(capsys) -> None:
@@ -158,3 +159,10 @@ def test_main_error(capsys) -> None:
             assert main() == 1
             captured = capsys.readouterr()
             assert "Error: Test error" in captured.err
+
+
+def test_main_update_requires_output_file() -> None:
+    """Test that --update is rejected when writing to stdout."""
+    with mock.patch.object(sys, "argv", ["codebase-prompt", "--update"]):
+        with pytest.raises(SystemExit):
+            main()
@@ -0,0 +1,110 @@
+"""Tests for compressed output."""
+
+import gzip
+import importlib
+import lzma
+import sys
+import tempfile
+from collections.abc import Callable
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from codebase_prompt_gen.cli.main import main
+from codebase_prompt_gen.compress import CompressedWriter, compression_for, zstd_available
+from codebase_prompt_gen.core import generate_prompt
+
+
+def zstd_decompress(data: bytes) -> bytes:
+    """Decompress zstd data; compression.zstd only exists on Python 3.14 and later."""
+    return importlib.import_module("compression.zstd").decompress(data)
+
+
+# A small repository with non-ASCII content
+REPO_FILES = {
+    "src/main.py": "def main():\n    return 'ünïcode'\n" * 100,
+    "README.md": "# Project\n",
+}
+
+
+def test_compression_for_suffix_and_override() -> None:
+    """Test choosing a compression method by suffix or explicitly."""
+    assert compression_for(Path("prompt.md.gz")) == "gzip"
+    assert compression_for(Path("prompt.md.XZ")) == "xz"
+    assert compression_for(Path("prompt.md.zst")) == "zstd"
+    assert compression_for(Path("prompt.md")) is None
+    assert compression_for(Path("prompt.md"), "xz") == "xz"
+
+
+@pytest.mark.parametrize(
+    ("method", "decompress"),
+    [
+        ("gzip", gzip.decompress),
+        ("xz", lzma.decompress),
+        pytest.param(
+            "zstd",
+            zstd_decompress,
+            marks=pytest.mark.skipif(not zstd_available(), reason="needs compression.zstd"),
+        ),
+    ],
+)
+@pytest.mark.usefixtures("ignore_nothing")
+def test_compressed_writer_round_trip(
+    method, decompress, make_repo: Callable[..., Path], render: Callable[..., str], tmp_path: Path
+) -> None:
+    """Test that compressed output decompresses to the uncompressed prompt."""
+    repo = make_repo(REPO_FILES)
+    output_file = tmp_path / f"prompt.{method}"
+
+    expected = render(repo)
+    with CompressedWriter(output_file, method, level=3) as writer:
+        generate_prompt(repo, [], [], output_stream=writer.write)
+
+    assert decompress(output_file.read_bytes()).decode("utf-8") == expected
+
+
+def test_compressed_writer_rejects_unsupported_options() -> None:
+    """Test that unsupported options fail before the output file is created."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output_file = Path(temp_dir) / "prompt.md.gz"
+        with pytest.raises(ValueError, match="threads"):
+            CompressedWriter(output_file, "gzip", threads=4)
+        with pytest.raises(ValueError, match="Unknown"):
+            CompressedWriter(output_file, "brotli")
+        assert not output_file.exists()
+
+
+@pytest.mark.usefixtures("ignore_nothing")
+def test_main_compresses_by_extension(
+    make_repo: Callable[..., Path], render: Callable[..., str], tmp_path: Path
+) -> None:
+    """Test that the CLI compresses an --output file ending in .gz."""
+    repo = make_repo(REPO_FILES)
+    output_file = tmp_path / "prompt.md.gz"
+
+    argv = ["codebase-prompt", str(repo), "--output", str(output_file)]
+    expected = render(repo)
+    with mock.patch.object(sys, "argv", argv):
+        assert main() == 0
+
+    assert gzip.decompress(output_file.read_bytes()).decode("utf-8") == expected
+
+
+def test_main_rejects_compression_options_it_cannot_use(
+    capsys, make_repo: Callable[..., Path], tmp_path: Path
+) -> None:
+    """Test that unusable compression options are usage errors, before any output."""
+    repo = make_repo(REPO_FILES)
+    cases = [
+        (["--output", str(tmp_path / "prompt.md.gz"), "--compress-threads", "2"], "gzip"),
+        (["--output", str(tmp_path / "prompt.md"), "--compress-level", "9"], "require"),
+    ]
+    for options, message in cases:
+        with mock.patch.object(sys, "argv", ["codebase-prompt", str(repo), *options]):
+            with pytest.raises(SystemExit):
+                main()
+        error = capsys.readouterr().err
+        assert error.startswith("usage:")
+        assert message in error
+    assert not list(tmp_path.glob("prompt.*"))
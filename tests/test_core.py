@@ -3,9 +3,12 @@
 import fnmatch
 import io
 import tempfile
+from collections.abc import Callable
 from pathlib import Path
 from unittest import mock
 
+import pytest
+
 from codebase_prompt_gen.core import generate_file_tree, generate_prompt, get_gitignore_matcher
 
 
@@ -108,27 +111,20 @@ def test_generate_file_tree_original() -> None:
             assert any("test.log" in item for item in file_tree)
 
 
-def test_always_exclude_git() -> None:
+@pytest.mark.usefixtures("ignore_nothing")
+def test_always_exclude_git(make_repo: Callable[..., Path]) -> None:
     """Test that .git is always excluded regardless of settings."""
-    with tempfile.TemporaryDirectory() as tempdir:
-        temp_path = Path(tempdir)
-        (temp_path / ".git").mkdir(parents=True)
-        (temp_path / ".git" / "config").write_text("# Git config\n")
+    repo = make_repo({".git/config": "# Git config\n"})
 
-        # Mock the gitignore parser
-        def mock_parse_gitignore(_gitignore_file):
-            return lambda _: False  # No ignores from gitignore
+    # Try to include .git explicitly
+    file_tree, _ = generate_file_tree(
+        repo, exclude_patterns=[], include_patterns=[".git", ".git/**"]
+    )
 
-        with mock.patch("codebase_prompt_gen.core.parse_gitignore", mock_parse_gitignore):
-            # Try to include .git explicitly
-            file_tree, _ = generate_file_tree(
-                Path(tempdir), exclude_patterns=[], include_patterns=[".git", ".git/**"]
-            )
-
-            # Verify .git is still excluded
-            for item in file_tree:
-                assert ".git/" not in item
-                assert ".git\\" not in item
+    # Verify .git is still excluded
+    for item in file_tree:
+        assert ".git/" not in item
+        assert ".git\\" not in item
 
 
 def test_generate_prompt_original() -> None:
@@ -362,3 +358,36 @@ def test_generate_prompt() -> None:
                 # Get captured output
                 prompt = mock_stdout.getvalue()
                 assert "# Repository:" in prompt
+
+
+def test_generate_file_tree_follow_symlinks() -> None:
+    """Test that symlinked directories are walked once and cycles terminate."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        (temp_path / "shared").mkdir()
+        (temp_path / "shared" / "util.py").write_text("def util(): pass\n")
+        (temp_path / "app").mkdir()
+        (temp_path / "app" / "lib").symlink_to(temp_path / "shared", target_is_directory=True)
+        # A link back to the root creates a cycle
+        (temp_path / "shared" / "loop").symlink_to(temp_path, target_is_directory=True)
+        (temp_path / "shared" / "hardlink.py").hardlink_to(temp_path / "shared" / "util.py")
+
+        with mock.patch("codebase_prompt_gen.core.parse_gitignore", mock_parse_gitignore):
+            # Without following, the linked directory is listed but not walked
+            file_tree, _ = generate_file_tree(temp_path, exclude_patterns=[], include_patterns=[])
+            assert "📁 app/lib/" in file_tree
+            assert not any(item.startswith("📄 app/lib/") for item in file_tree)
+
+            file_tree, files_content = generate_file_tree(
+                temp_path, exclude_patterns=[], include_patterns=[], follow_symlinks=True
+            )
+
+        assert file_tree == [
+            "📁 app/",
+            "📁 app/lib/",
+            "📄 app/lib/hardlink.py",
+            "📁 app/lib/loop/ (same as ./)",
+            "📄 app/lib/util.py (same as app/lib/hardlink.py)",
+            "📁 shared/ (same as app/lib/)",
+        ]
+        assert [str(path) for path, _ in files_content] == ["app/lib/hardlink.py"]
@@ -0,0 +1,54 @@
+"""Tests for per-directory Cursor rule files."""
+
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from codebase_prompt_gen.cursor import write_cursor_rules
+
+
+@pytest.mark.usefixtures("ignore_nothing")
+def test_write_cursor_rules(make_repo: Callable[..., Path]) -> None:
+    """Test that rules are split per directory and only rewritten when changed."""
+    repo = make_repo(
+        {
+            "src/main.py": "print('main')\n",
+            "docs/guide.md": "# Guide\n",
+            "setup.py": "setup()\n",
+            ".cursor/rules/entire-codebase.mdc": "old single rule\n",
+            ".cursor/rules/handwritten.mdc": "keep me\n",
+        }
+    )
+    rules_dir = repo / ".cursor" / "rules"
+
+    statuses = write_cursor_rules(repo, [], [], max_workers=2)
+
+    assert statuses == {
+        "codebase-dir-docs.mdc": "written",
+        "codebase-dir-src.mdc": "written",
+        "codebase-root.mdc": "written",
+    }
+    src_rule = (rules_dir / "codebase-dir-src.mdc").read_text()
+    assert "globs: src/**\n" in src_rule
+    assert "print('main')" in src_rule
+    assert "# Guide" not in src_rule
+    assert "📁 src/\n📄 src/main.py\n" in src_rule
+    assert "globs: setup.py\n" in (rules_dir / "codebase-root.mdc").read_text()
+    assert (rules_dir / "handwritten.mdc").exists()
+    # The single rule written by --cursor is left alone
+    assert (rules_dir / "entire-codebase.mdc").read_text() == "old single rule\n"
+
+    # Only the changed directory's rule is replaced; removed directories lose theirs
+    src_mtime = (rules_dir / "codebase-dir-src.mdc").stat().st_mtime_ns
+    (repo / "docs" / "guide.md").unlink()
+    (repo / "docs").rmdir()
+    (repo / "setup.py").write_text("setup(name='x')\n")
+    statuses = write_cursor_rules(repo, [], [])
+
+    assert statuses == {
+        "codebase-dir-src.mdc": "unchanged",
+        "codebase-root.mdc": "written",
+        "codebase-dir-docs.mdc": "removed",
+    }
+    assert (rules_dir / "codebase-dir-src.mdc").stat().st_mtime_ns == src_mtime
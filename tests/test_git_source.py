@@ -0,0 +1,94 @@
+"""Tests for reading prompts from a git revision."""
+
+import subprocess
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from codebase_prompt_gen.core import generate_file_tree_from_source
+from codebase_prompt_gen.git_source import GitCatFileBatch, GitRevSource
+
+
+def git(repo: Path, *args: str) -> None:
+    """Run a git command in repo with a fixed identity."""
+    subprocess.run(
+        ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com", *args],
+        cwd=repo,
+        check=True,
+        capture_output=True,
+    )
+
+
+def make_git_repo(repo: Path) -> None:
+    """Create a repository with a tagged first commit and a changed worktree."""
+    git(repo, "init", "-q")
+    (repo / "src").mkdir()
+    (repo / "src" / "main.py").write_text("print('v1')\n")
+    (repo / "notes.log").write_text("ignored\n")
+    (repo / ".gitignore").write_text("*.log\n")
+    git(repo, "add", "-f", ".")
+    git(repo, "commit", "-q", "-m", "v1")
+    git(repo, "tag", "v1")
+    (repo / "src" / "main.py").write_text("print('v2')\n")
+    (repo / "src" / "extra.py").write_text("pass\n")
+
+
+@pytest.mark.usefixtures("no_global_gitignore")
+def test_generate_prompt_from_rev(tmp_path: Path, render: Callable[..., str]) -> None:
+    """Test that a tagged revision is read without touching the worktree."""
+    repo = tmp_path
+    make_git_repo(repo)
+    prompt = render(repo, rev="v1")
+
+    assert f"# Repository: {repo.name}@v1" in prompt
+    assert "print('v1')" in prompt
+    assert "print('v2')" not in prompt
+    assert "extra.py" not in prompt
+    # The revision's own .gitignore is respected
+    assert "notes.log" not in prompt
+    assert (repo / "src" / "main.py").read_text() == "print('v2')\n"
+
+
+def test_git_rev_source_tree_order(tmp_path: Path) -> None:
+    """Test that directories are derived from blob paths in walk order."""
+    repo = tmp_path
+    make_git_repo(repo)
+
+    with GitRevSource(repo, "v1") as source:
+        entries = [(str(entry.path), entry.is_dir, entry.size) for entry in source.entries()]
+        file_tree, _ = generate_file_tree_from_source(
+            source, exclude_patterns=[], include_patterns=[], respect_gitignore=False
+        )
+
+    assert entries == [
+        (".gitignore", False, 6),
+        ("notes.log", False, 8),
+        ("src", True, None),
+        ("src/main.py", False, 12),
+    ]
+    assert file_tree == ["📄 .gitignore", "📄 notes.log", "📁 src/", "📄 src/main.py"]
+
+
+def test_cat_file_batch_reuses_process(tmp_path: Path) -> None:
+    """Test that one cat-file process serves several reads and reports missing objects."""
+    repo = tmp_path
+    make_git_repo(repo)
+    batch = GitCatFileBatch(repo)
+    try:
+        assert batch.read("v1:src/main.py") == b"print('v1')\n"
+        process = batch._process
+        assert batch.read("v1:.gitignore") == b"*.log\n"
+        assert batch._process is process
+        with pytest.raises(KeyError):
+            batch.read("v1:missing.py")
+    finally:
+        batch.close()
+
+
+def test_invalid_rev(tmp_path: Path) -> None:
+    """Test that an unknown revision is reported as a ValueError."""
+    repo = tmp_path
+    make_git_repo(repo)
+    with pytest.raises(ValueError, match="Could not list revision"):
+        GitRevSource(repo, "no-such-rev")
@@ -0,0 +1,68 @@
+"""Tests for reading the global git configuration without git."""
+
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from codebase_prompt_gen.gitconfig import global_excludes_file, read_config_file
+
+
+def test_read_config_file_values_and_includes() -> None:
+    """Test quoting, comments, sections on the same line and [include]."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        (root / "extra.inc").write_text("[user]\n\tname = Included\n")
+        (root / "config").write_text(
+            "# comment\n"
+            "[core]\n"
+            '\texcludesFile = "~/my ignore" ; trailing comment\n'
+            "\tbare\n"
+            '[remote "origin"] url = a\\tb\n'
+            "[include]\n"
+            "\tpath = extra.inc\n"
+        )
+        values: dict[str, str] = {}
+        read_config_file(root / "config", values)
+
+    assert values == {
+        "core.excludesfile": "~/my ignore",
+        "core.bare": "true",
+        "remote.url": "a\tb",
+        "user.name": "Included",
+    }
+
+
+def test_global_excludes_file_precedence_and_default() -> None:
+    """Test that ~/.gitconfig wins over the XDG config, and git's default file."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        home = Path(temp_dir)
+        xdg = home / ".config"
+        (xdg / "git").mkdir(parents=True)
+        (home / "global-ignore").write_text("*.log\n")
+        environ = {"HOME": str(home), "XDG_CONFIG_HOME": str(xdg)}
+
+        with mock.patch.dict("os.environ", environ, clear=True):
+            # Neither configured nor the default file present
+            assert global_excludes_file() is None
+
+            (xdg / "git" / "ignore").write_text("*.tmp\n")
+            assert global_excludes_file() == xdg / "git" / "ignore"
+
+            (xdg / "git" / "config").write_text("[core]\nexcludesfile = /nonexistent\n")
+            (home / ".gitconfig").write_text("[core]\n  excludesfile = ~/global-ignore\n")
+            assert global_excludes_file() == home / "global-ignore"
+
+
+def test_cli_import_skips_optional_modules() -> None:
+    """Test that starting the CLI imports no module a plain run does not need."""
+    lazy = ["gitignore_parser", "subprocess", "tarfile", "zipfile", "multiprocessing", "mmap"]
+    code = (
+        "import sys, codebase_prompt_gen.cli.main; "
+        f"print(sorted(m for m in {lazy!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "[]"
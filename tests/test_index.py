@@ -0,0 +1,125 @@
+"""Tests for the prompt file sidecar index."""
+
+import os
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from codebase_prompt_gen.core import generate_prompt
+from codebase_prompt_gen.index import PromptIndex, index_path_for, read_section, update_prompt_file
+from codebase_prompt_gen.outline import OutlinePolicy
+
+
+def write_indexed(repo: Path, output_file: Path, **kwargs) -> PromptIndex:
+    """Write an indexed prompt for repo and return the loaded index."""
+    with output_file.open("w", encoding="utf-8", newline="") as f:
+        generate_prompt(
+            repo,
+            exclude_patterns=[],
+            include_patterns=[],
+            output_stream=f.write,
+            index_file=index_path_for(output_file),
+            **kwargs,
+        )
+    index = PromptIndex.load(index_path_for(output_file))
+    assert index is not None
+    return index
+
+
+def bump_mtime(path: Path) -> None:
+    """Move a file's mtime into the future so the index cannot trust it."""
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**10))
+
+
+@pytest.mark.usefixtures("ignore_nothing")
+def test_index_records_section_offsets(make_repo: Callable[..., Path], tmp_path: Path) -> None:
+    """Test that indexed offsets point at each file's content."""
+    repo = make_repo({"a.py": "print('ä')\n", "b.txt": "```\nfenced\n```\n"})
+    output_file = tmp_path / "prompt.md"
+
+    index = write_indexed(repo, output_file)
+
+    assert output_file.stat().st_size == index.total_length
+    for name in ("a.py", "b.txt"):
+        section = index.find(name)
+        assert section is not None
+        assert read_section(output_file, section) == (repo / name).read_bytes()
+
+
+@pytest.mark.usefixtures("ignore_nothing")
+def test_update_in_place_and_compacted(
+    make_repo: Callable[..., Path], render: Callable[..., str], tmp_path: Path
+) -> None:
+    """Test that updates match a full regeneration in both update modes."""
+    repo = make_repo({"a.py": "x = 1\n", "b.py": "y = 2\n"})
+    output_file = tmp_path / "prompt.md"
+
+    write_indexed(repo, output_file)
+
+    assert update_prompt_file(repo, output_file, [], []) == "unchanged"
+
+    # Same length: the section is overwritten in place
+    (repo / "a.py").write_text("x = 3\n")
+    bump_mtime(repo / "a.py")
+    assert update_prompt_file(repo, output_file, [], []) == "in-place"
+    assert output_file.read_text() == render(repo)
+
+    # Different length and a new file: the prompt is compacted
+    (repo / "b.py").write_text("y = 'longer value'\n")
+    bump_mtime(repo / "b.py")
+    (repo / "c.py").write_text("z = 4\n")
+    assert update_prompt_file(repo, output_file, [], []) == "compacted"
+    assert output_file.read_text() == render(repo)
+
+    index = PromptIndex.load(index_path_for(output_file))
+    assert index is not None
+    section = index.find("b.py")
+    assert section is not None
+    assert read_section(output_file, section) == b"y = 'longer value'\n"
+
+
+@pytest.mark.usefixtures("ignore_nothing")
+def test_update_without_index_writes_full_prompt(
+    make_repo: Callable[..., Path], render: Callable[..., str], tmp_path: Path
+) -> None:
+    """Test that a missing index falls back to a full write."""
+    repo = make_repo({"a.py": "x = 1\n"})
+    output_file = tmp_path / "prompt.md"
+
+    assert update_prompt_file(repo, output_file, [], []) == "full"
+    assert output_file.read_text() == render(repo)
+    assert index_path_for(output_file).exists()
+
+
+@pytest.mark.usefixtures("ignore_nothing")
+def test_update_with_other_rendering_options_writes_full_prompt(
+    make_repo: Callable[..., Path], render: Callable[..., str], tmp_path: Path
+) -> None:
+    """Test that sections rendered with other options are not reused."""
+    repo = make_repo({"a.py": "x = 1\n"})
+    output_file = tmp_path / "prompt.md"
+
+    assert write_indexed(repo, output_file).rendering["format"] == "markdown"
+    assert update_prompt_file(repo, output_file, [], [], output_format="xml") == "full"
+    assert output_file.read_text().lstrip().startswith("<")
+    index = PromptIndex.load(index_path_for(output_file))
+    assert index is not None
+    assert index.rendering["format"] == "xml"
+
+    # Outlined sections are not taken for full text, even with unchanged sources
+    (repo / "b.py").write_text("def f():\n    return 1\n")
+    write_indexed(repo, output_file, outline_policy=OutlinePolicy(patterns=["*.py"]))
+    assert "return 1" not in output_file.read_text()
+    assert update_prompt_file(repo, output_file, [], []) == "full"
+    assert output_file.read_text() == render(repo)
+
+    # Nor are sections referring to repeated blocks the new header lacks
+    license_text = "".join(f"# License line {number}\n" for number in range(12))
+    for number in range(4):
+        (repo / f"m{number}.py").write_text(f"{license_text}N = {number}\n")
+    write_indexed(repo, output_file, boilerplate=True)
+    assert "[repeated block 1: 12 lines]" in output_file.read_text()
+    assert update_prompt_file(repo, output_file, [], []) == "full"
+    assert output_file.read_text() == render(repo)
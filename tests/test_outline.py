@@ -0,0 +1,90 @@
+"""Tests for outline mode."""
+
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from codebase_prompt_gen.outline import OutlinePolicy, outline
+
+PYTHON_SOURCE = '''"""Module docstring."""
+
+import os
+
+if os.name == "nt":
+    SEP = "\\\\"
+
+LIMIT = 10
+
+
+class Greeter:
+    """Says hello."""
+
+    greeting = "hello"
+
+    def greet(self, name: str) -> str:
+        """Return a greeting."""
+        message = f"{self.greeting}, {name}"
+        return message
+
+
+async def fetch(url):
+    response = await get(url)
+    return response
+'''
+
+
+def test_outline_python_keeps_signatures() -> None:
+    """Test that Python outlines keep structure and drop function bodies."""
+    result = outline(Path("greeter.py"), PYTHON_SOURCE)
+
+    assert result is not None
+    assert '"""Module docstring."""' in result
+    assert "import os" in result
+    assert "if os.name == 'nt':" in result
+    assert "class Greeter:" in result
+    assert "def greet(self, name: str) -> str:" in result
+    assert '"""Return a greeting."""' in result
+    assert "async def fetch(url):" in result
+    assert "message =" not in result
+    assert "await get" not in result
+    # The outline is itself valid Python
+    compile(result, "greeter.py", "exec")
+
+
+def test_outline_regex_and_unsupported() -> None:
+    """Test the regex outliners and files that cannot be outlined."""
+    go_source = 'package main\n\nimport "fmt"\n\nfunc main() {\n\tfmt.Println("hi")\n}\n'
+
+    assert outline(Path("main.go"), go_source) == 'package main\nimport "fmt"\nfunc main() {\n'
+    assert outline(Path("notes.txt"), "just text") is None
+    assert outline(Path("broken.py"), "def (:") is None
+
+
+def test_outline_long_line_is_linear() -> None:
+    """Test that a long single-line script does not make the method pattern backtrack."""
+    line = "  r(" + "f(a,b)?g(c):h(d)," * 8000
+    started = time.perf_counter()
+    assert outline(Path("bundle.ts"), line) is None
+    assert time.perf_counter() - started < 1
+
+
+@pytest.mark.usefixtures("ignore_nothing")
+def test_generate_prompt_with_outline_policy(
+    make_repo: Callable[..., Path], render: Callable[..., str]
+) -> None:
+    """Test that only files selected by the policy are outlined."""
+    repo = make_repo(
+        {"big.py": PYTHON_SOURCE, "small.py": "def f():\n    return 1\n", "data.txt": "x" * 1000}
+    )
+
+    output = render(repo, outline_policy=OutlinePolicy(min_size=200))
+
+    assert "### `big.py` (outline)" in output
+    assert "message =" not in output
+    # Small files and files without an outliner are emitted in full
+    assert "### `small.py`\n" in output
+    assert "return 1" in output
+    assert "### `data.txt`\n" in output
+    assert "x" * 1000 in output
@@ -0,0 +1,77 @@
+"""Tests for multi-process rendering."""
+
+import io
+import tempfile
+from collections.abc import Callable
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from codebase_prompt_gen.core import generate_prompt
+from codebase_prompt_gen.outline import OutlinePolicy
+from codebase_prompt_gen.parallel import copy_file_contents, write_prompt_file_parallel
+
+
+def serial_prompt(repo: Path, output_format: str, outline_policy=None) -> bytes:
+    """Render a prompt with generate_prompt, as the CLI writes it to a file."""
+    buffer = io.StringIO()
+    generate_prompt(
+        repo,
+        exclude_patterns=[],
+        include_patterns=[],
+        output_stream=buffer.write,
+        output_format=output_format,
+        outline_policy=outline_policy,
+    )
+    return buffer.getvalue().encode("utf-8")
+
+
+@pytest.mark.usefixtures("ignore_nothing")
+@pytest.mark.parametrize("output_format", ["markdown", "jsonl", "xml"])
+def test_parallel_output_is_byte_identical(
+    output_format: str, make_repo: Callable[..., Path], tmp_path: Path
+) -> None:
+    """Test that multi-process output equals the serial output."""
+    files = {
+        f"pkg{number % 3}/module_{number}.py": (
+            f'"""Module {number}."""\n\ndef f():\n    return "ü{number}"\n' * 50
+        )
+        for number in range(23)
+    }
+    repo = make_repo({**files, "empty.txt": ""})
+    output_file = tmp_path / "out" / "prompt.txt"
+    output_file.parent.mkdir()
+    policy = OutlinePolicy(patterns=["pkg1/*"])
+
+    expected = serial_prompt(repo, output_format, policy)
+    write_prompt_file_parallel(
+        repo,
+        output_file,
+        [],
+        [],
+        processes=2,
+        output_format=output_format,
+        outline_policy=policy,
+    )
+
+    assert output_file.read_bytes() == expected
+    # Chunk files are cleaned up
+    assert list(output_file.parent.iterdir()) == [output_file]
+
+
+def test_copy_file_contents_falls_back_without_copy_file_range() -> None:
+    """Test the user-space copy used where copy_file_range is unavailable."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        source_path = Path(temp_dir) / "chunk"
+        source_path.write_bytes(b"section one\nsection two\n")
+        target_path = Path(temp_dir) / "out"
+
+        with target_path.open("w", encoding="utf-8") as target:
+            target.write("header\n")
+            with mock.patch("os.copy_file_range", side_effect=OSError("unsupported"), create=True):
+                with source_path.open("rb") as source:
+                    copy_file_contents(source, target)
+            target.write("footer\n")
+
+        assert target_path.read_bytes() == b"header\nsection one\nsection two\nfooter\n"
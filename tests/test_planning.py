@@ -0,0 +1,76 @@
+"""Tests for include-driven traversal planning."""
+
+from collections.abc import Callable
+from pathlib import Path, PurePath
+from unittest import mock
+
+import pytest
+
+from codebase_prompt_gen import walk
+from codebase_prompt_gen.core import generate_file_tree
+from codebase_prompt_gen.planning import IncludePlan
+
+
+def test_include_plan_prefixes_and_fallback() -> None:
+    """Test which directories a plan rules out, including wildcard-first patterns."""
+    plan = IncludePlan(["services/billing/**/*.py", "docs/index.md"])
+
+    assert plan.prunes
+    assert plan.may_contain(PurePath("services"))
+    assert plan.may_contain(PurePath("services/billing"))
+    assert plan.may_contain(PurePath("services/billing/api/v1"))
+    assert plan.may_contain(PurePath("docs"))
+    assert not plan.may_contain(PurePath("services/shipping"))
+    assert not plan.may_contain(PurePath("docs/api"))
+    assert not plan.may_contain(PurePath("frontend"))
+
+    # `*` matches `/` in fnmatch, so a leading wildcard can match in any directory
+    for patterns in (["*.py"], ["src/*.py", "**/test_*.py"], ["s*/main.py"]):
+        fallback = IncludePlan(patterns)
+        assert not fallback.prunes
+        assert fallback.may_contain(PurePath("anything/at/all"))
+
+
+def test_include_plan_matches() -> None:
+    """Test that matching agrees with fnmatch on the include patterns."""
+    plan = IncludePlan(["services/billing/**/*.py", "*.[ch]", "Makefile"])
+
+    assert plan.matches("services/billing/api/handlers.py")
+    assert not plan.matches("services/billing/api/handlers.pyc")
+    assert plan.matches("src/lib/util.c")
+    assert plan.matches("Makefile")
+    assert not plan.matches("src/Makefile.am")
+    assert IncludePlan([]).matches("anything.txt")
+
+
+@pytest.mark.usefixtures("ignore_nothing")
+def test_generate_file_tree_skips_unmatchable_directories(make_repo: Callable[..., Path]) -> None:
+    """Test that directories outside every include prefix are never listed."""
+    root = make_repo(
+        dict.fromkeys(
+            (
+                "services/billing/api/handlers.py",
+                "services/billing/README.md",
+                "services/shipping/deep/tree/app.py",
+                "frontend/src/app.py",
+            ),
+            "x = 1\n",
+        )
+    )
+
+    listed: list[str] = []
+    real_list_directory = walk.list_directory
+
+    def recording_list_directory(directory: Path):
+        listed.append(Path(directory).relative_to(root).as_posix())
+        return real_list_directory(directory)
+
+    with mock.patch.object(walk, "list_directory", recording_list_directory):
+        file_tree, files_content = generate_file_tree(root, [], ["services/billing/**/*.py"])
+
+    assert [str(path) for path, _ in files_content] == ["services/billing/api/handlers.py"]
+    assert listed == [".", "services", "services/billing", "services/billing/api"]
+    # Skipped directories still appear in the tree, without their contents
+    assert "📁 frontend/" in file_tree
+    assert "📁 services/shipping/" in file_tree
+    assert "📁 services/shipping/deep/" not in file_tree
@@ -0,0 +1,103 @@
+"""Tests for progress events and cancellation."""
+
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from codebase_prompt_gen.core import generate_prompt
+from codebase_prompt_gen.progress import (
+    CancellationToken,
+    ProgressObserver,
+    PromptCancelledError,
+)
+
+
+class RecordingObserver(ProgressObserver):
+    """Observer that records every event it receives."""
+
+    def __init__(self) -> None:
+        self.events: list[tuple] = []
+
+    def phase_started(self, phase: str) -> None:
+        self.events.append(("phase", phase))
+
+    def entry_walked(self, path: Path, is_dir: bool, excluded: bool) -> None:
+        self.events.append(("walked", str(path), is_dir, excluded))
+
+    def files_selected(self, count: int, total_bytes: int) -> None:
+        self.events.append(("selected", count, total_bytes))
+
+    def file_read(self, path: Path, length: int) -> None:
+        self.events.append(("read", str(path), length))
+
+    def file_written(self, path: Path) -> None:
+        self.events.append(("written", str(path)))
+
+
+# A small repository with one excluded file
+REPO_FILES = {"src/main.py": "print('hi')\n", "debug.log": "noise\n"}
+
+
+@pytest.mark.usefixtures("ignore_nothing")
+def test_observer_receives_events_in_order(make_repo: Callable[..., Path]) -> None:
+    """Test that an observer sees the walk, the selection and every file."""
+    observer = RecordingObserver()
+    generate_prompt(
+        make_repo(REPO_FILES),
+        exclude_patterns=["*.log"],
+        include_patterns=[],
+        output_stream=lambda _: None,
+        observer=observer,
+    )
+
+    assert observer.events == [
+        ("phase", "walk"),
+        ("walked", "debug.log", False, True),
+        ("walked", "src", True, False),
+        ("walked", "src/main.py", False, False),
+        ("selected", 1, 12),
+        ("phase", "write"),
+        ("read", "src/main.py", 12),
+        ("written", "src/main.py"),
+        ("phase", "done"),
+    ]
+
+
+@pytest.mark.usefixtures("ignore_nothing")
+def test_cancellation_stops_between_files(make_repo: Callable[..., Path]) -> None:
+    """Test that cancelling during the write stops before the next file."""
+    token = CancellationToken()
+    chunks: list[str] = []
+
+    class CancelAfterFirstFile(ProgressObserver):
+        def file_written(self, _path: Path) -> None:
+            token.cancel()
+
+    repo = make_repo({**REPO_FILES, "src/other.py": "pass\n"})
+    with pytest.raises(PromptCancelledError):
+        generate_prompt(
+            repo,
+            exclude_patterns=[],
+            include_patterns=[],
+            output_stream=chunks.append,
+            observer=CancelAfterFirstFile(),
+            cancel_token=token,
+        )
+
+    output = "".join(chunks)
+    assert "debug.log" in output
+    assert "### `src/main.py`" not in output
+
+    # A token cancelled up front stops the walk before any output
+    chunks.clear()
+    with pytest.raises(PromptCancelledError):
+        generate_prompt(
+            repo,
+            exclude_patterns=[],
+            include_patterns=[],
+            output_stream=chunks.append,
+            respect_gitignore=False,
+            cancel_token=token,
+        )
+    assert chunks == []
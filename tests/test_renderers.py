@@ -0,0 +1,64 @@
+"""Tests for output renderers."""
+
+import json
+import xml.etree.ElementTree as ET
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from codebase_prompt_gen.renderers import MarkdownRenderer, get_renderer, markdown_fence
+
+
+def test_markdown_fence_grows_past_backticks() -> None:
+    """Test that the fence is longer than any backtick run in the content."""
+    assert markdown_fence("plain text") == "```"
+    assert markdown_fence("```python\nx = 1\n```") == "````"
+    assert markdown_fence("``````") == "```````"
+
+
+def test_markdown_renderer_escapes_fences() -> None:
+    """Test that content containing a fence does not close the code block."""
+    section = MarkdownRenderer().file_section(Path("README.md"), "```\ncode\n```")
+    assert section.startswith("### `README.md`\n\n````md\n")
+    assert section.endswith("\n````\n\n")
+
+
+@pytest.mark.usefixtures("ignore_nothing")
+def test_jsonl_output(make_repo: Callable[..., Path], render: Callable[..., str]) -> None:
+    """Test that the JSON Lines renderer emits one record per file."""
+    repo = make_repo({"main.py": 'print("héllo")\n'})
+
+    records = [json.loads(line) for line in render(repo, output_format="jsonl").splitlines()]
+
+    assert records[0]["type"] == "repository"
+    assert "📄 main.py" in records[0]["tree"]
+    assert records[1] == {
+        "type": "file",
+        "path": "main.py",
+        "size": len('print("héllo")\n'.encode()),
+        "lang": "py",
+        "content": 'print("héllo")\n',
+    }
+
+
+@pytest.mark.usefixtures("ignore_nothing")
+def test_xml_output_is_well_formed(
+    make_repo: Callable[..., Path], render: Callable[..., str]
+) -> None:
+    """Test that the XML renderer escapes markup and control characters."""
+    content = 'if a < b && c > d: print("</file>")\x01\n'
+    repo = make_repo({"main.py": content})
+
+    root = ET.fromstring(render(repo, output_format="xml").encode("utf-8"))
+
+    file_element = root.find("files/file")
+    assert file_element is not None
+    assert file_element.get("path") == "main.py"
+    assert file_element.text == "\n" + content.replace("\x01", "�") + "\n"
+
+
+def test_unknown_format() -> None:
+    """Test that an unknown format is rejected."""
+    with pytest.raises(ValueError, match="Unknown output format"):
+        get_renderer("yaml")
@@ -0,0 +1,74 @@
+"""Tests for scan results shared by several outputs."""
+
+import io
+from collections import Counter
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from codebase_prompt_gen.core import (
+    FilesystemSource,
+    generate_prompt,
+    generate_prompts,
+    scan_source,
+)
+from codebase_prompt_gen.outline import OutlinePolicy
+from codebase_prompt_gen.planning import IncludePlan
+from codebase_prompt_gen.scan import PromptTarget, scan_include_patterns
+from codebase_prompt_gen.tree import TreeStyle
+
+# A repository with sources, tests and docs
+REPO_FILES = {
+    path: f"# {path}\n" * 20
+    for path in ("src/app/main.py", "src/app/util.py", "tests/test_main.py", "docs/index.md")
+}
+
+
+def test_select_matches_a_scan_with_the_same_includes(make_repo: Callable[..., Path]) -> None:
+    """Test that selecting from a wider scan equals scanning with the narrower includes."""
+    root = make_repo(REPO_FILES)
+
+    def scan(include_patterns: list[str]):
+        source = FilesystemSource(root, include_plan=IncludePlan(include_patterns))
+        return scan_source(source, [], include_patterns, respect_gitignore=False)
+
+    wide = scan(["src/**", "tests/*"])
+    for narrow in (["tests/*"], ["src/app/*.py"], ["src/**", "tests/*"]):
+        expected, expected_files = scan(narrow).select()
+        selected, selected_files = wide.select(narrow)
+        assert selected == expected
+        assert [path for path, _ in selected_files] == [path for path, _ in expected_files]
+
+    assert scan_include_patterns([PromptTarget(print, ["a"]), PromptTarget(print, ["b"])]) == [
+        "a",
+        "b",
+    ]
+    assert scan_include_patterns([PromptTarget(print, ["a"]), PromptTarget(print)]) == []
+
+
+@pytest.mark.usefixtures("ignore_nothing")
+def test_generate_prompts_reads_each_file_once(
+    make_repo: Callable[..., Path], file_reads: Counter[Path]
+) -> None:
+    """Test that several targets equal separate runs while every file is read once."""
+    root = make_repo(REPO_FILES)
+    settings = [
+        {"include_patterns": [], "tree_style": TreeStyle("indented")},
+        {"include_patterns": ["tests/*"], "output_format": "xml"},
+        {"include_patterns": ["src/**"], "outline_policy": OutlinePolicy(budget=100)},
+    ]
+
+    buffers = [io.StringIO() for _ in settings]
+    generate_prompts(
+        root,
+        [],
+        [PromptTarget(buffer.write, **kwargs) for buffer, kwargs in zip(buffers, settings)],
+    )
+    assert set(file_reads.values()) == {1}
+    assert len(file_reads) == len(REPO_FILES)
+
+    for buffer, kwargs in zip(buffers, settings):
+        expected = io.StringIO()
+        generate_prompt(root, [], output_stream=expected.write, **kwargs)
+        assert buffer.getvalue() == expected.getvalue()
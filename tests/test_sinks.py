@@ -0,0 +1,87 @@
+"""Tests for buffered output sinks."""
+
+import io
+import subprocess
+import sys
+from collections import Counter
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from codebase_prompt_gen.core import generate_prompt
+from codebase_prompt_gen.sinks import FLUSH_FULL, FLUSH_SECTION, OutputClosedError, OutputSink
+
+
+class RecordingStream(io.BytesIO):
+    """Binary stream that records every write and can refuse writes after some."""
+
+    def __init__(self, fail_after: int | None = None) -> None:
+        super().__init__()
+        self.writes: list[bytes] = []
+        self.fail_after = fail_after
+
+    def write(self, data) -> int:
+        if self.fail_after is not None and len(self.writes) >= self.fail_after:
+            raise BrokenPipeError(32, "Broken pipe")
+        self.writes.append(bytes(data))
+        return super().write(data)
+
+
+def text_files(files: int, lines: int = 1) -> dict[str, str]:
+    """Return the contents of a repository of text files, by path."""
+    return {f"file_{number:03d}.txt": f"content {number}\n" * lines for number in range(files)}
+
+
+def test_flush_policies_batch_writes() -> None:
+    """Test that small writes are batched until the buffer fills or the policy flushes."""
+    stream = RecordingStream()
+    sink = OutputSink(stream, FLUSH_FULL, buffer_size=10)
+    for text in ("ab", "cd", "é", "fgh"):
+        sink.write(text)
+    assert stream.writes == []
+    sink.write("ijk")
+    assert stream.writes == ["abcdéfghijk".encode()]
+    sink.write("tail")
+    sink.close()
+    assert stream.getvalue() == "abcdéfghijktail".encode()
+
+    section_stream = RecordingStream()
+    section_sink = OutputSink(section_stream, FLUSH_SECTION)
+    section_sink.write("header")
+    section_sink.write("section")
+    assert section_stream.writes == [b"header", b"section"]
+
+
+@pytest.mark.usefixtures("no_global_gitignore")
+def test_closed_output_stops_reading(
+    make_repo: Callable[..., Path], file_reads: Counter[Path]
+) -> None:
+    """Test that a closed pipe stops the run before the remaining files are read."""
+    root = make_repo(text_files(50))
+
+    sink = OutputSink(RecordingStream(fail_after=1), FLUSH_SECTION)
+    with pytest.raises(OutputClosedError):
+        generate_prompt(root, [], [], output_stream=sink.write)
+
+    # The header went out; the first section's write failed
+    assert file_reads.total() == 1
+
+
+def test_cli_exits_quietly_when_reader_closes_pipe(make_repo: Callable[..., Path]) -> None:
+    """Test `codebase-prompt | head`: exit status 0 and no traceback."""
+    # Far more output than a pipe buffers, so writing must hit the closed pipe
+    root = make_repo(text_files(200, lines=100))
+    process = subprocess.Popen(
+        [sys.executable, "-m", "codebase_prompt_gen.cli.main", str(root), "--flush", "section"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    assert process.stdout is not None
+    assert process.stdout.read(10) == b"# Reposito"
+    process.stdout.close()
+    _, stderr = process.communicate(timeout=30)
+
+    assert process.returncode == 0
+    assert b"Traceback" not in stderr
+    assert b"BrokenPipeError" not in stderr
@@ -0,0 +1,70 @@
+"""Tests for file tree renderings."""
+
+from pathlib import Path
+
+import pytest
+
+from codebase_prompt_gen.tree import (
+    TreeEntry,
+    TreeStyle,
+    render_flat,
+    render_indented,
+    tree_rendering_sizes,
+)
+
+ENTRIES = [
+    TreeEntry(Path("README.md"), is_dir=False, size=10),
+    TreeEntry(Path("fixtures"), is_dir=True),
+    *(TreeEntry(Path(f"fixtures/case_{n}.json"), is_dir=False, size=100) for n in range(4)),
+    TreeEntry(Path("lib"), is_dir=True, same_as=Path("src")),
+    TreeEntry(Path("src"), is_dir=True),
+    TreeEntry(Path("src/com"), is_dir=True),
+    TreeEntry(Path("src/com/example"), is_dir=True),
+    TreeEntry(Path("src/com/example/App.java"), is_dir=False, size=50),
+    TreeEntry(
+        Path("src/com/example/Copy.java"), is_dir=False, same_as=Path("src/com/example/App.java")
+    ),
+]
+
+
+def test_render_flat_matches_classic_tree() -> None:
+    """Test that the flat rendering keeps the original line format."""
+    lines = render_flat(ENTRIES)
+
+    assert lines[0] == "📄 README.md"
+    assert "📁 fixtures/" in lines
+    assert "📁 lib/ (same as src/)" in lines
+    assert lines[-1] == "📄 src/com/example/Copy.java (same as src/com/example/App.java)"
+
+
+def test_render_indented_collapses_and_summarises() -> None:
+    """Test the indented rendering with chain collapsing and summaries."""
+    assert render_indented(ENTRIES, collapse_chains=True, summarize_above=3) == [
+        "README.md",
+        "fixtures/ (4 files, 400 bytes)",
+        "lib/ (same as src/)",
+        "src/com/example/",
+        "  App.java",
+        "  Copy.java (same as src/com/example/App.java)",
+    ]
+    plain = render_indented(ENTRIES)
+    assert plain[plain.index("src/") + 1 : plain.index("src/") + 3] == ["  com/", "    example/"]
+    assert "  case_0.json" in plain
+
+
+def test_tree_style_validation_and_sizes() -> None:
+    """Test that options need the indented layout and every rendering is measured."""
+    with pytest.raises(ValueError, match="indented"):
+        TreeStyle(collapse_chains=True)
+    with pytest.raises(ValueError, match="Unknown"):
+        TreeStyle("nested")
+
+    sizes = tree_rendering_sizes(ENTRIES, summarize_above=3)
+    assert list(sizes) == [
+        "flat",
+        "indented",
+        "indented, collapsed",
+        "indented, collapsed, summarised",
+    ]
+    assert sizes["indented"][1] < sizes["flat"][1]
+    assert [lines for lines, _ in sizes.values()] == [12, 12, 10, 6]
@@ -0,0 +1,46 @@
+"""Tests for the sorted directory walk."""
+
+import tempfile
+from pathlib import Path
+
+from codebase_prompt_gen.walk import walk_sorted
+
+
+def make_tree(root: Path) -> None:
+    """Create a tree with wide and deep directories and a symlink cycle."""
+    for top in ("a", "a-b", "b", "c"):
+        for sub in ("x", "y"):
+            (root / top / sub / "deep").mkdir(parents=True)
+            (root / top / sub / "deep" / "file.txt").write_text(top)
+        (root / top / "z.txt").write_text(top)
+    (root / "README.md").write_text("readme")
+    (root / "c" / "loop").symlink_to(root, target_is_directory=True)
+
+
+def test_concurrent_walk_matches_serial_order() -> None:
+    """Test that listing on a thread pool yields exactly the serial walk."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        make_tree(root)
+
+        serial = [path for path, _ in walk_sorted(root, False, {})]
+        assert serial == sorted(root.rglob("*"))
+
+        for workers in (2, 8):
+            concurrent = [path for path, _ in walk_sorted(root, False, {}, max_workers=workers)]
+            assert concurrent == serial
+
+
+def test_concurrent_walk_following_symlinks() -> None:
+    """Test that a concurrent walk resolves link cycles like the serial walk."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        make_tree(root)
+
+        serial_aliases: dict[Path, Path] = {}
+        serial = list(walk_sorted(root, True, serial_aliases))
+        concurrent_aliases: dict[Path, Path] = {}
+        concurrent = list(walk_sorted(root, True, concurrent_aliases, max_workers=4))
+
+        assert [path for path, _ in concurrent] == [path for path, _ in serial]
+        assert concurrent_aliases == serial_aliases == {root / "c" / "loop": Path()}